@@ -47,6 +47,6 @@ setup(
     ],
     extras_require={
         "docs": ["sphinx", "furo", "nbsphinx", "ipykernel"],
-        "development": ["hypothesis", "pylint"],
+        "development": ["hypothesis", "numpy", "pylint"],
     },
 )
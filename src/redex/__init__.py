@@ -1,10 +1,23 @@
 """A combinator library for designing algorithms."""
 
-from redex import util, stack, function, combinator
+from redex import util, observer, stack, function, combinator, compiler, vm, batch
+from redex import serialize, executor, streaming, optimizer, explain, dag
+from redex import export
 
 __all__ = [
     "util",
+    "observer",
     "stack",
     "function",
     "combinator",
+    "compiler",
+    "vm",
+    "batch",
+    "serialize",
+    "executor",
+    "streaming",
+    "optimizer",
+    "explain",
+    "dag",
+    "export",
 ]
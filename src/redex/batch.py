@@ -0,0 +1,240 @@
+"""The batched mode applies combinators to many stacks at once.
+
+Stacks of a batch are passed as columns: the `i`-th column holds the `i`-th
+items of all stacks. A combinator is lowered once into instructions of the
+virtual machine, which are executed over columns instead of single items:
+
+- stack-shuffling combinators (such as `select`, `drop`, `dup`) move whole
+  columns, without touching rows;
+- folding with arithmetic operators is a single elementwise operation per
+  pair of columns if columns are arrays (e.g. NumPy arrays);
+- vectorized functions are called once with whole columns;
+- any other function is called row by row.
+
+Columns may be lists or arrays. Columns computed row by row are lists.
+"""
+
+import operator
+from functools import reduce
+from typing import Any, Callable, List, Optional, TypeVar
+from dataclasses import dataclass, field
+from redex import util
+from redex import vm
+from redex import function as fn
+from redex.function import Fn, FineCallable, Signature
+from redex.stack import collect_outputs
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_ELEMENTWISE_OPERATORS = frozenset(
+    [
+        operator.add,
+        operator.sub,
+        operator.mul,
+        operator.truediv,
+        operator.floordiv,
+        operator.mod,
+        operator.pow,
+    ]
+)
+"""binary operators that work elementwise on arrays."""
+
+
+def vectorized(func: F) -> F:
+    """Marks the function as vectorized.
+
+    The vectorized function takes whole columns instead of single items
+    and returns columns of its outputs.
+
+    >>> from redex import batch
+    >>> @batch.vectorized
+    ... def scale(column):
+    ...     return [item * 10 for item in column]
+    >>> batch.vmap(scale)([1, 2, 3])
+    [10, 20, 30]
+
+    Args:
+        func: a function.
+
+    Returns:
+        the same function.
+    """
+    setattr(func, "__vectorized__", True)
+    return func
+
+
+def is_vectorized(func: Fn) -> bool:
+    """Checks whether the function is vectorized.
+
+    Args:
+        func: a function.
+
+    Returns:
+        `True` if the function takes whole columns, `False` otherwise.
+    """
+    return getattr(func, "__vectorized__", False) is True
+
+
+@dataclass(frozen=True)
+class Batched(FineCallable):
+    """The combinator applied to batches of stacks."""
+
+    __vectorized__ = True
+
+    combinator: Fn
+    """an original combinator."""
+
+    program: vm.Program = field(repr=False)
+    """a program executed over columns."""
+
+    def __call__(self, *columns: Any, n_rows: Optional[int] = None) -> Any:
+        return util.squeeze_tuple(run(self.program, columns, n_rows))
+
+
+def vmap(func: Fn) -> Batched:
+    """Makes a combinator that is applied to batches of stacks.
+
+    >>> import operator as op
+    >>> from redex import combinator as cb
+    >>> from redex import batch
+    >>> batched = batch.vmap(cb.serial(cb.dup(), op.mul, op.add))
+    >>> batched([1, 2, 3], [10, 20, 30])
+    [11, 24, 39]
+
+    Args:
+        func: a combinator or any other function.
+
+    Returns:
+        a batched combinator with the same signature as the original one,
+        which takes and returns columns.
+
+    Raises:
+        ValueError: if some function of the combinator requires more inputs
+            than available to it.
+    """
+    program = vm.lower(func)
+    return Batched(signature=program.signature, combinator=func, program=program)
+
+
+def run(
+    program: vm.Program,
+    columns: tuple[Any, ...],
+    n_rows: Optional[int] = None,
+) -> tuple[Any, ...]:
+    """Executes the program over columns.
+
+    Args:
+        program: a program to execute.
+        columns: columns of the stacks to apply the program to.
+        n_rows: a number of stacks in the batch. Required only if there are
+            no columns, otherwise defaults to the length of columns.
+
+    Returns:
+        columns of the stacks after execution.
+
+    Raises:
+        ValueError: if a number of columns less than required by the program,
+            if columns have different lengths than each other or `n_rows`,
+            if there are neither columns nor `n_rows`, or if some function returns
+            a different number of outputs than its signature declares.
+    """
+    n_rows = _count_rows(program, columns, n_rows)
+    stack = list(columns)
+    for opcode, offset, n_in, _, arg in program.instructions:
+        inputs = stack[offset : offset + n_in]
+        if opcode == vm.CALL:
+            func, plan, signature = arg
+            if is_vectorized(func):
+                values = _call_vectorized(func, plan, signature, inputs)
+            else:
+                values = _call_rowwise(func, plan, signature, inputs, n_rows)
+        elif opcode == vm.SELECT:
+            values = [stack[offset + i] for i in arg]
+        elif opcode == vm.DUP:
+            values = inputs * 2
+        elif opcode == vm.DROP:
+            values = []
+        elif arg in _ELEMENTWISE_OPERATORS and all(map(_is_array, inputs)):
+            values = [reduce(arg, inputs)]
+        else:
+            values = [[reduce(arg, row) for row in zip(*inputs)]]
+        stack[offset : offset + n_in] = values
+    return tuple(stack)
+
+
+def _count_rows(
+    program: vm.Program,
+    columns: tuple[Any, ...],
+    n_rows: Optional[int],
+) -> int:
+    """Verifies columns of the batch, and counts its rows."""
+    n_columns = len(columns)
+    if n_columns < program.signature.n_in:
+        raise ValueError(
+            f"The `{fn.infer_name(program.combinator)}` takes "
+            f"{program.signature.n_in} columns but {n_columns} were given."
+        )
+    if n_rows is None:
+        if not columns:
+            raise ValueError(
+                "The number of rows must be given for a batch without columns."
+            )
+        n_rows = len(columns[0])
+    if any(len(column) != n_rows for column in columns):
+        raise ValueError(f"All columns of the batch must have {n_rows} rows.")
+
+    return n_rows
+
+
+def _call_vectorized(
+    func: Fn,
+    plan: Optional[util.PlanFn],
+    signature: Signature,
+    inputs: List[Any],
+) -> List[Any]:
+    """Calls the vectorized function with whole columns."""
+    result = func(*inputs) if plan is None else func(*plan(inputs))
+    n_out = signature.n_out
+    if signature.out_shape is not None:
+        values = list(collect_outputs(result, signature))
+    elif n_out <= 1:
+        # Columns may be tuples, which aren't flattened.
+        values = [] if n_out == 0 else [result]
+    else:
+        values = list(result)
+    _verify_outputs(func, len(values), n_out)
+    return values
+
+
+def _call_rowwise(
+    func: Fn,
+    plan: Optional[util.PlanFn],
+    signature: Signature,
+    inputs: List[Any],
+    n_rows: int,
+) -> List[Any]:
+    """Calls the function with each row, and collects columns of its outputs."""
+    n_out = signature.n_out
+    rows = zip(*inputs) if inputs else [()] * n_rows
+    outputs = []
+    for row in rows:
+        result = func(*row) if plan is None else func(*plan(row))
+        values = collect_outputs(result, signature)
+        _verify_outputs(func, len(values), n_out)
+        outputs.append(values)
+    if not outputs or not n_out:
+        return [[] for _ in range(n_out)]
+    return [list(column) for column in zip(*outputs)]
+
+
+def _verify_outputs(func: Fn, n_values: int, n_out: int) -> None:
+    if n_values != n_out:
+        raise ValueError(
+            f"The `{fn.infer_name(func)}` returned {n_values} "
+            f"outputs but its signature declares {n_out}."
+        )
+
+
+def _is_array(column: Any) -> bool:
+    """Checks whether arithmetic operators work elementwise on the column."""
+    return getattr(column, "__array_ufunc__", None) is not None
@@ -0,0 +1,38 @@
+"""Benchmarks measure performance of combinators.
+
+Each benchmark constructs a function and calls it in a loop. The results
+include the construction time, call latency, and peak memory allocated
+by a call. Micro benchmarks measure each combinator and utility function,
+and scaling benchmarks measure combinators growing in depth, width and
+stack size.
+
+Benchmarks are run from the command line, and their results are saved
+as JSON to compare runs before and after a change:
+
+::
+
+    python -m redex.bench run --output base.json
+    python -m redex.bench run --output new.json
+    python -m redex.bench compare base.json new.json
+"""
+
+from redex.bench._runner import Benchmark, Result, measure, run
+from redex.bench._report import Comparison, compare, load, save
+from redex.bench._report import format_comparisons, format_results
+from redex.bench._suite import benchmarks, micro_benchmarks, scaling_benchmarks
+
+__all__ = [
+    "Benchmark",
+    "benchmarks",
+    "compare",
+    "Comparison",
+    "format_comparisons",
+    "format_results",
+    "load",
+    "measure",
+    "micro_benchmarks",
+    "Result",
+    "run",
+    "save",
+    "scaling_benchmarks",
+]
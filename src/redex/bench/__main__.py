@@ -0,0 +1,66 @@
+"""The command line interface of benchmarks."""
+
+import sys
+import argparse
+from typing import List, Optional
+from redex import bench
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Runs benchmarks or compares their results.
+
+    Args:
+        argv: command line arguments. Defaults to arguments of the process.
+
+    Returns:
+        the exit status: `1` if some benchmark is slower than the base one
+        by the threshold, `0` otherwise.
+    """
+    parser = argparse.ArgumentParser(prog="python -m redex.bench")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run benchmarks")
+    run_parser.add_argument(
+        "-k", "--pattern", help="a regular expression matching benchmark names"
+    )
+    run_parser.add_argument("-o", "--output", help="a JSON file to save results")
+    run_parser.add_argument("--repeat", type=int, default=5, help="number of timings")
+    run_parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.05,
+        help="minimum duration of each timing (in seconds)",
+    )
+
+    compare_parser = commands.add_parser("compare", help="compare results")
+    compare_parser.add_argument("base", help="a JSON file of base results")
+    compare_parser.add_argument("new", help="a JSON file of new results")
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="relative change of latency considered significant",
+    )
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        results = bench.run(
+            bench.benchmarks(),
+            pattern=args.pattern,
+            repeat=args.repeat,
+            min_time=args.min_time,
+        )
+        print(bench.format_results(results))
+        if args.output is not None:
+            bench.save(results, args.output)
+        return 0
+
+    comparisons = bench.compare(
+        bench.load(args.base), bench.load(args.new), threshold=args.threshold
+    )
+    print(bench.format_comparisons(comparisons))
+    return int(any(comparison.status == "slower" for comparison in comparisons))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
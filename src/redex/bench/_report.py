@@ -0,0 +1,178 @@
+"""Saving and comparing results of benchmarks."""
+
+import json
+import platform
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Union
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from redex import util
+from redex.version import __version__
+from redex.bench._runner import Result
+
+FORMAT_VERSION = 1
+"""the version of the format of saved results."""
+
+
+@dataclass
+class Comparison:
+    """The comparison of results of the same benchmark."""
+
+    name: str
+    """a name of the benchmark."""
+
+    base: Optional[Result]
+    """a base result, or `None` if the benchmark is added."""
+
+    new: Optional[Result]
+    """a new result, or `None` if the benchmark is removed."""
+
+    ratio: Optional[float]
+    """a ratio of the new call latency to the base one."""
+
+    status: str
+    """one of `faster`, `slower`, `same`, `added` or `removed`."""
+
+
+def save(results: List[Result], path: Union[str, Path]) -> None:
+    """Saves results as JSON along with the environment they are measured in.
+
+    Args:
+        results: results of benchmarks.
+        path: a path of the JSON file.
+    """
+    document = {
+        "format": FORMAT_VERSION,
+        "redex": __version__,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "created": datetime.now(timezone.utc).isoformat(),
+        "results": [asdict(result) for result in results],
+    }
+    Path(path).write_text(json.dumps(document, indent=2) + "\n", encoding="utf-8")
+
+
+def load(path: Union[str, Path]) -> List[Result]:
+    """Loads saved results.
+
+    Args:
+        path: a path of the JSON file.
+
+    Returns:
+        results of benchmarks.
+
+    Raises:
+        ValueError: if the file is saved in an unknown format.
+    """
+    document: Dict[str, Any] = json.loads(Path(path).read_text(encoding="utf-8"))
+    if document.get("format") != FORMAT_VERSION:
+        raise ValueError(f"The `{path}` isn't a file of benchmark results.")
+    return [Result(**result) for result in document["results"]]
+
+
+def compare(
+    base: List[Result],
+    new: List[Result],
+    threshold: float = 0.1,
+) -> List[Comparison]:
+    """Compares call latency of two runs of benchmarks.
+
+    >>> from redex.bench import Result, compare
+    >>> def result(latency):
+    ...     return Result("add", "micro", {}, 0.0, latency, latency, 0, 1)
+    >>> [comparison.status for comparison in compare([result(1.0)], [result(2.0)])]
+    ['slower']
+
+    Args:
+        base: base results.
+        new: new results.
+        threshold: a relative change of latency considered significant.
+
+    Returns:
+        comparisons of benchmarks in order of new results, followed by
+        removed benchmarks.
+    """
+    base_results = {result.name: result for result in base}
+    new_names = {result.name for result in new}
+    comparisons = []
+    for result in new:
+        base_result = base_results.get(result.name)
+        if base_result is None:
+            comparisons.append(Comparison(result.name, None, result, None, "added"))
+            continue
+        ratio = result.latency / base_result.latency if base_result.latency else 1.0
+        if ratio > 1.0 + threshold:
+            status = "slower"
+        elif ratio < 1.0 / (1.0 + threshold):
+            status = "faster"
+        else:
+            status = "same"
+        comparisons.append(Comparison(result.name, base_result, result, ratio, status))
+    for result in base:
+        if result.name not in new_names:
+            comparisons.append(Comparison(result.name, result, None, None, "removed"))
+    return comparisons
+
+
+def format_results(results: List[Result]) -> str:
+    """Formats results as a table.
+
+    Args:
+        results: results of benchmarks.
+
+    Returns:
+        a table.
+    """
+    rows: List[tuple[str, ...]] = [
+        ("benchmark", "construction", "latency", "median", "peak memory")
+    ]
+    for result in results:
+        rows.append(
+            (
+                result.name,
+                _format_time(result.construction),
+                _format_time(result.latency),
+                _format_time(result.latency_median),
+                _format_size(result.peak_memory),
+            )
+        )
+    return util.format_table(rows)
+
+
+def format_comparisons(comparisons: List[Comparison]) -> str:
+    """Formats comparisons as a table.
+
+    Args:
+        comparisons: comparisons of benchmarks.
+
+    Returns:
+        a table.
+    """
+    rows: List[tuple[str, ...]] = [("benchmark", "base", "new", "ratio", "status")]
+    for comparison in comparisons:
+        base, new, ratio = comparison.base, comparison.new, comparison.ratio
+        rows.append(
+            (
+                comparison.name,
+                "-" if base is None else _format_time(base.latency),
+                "-" if new is None else _format_time(new.latency),
+                "-" if ratio is None else f"{ratio:.2f}x",
+                comparison.status,
+            )
+        )
+    return util.format_table(rows)
+
+
+def _format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def _format_size(n_bytes: int) -> str:
+    for unit, scale in (("MiB", 1 << 20), ("KiB", 1 << 10)):
+        if n_bytes >= scale:
+            return f"{n_bytes / scale:.1f} {unit}"
+    return f"{n_bytes} B"
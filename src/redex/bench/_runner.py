@@ -0,0 +1,162 @@
+"""The benchmark runner."""
+
+import re
+import time
+import statistics
+import tracemalloc
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from dataclasses import dataclass, field
+from redex.function import Fn
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    """The benchmark of a function."""
+
+    name: str
+    """a unique name of the benchmark."""
+
+    build: Callable[[], Fn]
+    """a function constructing the benchmarked function."""
+
+    inputs: tuple[Any, ...] = ()
+    """inputs the benchmarked function is called with."""
+
+    group: str = "micro"
+    """a group of the benchmark."""
+
+    params: Dict[str, int] = field(default_factory=dict)
+    """parameters of the benchmark, such as a depth of the graph."""
+
+
+# pylint: disable=too-many-instance-attributes
+@dataclass
+class Result:
+    """The result of the benchmark."""
+
+    name: str
+    """a name of the benchmark."""
+
+    group: str
+    """a group of the benchmark."""
+
+    params: Dict[str, int]
+    """parameters of the benchmark."""
+
+    construction: float
+    """the best time (in seconds) to construct the function."""
+
+    latency: float
+    """the best time (in seconds) per call of the function."""
+
+    latency_median: float
+    """the median time (in seconds) per call of the function."""
+
+    peak_memory: int
+    """the peak size (in bytes) of memory allocated by a call."""
+
+    n_calls: int
+    """a number of calls per each timing of latency."""
+
+
+def measure(benchmark: Benchmark, repeat: int = 5, min_time: float = 0.05) -> Result:
+    """Measures the benchmark.
+
+    Construction time and call latency are the best of several timings,
+    because slower timings are mostly caused by other processes.
+
+    Args:
+        benchmark: a benchmark to measure.
+        repeat: a number of timings.
+        min_time: a minimum duration (in seconds) of each timing of latency.
+            Calls are repeated in a loop to take at least this time.
+
+    Returns:
+        a result.
+    """
+    constructions = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func = benchmark.build()
+        constructions.append(time.perf_counter() - start)
+
+    inputs = benchmark.inputs
+    n_calls = _count_calls(func, inputs, min_time)
+    latencies = [_time_calls(func, inputs, n_calls) / n_calls for _ in range(repeat)]
+    return Result(
+        name=benchmark.name,
+        group=benchmark.group,
+        params=dict(benchmark.params),
+        construction=min(constructions),
+        latency=min(latencies),
+        latency_median=statistics.median(latencies),
+        peak_memory=_peak_memory(func, inputs),
+        n_calls=n_calls,
+    )
+
+
+def run(
+    benchmarks: Iterable[Benchmark],
+    pattern: Optional[str] = None,
+    repeat: int = 5,
+    min_time: float = 0.05,
+    report: Optional[Callable[[Result], None]] = None,
+) -> List[Result]:
+    """Measures the benchmarks.
+
+    Args:
+        benchmarks: benchmarks to measure.
+        pattern: a regular expression searched in names of benchmarks
+            to measure. Defaults to all benchmarks.
+        repeat: a number of timings of each benchmark.
+        min_time: a minimum duration (in seconds) of each timing of latency.
+        report: a function called with each result as soon as it's measured.
+
+    Returns:
+        results of the benchmarks.
+    """
+    results = []
+    for benchmark in benchmarks:
+        if pattern is not None and not re.search(pattern, benchmark.name):
+            continue
+        result = measure(benchmark, repeat=repeat, min_time=min_time)
+        if report is not None:
+            report(result)
+        results.append(result)
+    return results
+
+
+def _time_calls(func: Fn, inputs: tuple[Any, ...], n_calls: int) -> float:
+    """Times calls of the function in a loop."""
+    loop = range(n_calls)
+    start = time.perf_counter()
+    for _ in loop:
+        func(*inputs)
+    return time.perf_counter() - start
+
+
+def _count_calls(func: Fn, inputs: tuple[Any, ...], min_time: float) -> int:
+    """Finds a number of calls taking at least the minimum time."""
+    n_calls = 1
+    while True:
+        if _time_calls(func, inputs, n_calls) >= min_time:
+            return n_calls
+        n_calls *= 2
+
+
+def _peak_memory(func: Fn, inputs: tuple[Any, ...]) -> int:
+    """Measures the peak size of memory allocated by a call."""
+    was_tracing = tracemalloc.is_tracing()
+    if was_tracing:
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+    else:
+        tracemalloc.start()
+        base = 0
+    try:
+        func(*inputs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    return max(0, peak - base)
@@ -0,0 +1,123 @@
+"""Benchmarks of combinators and utility functions."""
+
+import operator as op
+from typing import List
+from redex import util
+from redex import function as fn
+from redex import combinator as cb
+from redex.function import Fn
+from redex.bench._runner import Benchmark
+
+DEPTHS = (1, 10, 100)
+"""depths of nested combinators in scaling benchmarks."""
+
+WIDTHS = (1, 10, 100)
+"""numbers of branches in scaling benchmarks."""
+
+STACK_SIZES = (10, 100, 1000)
+"""sizes of the stack in scaling benchmarks."""
+
+FOLD_SIZES = (3, 8, 1000)
+"""numbers of folded integers and floats in scaling benchmarks."""
+
+
+def micro_benchmarks() -> List[Benchmark]:
+    """Makes benchmarks of each combinator and utility function.
+
+    Returns:
+        benchmarks.
+    """
+    return [
+        Benchmark("serial", lambda: cb.serial(op.add, op.add, op.add), (1, 2, 3, 4)),
+        Benchmark("parallel", lambda: cb.parallel(op.add, op.add), (1, 2, 3, 4)),
+        Benchmark("branch", lambda: cb.branch(op.add, op.sub), (1, 2)),
+        Benchmark("select", lambda: cb.select([1, 0, 0]), (1, 2)),
+        Benchmark("dup", cb.dup, (1, 2)),
+        Benchmark("drop", cb.drop, (1, 2)),
+        Benchmark("foldl", lambda: cb.foldl(op.add, n_in=4), (1, 2, 3, 4)),
+        Benchmark("residual", lambda: cb.residual(op.add, op.neg), (1, 2)),
+        Benchmark(
+            "util.reshape_tuples",
+            lambda: util.reshape_tuples,
+            ((1, 2, 3, 4), ((), (((), ()), ()))),
+        ),
+        Benchmark(
+            "util.flatten_tuples",
+            lambda: util.flatten_tuples,
+            ((1, ((2, 3), 4)),),
+        ),
+        Benchmark("function.infer_signature", lambda: fn.infer_signature, (_swap,)),
+    ]
+
+
+def scaling_benchmarks() -> List[Benchmark]:
+    """Makes benchmarks of combinators growing in depth, width and stack size.
+
+    Returns:
+        benchmarks.
+    """
+    scaling = []
+    for depth in DEPTHS:
+        scaling.append(
+            Benchmark(
+                f"depth[{depth}]",
+                lambda depth=depth: _nested(depth),  # type: ignore[misc]
+                (1,),
+                group="scaling",
+                params={"depth": depth},
+            )
+        )
+    for width in WIDTHS:
+        scaling.append(
+            Benchmark(
+                f"width[{width}]",
+                lambda width=width: cb.branch(*[op.neg] * width),  # type: ignore[misc]
+                (1,),
+                group="scaling",
+                params={"width": width},
+            )
+        )
+    for stack_size in STACK_SIZES:
+        scaling.append(
+            Benchmark(
+                f"stack_size[{stack_size}]",
+                lambda: cb.serial(cb.dup(), op.add, cb.drop()),
+                tuple(range(stack_size)),
+                group="scaling",
+                params={"stack_size": stack_size},
+            )
+        )
+    for n_in in FOLD_SIZES:
+        for kind in (int, float):
+            scaling.append(
+                Benchmark(
+                    f"foldl.{kind.__name__}[{n_in}]",
+                    lambda n_in=n_in: cb.foldl(op.add, n_in),  # type: ignore[misc]
+                    tuple(map(kind, range(n_in))),
+                    group="scaling",
+                    params={"n_in": n_in},
+                )
+            )
+    return scaling
+
+
+def benchmarks() -> List[Benchmark]:
+    """Makes all benchmarks.
+
+    Returns:
+        benchmarks.
+    """
+    return micro_benchmarks() + scaling_benchmarks()
+
+
+def _nested(depth: int) -> Fn:
+    """Makes serial combinators nested to the depth."""
+    func: Fn = op.neg
+    for _ in range(depth):
+        func = cb.serial(func, op.neg)
+    return func
+
+
+def _swap(pair: tuple[int, int]) -> tuple[int, int]:
+    first, second = pair
+    return second, first
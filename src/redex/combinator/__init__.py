@@ -25,9 +25,13 @@ and variadic tuples must not be used)*.
 from redex.combinator._fold import Foldl, fold, foldl, add, sub, mul, div
 from redex.combinator._branch import branch
 from redex.combinator._base import Combinator
+from redex.combinator._cond import cond, switch, Switch
 from redex.combinator._drop import drop, Drop
 from redex.combinator._dup import dup, Dup
 from redex.combinator._identity import identity, Identity
+from redex.combinator._loop import repeat, Repeat, scan, Scan
+from redex.combinator._loop import while_loop, WhileLoop
+from redex.combinator._memo import memo, Memo, MemoCache
 from redex.combinator._parallel import parallel, Parallel
 from redex.combinator._residual import residual
 from redex.combinator._select import select, Select
@@ -37,6 +41,7 @@ __all__ = [
     "add",
     "branch",
     "Combinator",
+    "cond",
     "div",
     "drop",
     "Drop",
@@ -47,13 +52,24 @@ __all__ = [
     "Foldl",
     "identity",
     "Identity",
+    "memo",
+    "Memo",
+    "MemoCache",
     "mul",
     "parallel",
     "Parallel",
+    "repeat",
+    "Repeat",
     "residual",
+    "scan",
+    "Scan",
     "select",
     "Select",
     "serial",
     "Serial",
     "sub",
+    "switch",
+    "Switch",
+    "while_loop",
+    "WhileLoop",
 ]
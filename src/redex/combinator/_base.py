@@ -1,13 +1,36 @@
 """The combinator base."""
 
+import copy
 import typing
-from typing import Any
-from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+from dataclasses import dataclass, fields
+from concurrent.futures import Executor
+from redex import util
 from redex.function import FineCallable
 
+
+class _CombinatorType(type):
+    """The metaclass making combinators frozen slotted dataclasses."""
+
+    def __new__(
+        mcs, name: str, bases: tuple[type, ...], namespace: Dict[str, Any]
+    ) -> Any:
+        cls: type = super().__new__(mcs, name, bases, namespace)
+        if "__slots__" in namespace:
+            # The base class, or the class already recreated with slots.
+            return cls
+        return util.slotted()(dataclass(cls, frozen=True))
+
+
 # pylint: disable=too-few-public-methods
-class Combinator(FineCallable):
-    """The base class for combinators."""
+class Combinator(FineCallable, metaclass=_CombinatorType):
+    """The base class for combinators.
+
+    Subclasses are frozen dataclasses without `__dict__`, so large trees
+    of combinators take less memory.
+    """
+
+    __slots__ = ()
 
     if typing.TYPE_CHECKING:
 
@@ -16,7 +39,76 @@ class Combinator(FineCallable):
             # This stub informs a type checker that this functon is implemented.
             pass
 
-    def __init_subclass__(cls) -> None:
-        """Makes subclass a dataclass."""
-        super().__init_subclass__()
-        dataclass(cls)
+    @property
+    def __verified__(self) -> bool:
+        # Combinators aren't verified unless they prove otherwise.
+        return False
+
+    async def acall(self, *inputs: Any) -> Any:
+        """Applies the combinator, awaiting outputs of its functions.
+
+        Combinators that don't compose other functions are applied
+        synchronously.
+
+        Args:
+            inputs: the stack to apply the combinator to.
+
+        Returns:
+            the same outputs as the call of the combinator.
+        """
+        call: Callable[..., Any] = getattr(self, "__call__")
+        return call(*inputs)
+
+    def stream(
+        self,
+        items: Iterable[Any],
+        chunk_size: int = 256,
+        target_latency: Optional[float] = None,
+        batched: bool = False,
+    ) -> Iterator[Any]:
+        """Lazily applies the combinator to each stack of the iterable.
+
+        See `redex.streaming.stream` for details.
+
+        Args:
+            items: an iterable of stacks.
+            chunk_size: a number of stacks taken from the iterable at a time
+                in the batched mode.
+            target_latency: a desired time (in seconds) to process a chunk
+                in the batched mode.
+            batched: whether chunks are applied in the batched mode.
+
+        Returns:
+            an iterator of outputs.
+        """
+        # The streaming mode depends on combinators.
+        # pylint: disable=import-outside-toplevel,cyclic-import
+        from redex.streaming import stream
+
+        func = typing.cast(Callable[..., Any], self)
+        return stream(func, items, chunk_size, target_latency, batched)
+
+    def __copy__(self) -> Any:
+        copied = object.__new__(type(self))
+        for field in fields(self):
+            object.__setattr__(copied, field.name, getattr(self, field.name))
+        return copied
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> Any:
+        copied = object.__new__(type(self))
+        memo[id(self)] = copied
+        for field in fields(self):
+            value = getattr(self, field.name)
+            # Executors are shared by copies, like by the original combinator.
+            if not isinstance(value, Executor):
+                value = copy.deepcopy(value, memo)
+            object.__setattr__(copied, field.name, value)
+        return copied
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {field.name: getattr(self, field.name) for field in fields(self)}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        for name, value in state.items():
+            # Fields of frozen dataclasses are set by the initializer.
+            object.__setattr__(self, name, value)
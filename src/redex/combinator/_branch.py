@@ -1,7 +1,8 @@
 """The branch combinator."""
 
-from typing import List
+from typing import List, Optional
 from functools import reduce
+from concurrent.futures import Executor
 from redex import util
 from redex import function as fn
 from redex.function import Fn, FnIter
@@ -10,7 +11,11 @@ from redex.combinator._parallel import parallel
 from redex.combinator._select import select
 
 
-def branch(*children: FnIter) -> Serial:
+def branch(
+    *children: FnIter,
+    executor: Optional[Executor] = None,
+    concurrency: Optional[int] = None,
+) -> Serial:
     """Creates a branch combinator.
 
     The combinator combines multiple branches of given functions
@@ -25,6 +30,10 @@ def branch(*children: FnIter) -> Serial:
 
     Args:
         children: a sequence of functions.
+        executor: an executor running the branches concurrently.
+            Defaults to running them one after another.
+        concurrency: a maximum number of branches awaited at the same
+            time by the asynchronous call. Defaults to no limit.
 
     Returns:
         a combinator.
@@ -33,7 +42,7 @@ def branch(*children: FnIter) -> Serial:
     indices = _estimate_branch_indices(flat_children)
     return serial(
         select(indices=indices),
-        parallel(*flat_children),
+        parallel(*flat_children, executor=executor, concurrency=concurrency),
     )
 
 
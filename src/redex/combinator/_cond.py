@@ -0,0 +1,172 @@
+"""The conditional combinators."""
+
+import operator
+from typing import List
+from dataclasses import field
+from redex import function as fn
+from redex.function import Fn, Signature
+from redex.stack import constrained_call, unchecked_call, Stack
+from redex.stack import stackmethod, is_verified, verify_stack_size
+from redex.combinator._base import Combinator
+from redex.combinator._serial import serial
+
+
+# pylint: disable=too-few-public-methods
+class Switch(Combinator):
+    """The switch combinator."""
+
+    selector: Fn
+    """a function of the top of the stack, which outputs an index of a case."""
+
+    selector_signature: Signature
+    """a signature of the selector."""
+
+    cases: List[Fn]
+    """functions, one of which is applied."""
+
+    cases_signatures: List[Signature]
+    """signatures of the functions."""
+
+    # pylint: disable=invalid-field-call
+    verified: bool = field(init=False, repr=False, compare=False)
+    """whether the stack is proven to hold enough inputs for the selector
+    and each case if it holds enough inputs for the combinator."""
+
+    def __post_init__(self) -> None:
+        signature = self.signature
+        verified = (
+            signature.reshape_plan is None
+            and signature.out_shape is None
+            and signature.n_in >= self.selector_signature.n_in
+            and is_verified(self.selector, self.selector_signature)
+            and all(
+                signature.n_in >= case_signature.n_in
+                and signature.n_out - signature.n_in
+                == case_signature.n_out - case_signature.n_in
+                and is_verified(case, case_signature)
+                for case, case_signature in zip(self.cases, self.cases_signatures)
+            )
+        )
+        object.__setattr__(self, "verified", verified)
+
+    @stackmethod
+    def __call__(self, stack: Stack) -> Stack:
+        if self.verified:
+            verify_stack_size(self, stack, self.signature)
+        return self.__stackcall__(stack)
+
+    def __stackcall__(self, stack: Stack) -> Stack:
+        call = unchecked_call if self.verified else constrained_call
+        # The selector's inputs stay on the stack for the case.
+        value = call(self.selector, stack, self.selector_signature)[0]
+        index = operator.index(value)
+        if not 0 <= index < len(self.cases):
+            raise ValueError(
+                f"The selector `{fn.infer_name(self.selector)}` returned `{index}`, "
+                f"but the switch has `{len(self.cases)}` cases."
+            )
+        return call(self.cases[index], stack, self.cases_signatures[index])
+
+    @property
+    def __verified__(self) -> bool:
+        return self.verified
+
+    @property
+    def __pure__(self) -> bool:
+        return fn.is_pure(self.selector) and all(fn.is_pure(c) for c in self.cases)
+
+
+def switch(selector: Fn, *cases: Fn) -> Switch:
+    """Creates a switch combinator.
+
+    The combinator applies only the case selected by its index. The selector
+    takes inputs from the top of the stack, but doesn't consume them. All
+    cases must change the size of the stack equally, so the combinator has
+    the same signature whichever case is selected.
+
+    >>> import operator as op
+    >>> from redex import combinator as cb
+    >>> def opcode(code: int, a: int, b: int) -> int:
+    ...     return code
+    >>> calc = cb.switch(opcode, *[cb.serial(cb.drop(), f) for f in (op.add, op.mul)])
+    >>> calc(0, 3, 4), calc(1, 3, 4)
+    (7, 12)
+
+    Args:
+        selector: a function with a single output, the index of the case.
+        cases: functions to select from.
+
+    Returns:
+        a combinator.
+
+    Raises:
+        ValueError: if the selector has other than a single output, there
+            are no cases, or cases change the size of the stack differently.
+    """
+    selector_signature = fn.infer_signature(selector)
+    if selector_signature.n_out != 1:
+        raise ValueError(
+            "The selector of the switch must output exactly one value. "
+            f"`{fn.infer_name(selector)}` outputs `{selector_signature.n_out}` values."
+        )
+    if not cases:
+        raise ValueError("The switch must have at least one case.")
+    cases_signatures = [fn.infer_signature(case) for case in cases]
+    first, *others = zip(cases, cases_signatures)
+    for case, case_signature in others:
+        if case_signature.n_out - case_signature.n_in != (
+            first[1].n_out - first[1].n_in
+        ):
+            raise ValueError(
+                "Cases of the switch must change the size of the stack equally. "
+                f"`{fn.infer_name(first[0])}` takes `{first[1].n_in}` values "
+                f"and outputs `{first[1].n_out}` values, but "
+                f"`{fn.infer_name(case)}` takes `{case_signature.n_in}` values "
+                f"and outputs `{case_signature.n_out}` values."
+            )
+    n_in = max([selector_signature.n_in, *[s.n_in for s in cases_signatures]])
+    n_out = n_in + first[1].n_out - first[1].n_in
+    return Switch(
+        signature=fn.intern_signature(Signature(n_in=n_in, n_out=n_out)),
+        selector=selector,
+        selector_signature=selector_signature,
+        cases=list(cases),
+        cases_signatures=cases_signatures,
+    )
+
+
+def cond(predicate: Fn, then_branch: Fn, else_branch: Fn) -> Switch:
+    """Creates a conditional combinator.
+
+    The combinator applies the first function if the predicate holds, and
+    the second one otherwise. Like the selector of `switch`, the predicate
+    doesn't consume its inputs.
+
+    >>> import operator as op
+    >>> from redex import combinator as cb
+    >>> def is_negative(a: int) -> bool:
+    ...     return a < 0
+    >>> absolute = cb.cond(is_negative, op.neg, cb.identity(1))
+    >>> absolute(-3), absolute(3)
+    (3, 3)
+
+    Args:
+        predicate: a function with a single output.
+        then_branch: a function applied if the predicate holds.
+        else_branch: a function applied otherwise.
+
+    Returns:
+        a switch combinator, whose selector is the predicate converted
+        to `bool`, with the second function as the first case.
+
+    Raises:
+        ValueError: if the predicate has other than a single output, or
+            functions change the size of the stack differently.
+    """
+    predicate_signature = fn.infer_signature(predicate)
+    if predicate_signature.n_out != 1:
+        raise ValueError(
+            "The predicate of the conditional must output exactly one value. "
+            f"`{fn.infer_name(predicate)}` outputs `{predicate_signature.n_out}` values."
+        )
+    return switch(serial(predicate, bool), else_branch, then_branch)
@@ -1,5 +1,6 @@
 """The drop combinator."""
 
+from redex import function as fn
 from redex.function import Signature
 from redex.stack import stackmethod, verify_stack_size, Stack
 from redex.combinator._base import Combinator
@@ -11,9 +12,20 @@ class Drop(Combinator):
     @stackmethod
     def __call__(self, stack: Stack) -> Stack:
         verify_stack_size(self, stack, self.signature)
+        return self.__stackcall__(stack)
+
+    def __stackcall__(self, stack: Stack) -> Stack:
         n_in = self.signature.n_in
         return stack[n_in:]
 
+    @property
+    def __verified__(self) -> bool:
+        return True
+
+    @property
+    def __pure__(self) -> bool:
+        return True
+
 
 def drop(n_in: int = 1) -> Drop:
     """Creates a drop combinator.
@@ -31,4 +43,4 @@ def drop(n_in: int = 1) -> Drop:
     Returns:
         a combinator.
     """
-    return Drop(signature=Signature(n_in=n_in, n_out=0))
+    return Drop(signature=fn.intern_signature(Signature(n_in=n_in, n_out=0)))
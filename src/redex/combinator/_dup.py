@@ -1,6 +1,7 @@
 """The duplicate combinator."""
 
 from redex.stack import stackmethod, verify_stack_size, Stack
+from redex import function as fn
 from redex.function import Signature
 from redex.combinator._base import Combinator
 
@@ -11,10 +12,21 @@ class Dup(Combinator):
     @stackmethod
     def __call__(self, stack: Stack) -> Stack:
         verify_stack_size(self, stack, self.signature)
+        return self.__stackcall__(stack)
+
+    def __stackcall__(self, stack: Stack) -> Stack:
         n_in = self.signature.n_in
         head, tail = stack[:n_in], stack[n_in:]
         return (*head, *head, *tail)
 
+    @property
+    def __verified__(self) -> bool:
+        return True
+
+    @property
+    def __pure__(self) -> bool:
+        return True
+
 
 def dup(n_in: int = 1) -> Dup:
     """Creates a duplicate combinator.
@@ -32,4 +44,4 @@ def dup(n_in: int = 1) -> Dup:
     Returns:
         a combinator.
     """
-    return Dup(signature=Signature(n_in=n_in, n_out=n_in * 2))
+    return Dup(signature=fn.intern_signature(Signature(n_in=n_in, n_out=n_in * 2)))
@@ -1,6 +1,7 @@
 """The identity operator."""
 
 from redex.stack import stackmethod, verify_stack_size, Stack
+from redex import function as fn
 from redex.function import Signature
 from redex.combinator._base import Combinator
 
@@ -14,6 +15,17 @@ class Identity(Combinator):
         verify_stack_size(self, stack, self.signature)
         return stack
 
+    def __stackcall__(self, stack: Stack) -> Stack:
+        return stack
+
+    @property
+    def __verified__(self) -> bool:
+        return True
+
+    @property
+    def __pure__(self) -> bool:
+        return True
+
 
 def identity(n_in: int = 1) -> Identity:
     """Always returns the same values that were used as arguments.
@@ -29,4 +41,4 @@ def identity(n_in: int = 1) -> Identity:
     Returns:
         a combinator.
     """
-    return Identity(signature=Signature(n_in=n_in, n_out=n_in))
+    return Identity(signature=fn.intern_signature(Signature(n_in=n_in, n_out=n_in)))
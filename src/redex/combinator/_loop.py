@@ -0,0 +1,319 @@
+"""The loop combinators."""
+
+from dataclasses import field
+from redex import function as fn
+from redex.function import Fn, Signature
+from redex.stack import constrained_call, unchecked_call, Stack
+from redex.stack import stackmethod, is_verified, verify_stack_size
+from redex.combinator._base import Combinator
+
+
+# pylint: disable=too-few-public-methods
+class Repeat(Combinator):
+    """The repeat combinator."""
+
+    body: Fn
+    """a repeated function."""
+
+    body_signature: Signature
+    """a signature of the repeated function."""
+
+    times: int
+    """a number of repetitions."""
+
+    # pylint: disable=invalid-field-call
+    verified: bool = field(init=False, repr=False, compare=False)
+    """whether the stack is proven to hold enough inputs for each repetition
+    if it holds enough inputs for the combinator."""
+
+    def __post_init__(self) -> None:
+        derived = _repeat_signature(self.body_signature, self.times)
+        verified = (
+            _is_plain(self.signature)
+            and (self.signature.n_in, self.signature.n_out) == derived
+            and is_verified(self.body, self.body_signature)
+        )
+        object.__setattr__(self, "verified", verified)
+
+    @stackmethod
+    def __call__(self, stack: Stack) -> Stack:
+        if self.verified:
+            verify_stack_size(self, stack, self.signature)
+        return self.__stackcall__(stack)
+
+    def __stackcall__(self, stack: Stack) -> Stack:
+        call = unchecked_call if self.verified else constrained_call
+        body, signature = self.body, self.body_signature
+        for _ in range(self.times):
+            stack = call(body, stack, signature)
+        return stack
+
+    @property
+    def __verified__(self) -> bool:
+        return self.verified
+
+    @property
+    def __pure__(self) -> bool:
+        return fn.is_pure(self.body)
+
+
+def repeat(body: Fn, times: int) -> Repeat:
+    """Creates a repeat combinator.
+
+    The combinator applies the function the given number of times, like
+    `serial(*[body] * times)` does, but the function isn't copied.
+
+    >>> import operator as op
+    >>> from redex import combinator as cb
+    >>> cb.repeat(op.add, times=3)(1, 2, 3, 4) == 1 + 2 + 3 + 4
+    True
+
+    Args:
+        body: a function to repeat.
+        times: a number of repetitions.
+
+    Returns:
+        a combinator.
+
+    Raises:
+        ValueError: if the number of repetitions is negative.
+    """
+    if times < 0:
+        raise ValueError(f"The number of repetitions must not be negative: {times}.")
+    body_signature = fn.infer_signature(body)
+    n_in, n_out = _repeat_signature(body_signature, times)
+    return Repeat(
+        signature=fn.intern_signature(Signature(n_in=n_in, n_out=n_out)),
+        body=body,
+        body_signature=body_signature,
+        times=times,
+    )
+
+
+# pylint: disable=too-few-public-methods
+class WhileLoop(Combinator):
+    """The while loop combinator."""
+
+    cond: Fn
+    """a predicate on the top of the stack."""
+
+    cond_signature: Signature
+    """a signature of the predicate."""
+
+    body: Fn
+    """a function applied while the predicate holds."""
+
+    body_signature: Signature
+    """a signature of the function."""
+
+    # pylint: disable=invalid-field-call
+    verified: bool = field(init=False, repr=False, compare=False)
+    """whether the stack is proven to hold enough inputs for the predicate
+    and each iteration if it holds enough inputs for the combinator."""
+
+    def __post_init__(self) -> None:
+        signature = self.signature
+        verified = (
+            _is_plain(signature)
+            and signature.n_in == signature.n_out
+            and signature.n_in >= self.cond_signature.n_in
+            and signature.n_in >= self.body_signature.n_in
+            and is_verified(self.cond, self.cond_signature)
+            and is_verified(self.body, self.body_signature)
+        )
+        object.__setattr__(self, "verified", verified)
+
+    @stackmethod
+    def __call__(self, stack: Stack) -> Stack:
+        if self.verified:
+            verify_stack_size(self, stack, self.signature)
+        return self.__stackcall__(stack)
+
+    def __stackcall__(self, stack: Stack) -> Stack:
+        call = unchecked_call if self.verified else constrained_call
+        cond, cond_signature = self.cond, self.cond_signature
+        body, body_signature = self.body, self.body_signature
+        # The predicate's inputs stay on the stack for the function.
+        while call(cond, stack, cond_signature)[0]:
+            stack = call(body, stack, body_signature)
+        return stack
+
+    @property
+    def __verified__(self) -> bool:
+        return self.verified
+
+    @property
+    def __pure__(self) -> bool:
+        return fn.is_pure(self.cond) and fn.is_pure(self.body)
+
+
+def while_loop(cond: Fn, body: Fn) -> WhileLoop:
+    """Creates a while loop combinator.
+
+    The combinator applies the function while the predicate holds.
+    The predicate takes inputs from the top of the stack, but doesn't
+    consume them. The number of iterations depends on data, so the function
+    must output as many values as it takes.
+
+    >>> from redex import combinator as cb
+    >>> def halve(a: int) -> int:
+    ...     return a // 2
+    >>> cb.while_loop(lambda a: a > 10, halve)(100)
+    6
+
+    Args:
+        cond: a predicate with a single output.
+        body: a function to apply.
+
+    Returns:
+        a combinator.
+
+    Raises:
+        ValueError: if the predicate has other than a single output, or
+            the function changes the size of the stack.
+    """
+    cond_signature = fn.infer_signature(cond)
+    if cond_signature.n_out != 1:
+        raise ValueError(
+            "The predicate of the while loop must output exactly one value. "
+            f"`{fn.infer_name(cond)}` outputs `{cond_signature.n_out}` values."
+        )
+    body_signature = fn.infer_signature(body)
+    if body_signature.n_in != body_signature.n_out:
+        raise ValueError(
+            "The body of the while loop must output as many values as it takes. "
+            f"`{fn.infer_name(body)}` takes `{body_signature.n_in}` values, "
+            f"but outputs `{body_signature.n_out}` values."
+        )
+    n_in = max(cond_signature.n_in, body_signature.n_in)
+    return WhileLoop(
+        signature=fn.intern_signature(Signature(n_in=n_in, n_out=n_in)),
+        cond=cond,
+        cond_signature=cond_signature,
+        body=body,
+        body_signature=body_signature,
+    )
+
+
+# pylint: disable=too-few-public-methods
+class Scan(Combinator):
+    """The scan combinator."""
+
+    body: Fn
+    """a function of carried values and an item."""
+
+    body_signature: Signature
+    """a signature of the function."""
+
+    n: int
+    """a number of scanned items."""
+
+    # pylint: disable=invalid-field-call
+    verified: bool = field(init=False, repr=False, compare=False)
+    """whether the stack is proven to hold enough inputs for each iteration
+    if it holds enough inputs for the combinator."""
+
+    def __post_init__(self) -> None:
+        body_signature = self.body_signature
+        n_carry = body_signature.n_in - 1
+        verified = (
+            _is_plain(self.signature)
+            and body_signature.n_in == body_signature.n_out >= 1
+            and self.signature.n_in == self.signature.n_out == n_carry + self.n
+            and is_verified(self.body, body_signature)
+        )
+        object.__setattr__(self, "verified", verified)
+
+    @stackmethod
+    def __call__(self, stack: Stack) -> Stack:
+        if self.verified:
+            verify_stack_size(self, stack, self.signature)
+        return self.__stackcall__(stack)
+
+    def __stackcall__(self, stack: Stack) -> Stack:
+        if not self.verified:
+            # Items are sliced from the stack, so missing ones aren't caught
+            # by calls of the function.
+            verify_stack_size(self, stack, self.signature)
+        call = unchecked_call if self.verified else constrained_call
+        body, signature = self.body, self.body_signature
+        n_carry = signature.n_in - 1
+        carry, items = stack[:n_carry], stack[n_carry : n_carry + self.n]
+        outputs = []
+        for item in items:
+            result = call(body, (*carry, item), signature)
+            carry = result[:n_carry]
+            outputs.append(result[n_carry])
+        return (*carry, *outputs, *stack[n_carry + self.n :])
+
+    @property
+    def __verified__(self) -> bool:
+        return self.verified
+
+    @property
+    def __pure__(self) -> bool:
+        return fn.is_pure(self.body)
+
+
+def scan(body: Fn, n: int) -> Scan:
+    """Creates a scan combinator.
+
+    The combinator applies the function to each of `n` items below
+    the carried values on the top of the stack. The function takes
+    the carried values and an item, and outputs new carried values and
+    an output of the item. The combinator outputs the final carried
+    values followed by outputs of all items.
+
+    >>> import operator as op
+    >>> from redex import combinator as cb
+    >>> def cumsum(total: int, item: int) -> tuple[int, int]:
+    ...     total += item
+    ...     return total, total
+    >>> cb.scan(cumsum, n=4)(0, 1, 2, 3, 4)
+    (10, 1, 3, 6, 10)
+
+    Args:
+        body: a function of carried values and an item, which outputs
+            as many values as it takes.
+        n: a number of items to scan.
+
+    Returns:
+        a combinator.
+
+    Raises:
+        ValueError: if the function doesn't output as many values as it takes,
+            or the number of items is negative.
+    """
+    if n < 0:
+        raise ValueError(f"The number of scanned items must not be negative: {n}.")
+    body_signature = fn.infer_signature(body)
+    if body_signature.n_in < 1 or body_signature.n_in != body_signature.n_out:
+        raise ValueError(
+            "The body of the scan must take carried values and an item, and "
+            "output as many values. "
+            f"`{fn.infer_name(body)}` takes `{body_signature.n_in}` values, "
+            f"but outputs `{body_signature.n_out}` values."
+        )
+    n_in = body_signature.n_in - 1 + n
+    return Scan(
+        signature=fn.intern_signature(Signature(n_in=n_in, n_out=n_in)),
+        body=body,
+        body_signature=body_signature,
+        n=n,
+    )
+
+
+def _repeat_signature(signature: Signature, times: int) -> tuple[int, int]:
+    """Estimates numbers of inputs and outputs of the repeated function,
+    like the serial combinator does for copies of the function."""
+    if times == 0:
+        return 0, 0
+    consumed = signature.n_in - signature.n_out
+    # The deepest item is taken either by the first or the last repetition.
+    n_in = signature.n_in + max(consumed, 0) * (times - 1)
+    return n_in, n_in - consumed * times
+
+
+def _is_plain(signature: Signature) -> bool:
+    """Checks that inputs aren't reshaped and outputs aren't declared."""
+    return signature.reshape_plan is None and signature.out_shape is None
@@ -0,0 +1,312 @@
+"""The memoization combinator."""
+
+import sys
+import heapq
+import hashlib
+import time
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional
+from dataclasses import dataclass, field
+from redex import function as fn
+from redex.function import Fn, Signature
+from redex.stack import constrained_call, is_verified, stackmethod, Stack
+from redex.combinator._base import Combinator
+
+KeyFn = Callable[..., Hashable]
+"""The function making a cache key from inputs."""
+
+
+@dataclass
+class _Entry:
+    """The cached outputs."""
+
+    outputs: Stack
+    """cached outputs."""
+
+    value: float
+    """a compute cost of outputs per byte."""
+
+    size: int
+    """an estimated size of outputs (in bytes)."""
+
+    inputs: Stack
+    """inputs kept alive while they are identified by identity in the key."""
+
+    priority: float = 0.0
+    """a priority of the entry to stay in the cache."""
+
+    stamp: int = 0
+    """a number of the latest prioritization of the entry."""
+
+
+# pylint: disable=too-many-instance-attributes
+class MemoCache:
+    """The bounded cache evicting outputs that are cheap to compute again.
+
+    Entries are evicted by the GreedyDual-Size policy: each entry is
+    prioritized by its compute cost per byte, and priorities of entries
+    that are used again grow over the priorities of evicted ones. So,
+    the cache keeps recently used, expensive to compute, and small outputs.
+    """
+
+    def __init__(
+        self,
+        maxsize: Optional[int] = 128,
+        max_bytes: Optional[int] = None,
+    ) -> None:
+        """Initializes the cache.
+
+        Args:
+            maxsize: a maximum number of entries, or `None` if unbounded.
+            max_bytes: a maximum estimated size of cached outputs (in bytes),
+                or `None` if unbounded.
+        """
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.n_bytes = 0
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._heap: List[tuple[float, int, Hashable]] = []
+        self._inflation = 0.0
+        self._counter = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Stack]:
+        """Finds cached outputs.
+
+        Args:
+            key: a key of inputs.
+
+        Returns:
+            cached outputs, or `None` if they aren't cached.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            # The entry is prioritized again as recently used.
+            self._push(key, entry, self._inflation + entry.value)
+            return entry.outputs
+
+    def put(self, key: Hashable, outputs: Stack, cost: float, inputs: Stack) -> None:
+        """Caches outputs, evicting other entries if the cache is full.
+
+        Args:
+            key: a key of inputs.
+            outputs: outputs to cache.
+            cost: a time (in seconds) the outputs were computed.
+            inputs: inputs to keep alive along with the outputs.
+        """
+        size = sum(_sizeof(item) for item in outputs) + sys.getsizeof(outputs)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                return
+            entry = _Entry(outputs=outputs, value=cost / size, size=size, inputs=inputs)
+            self._entries[key] = entry
+            self.n_bytes += size
+            self._push(key, entry, self._inflation + entry.value)
+            while self._is_full():
+                self._evict()
+
+    def clear(self) -> None:
+        """Removes all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._heap.clear()
+            self._inflation = 0.0
+            self.n_bytes = 0
+
+    def _push(self, key: Hashable, entry: _Entry, priority: float) -> None:
+        self._counter += 1
+        entry.priority, entry.stamp = priority, self._counter
+        heapq.heappush(self._heap, (priority, self._counter, key))
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            # Drop stale items left by entries prioritized again.
+            self._heap = [(e.priority, e.stamp, k) for k, e in self._entries.items()]
+            heapq.heapify(self._heap)
+
+    def _is_full(self) -> bool:
+        if self.maxsize is not None and len(self._entries) > self.maxsize:
+            return True
+        return self.max_bytes is not None and self.n_bytes > self.max_bytes
+
+    def _evict(self) -> None:
+        while self._heap:
+            priority, stamp, key = heapq.heappop(self._heap)
+            entry = self._entries.get(key)
+            # Entries prioritized again have stale items in the heap.
+            if entry is not None and entry.stamp == stamp:
+                # Entries prioritized later start from the evicted priority.
+                self._inflation = priority
+                del self._entries[key]
+                self.n_bytes -= entry.size
+                return
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Only the bounds are pickled, cached outputs are computed again.
+        return {"maxsize": self.maxsize, "max_bytes": self.max_bytes}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        # pylint: disable=unnecessary-dunder-call
+        self.__init__(**state)  # type: ignore[misc]
+
+
+# pylint: disable=too-few-public-methods
+class Memo(Combinator):
+    """The memoization combinator."""
+
+    child: Fn
+    """a memoized function."""
+
+    child_signature: Signature
+    """a signature of the memoized function."""
+
+    key: Optional[KeyFn] = None
+    """a function making a cache key from inputs."""
+
+    by_identity: bool = False
+    """whether arrays are identified by their identity instead of content."""
+
+    # pylint: disable=invalid-field-call
+    cache: MemoCache = field(default_factory=MemoCache, repr=False, compare=False)
+    """cached outputs."""
+
+    @stackmethod
+    def __call__(self, stack: Stack) -> Stack:
+        # pylint: disable=no-member
+        n_in = self.signature.n_in
+        inputs = stack[:n_in]
+        if self.key is not None:
+            key = self.key(*inputs)
+        else:
+            key = make_key(inputs, self.by_identity)
+        outputs = self.cache.get(key)
+        if outputs is None:
+            start = time.perf_counter()
+            outputs = constrained_call(self.child, inputs, self.child_signature)
+            cost = time.perf_counter() - start
+            self.cache.put(key, outputs, cost, inputs if self.by_identity else ())
+        return outputs + stack[n_in:]
+
+    @property
+    def __verified__(self) -> bool:
+        signature = self.signature
+        return (
+            signature.n_in == self.child_signature.n_in
+            and signature.n_out == self.child_signature.n_out
+            and is_verified(self.child, self.child_signature)
+        )
+
+    @property
+    def __pure__(self) -> bool:
+        return fn.is_pure(self.child)
+
+
+def memo(
+    child: Fn,
+    maxsize: Optional[int] = 128,
+    max_bytes: Optional[int] = None,
+    key: Optional[KeyFn] = None,
+    by_identity: bool = False,
+) -> Memo:
+    """Creates a memoization combinator.
+
+    The combinator caches outputs of the function keyed by its inputs.
+    The function must be pure: its outputs must depend only on its inputs.
+
+    >>> import operator as op
+    >>> from redex import combinator as cb
+    >>> memo = cb.memo(op.add, maxsize=2)
+    >>> memo(1, 2) == memo(1, 2) == 3
+    True
+    >>> memo.cache.hits, memo.cache.misses
+    (1, 1)
+
+    NumPy arrays (or any other objects of the buffer protocol) are keyed
+    by a digest of their content, or by identity if the arrays aren't
+    modified in place.
+
+    Args:
+        child: a function to memoize.
+        maxsize: a maximum number of cached outputs. `None` means unbounded.
+        max_bytes: a maximum estimated size of cached outputs (in bytes).
+            `None` means unbounded.
+        key: a function making a hashable key from inputs. Defaults to
+            a tuple of inputs.
+        by_identity: whether arrays are keyed by identity instead of content.
+
+    Returns:
+        a combinator.
+    """
+    child_signature = fn.infer_signature(child)
+    return Memo(
+        signature=fn.intern_signature(
+            Signature(n_in=child_signature.n_in, n_out=child_signature.n_out)
+        ),
+        child=child,
+        child_signature=child_signature,
+        key=key,
+        by_identity=by_identity,
+        cache=MemoCache(maxsize=maxsize, max_bytes=max_bytes),
+    )
+
+
+def make_key(inputs: Stack, by_identity: bool = False) -> Hashable:
+    """Makes a hashable cache key from inputs.
+
+    Args:
+        inputs: inputs of the function.
+        by_identity: whether arrays are keyed by identity instead of content.
+
+    Returns:
+        a key.
+
+    Raises:
+        TypeError: if some input is neither hashable nor an array.
+    """
+    return tuple(_item_key(item, by_identity) for item in inputs)
+
+
+def _item_key(item: Any, by_identity: bool) -> Hashable:
+    if getattr(item, "__hash__", None) is not None:
+        hashable: Hashable = item
+        return hashable
+    if hasattr(item, "__array_interface__"):
+        if by_identity:
+            return ("id", id(item))
+        array_interface = item.__array_interface__
+        return (
+            "array",
+            array_interface["typestr"],
+            array_interface["shape"],
+            _digest(item),
+        )
+    raise TypeError(
+        f"Cannot memoize inputs of the unhashable type `{type(item).__name__}`. "
+        "Pass the `key` function making a hashable key from them."
+    )
+
+
+def _digest(array: Any) -> bytes:
+    """Hashes contents of the array, so keys don't copy them."""
+    try:
+        return hashlib.blake2b(array, digest_size=32).digest()
+    except (BufferError, TypeError, ValueError):
+        # Arrays that aren't contiguous are hashed in order of their elements.
+        return hashlib.blake2b(array.tobytes(), digest_size=32).digest()
+
+
+def _sizeof(item: Any) -> int:
+    """Estimates a size of the object (in bytes)."""
+    n_bytes = getattr(item, "nbytes", None)
+    if isinstance(n_bytes, int):
+        return n_bytes
+    return sys.getsizeof(item)
@@ -1,12 +1,17 @@
 """The parallel combinator."""
 
-from typing import List
+import asyncio
+import contextvars
+from typing import Any, Awaitable, Dict, List, Optional
 from functools import reduce
-from dataclasses import replace
+from dataclasses import field, replace
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
 from redex import util
+from redex import observer
 from redex import function as fn
 from redex.function import Fn, FnIter, Signature
-from redex.stack import constrained_call, stackmethod, Stack
+from redex.stack import constrained_acall, constrained_call, unchecked_call, Stack
+from redex.stack import astackmethod, stackmethod, is_verified, verify_stack_size
 from redex.combinator._base import Combinator
 
 # pylint: disable=too-few-public-methods
@@ -22,17 +27,129 @@ class Parallel(Combinator):
     children_signatures: List[Signature]
     """signatures of the composite functions."""
 
+    # pylint: disable=invalid-field-call
+    executor: Optional[Executor] = field(default=None, repr=False, compare=False)
+    """an executor running the composite functions concurrently, or `None`
+    to run them one after another."""
+
+    concurrency: Optional[int] = field(default=None, compare=False)
+    """a maximum number of the composite functions awaited at the same time
+    by the asynchronous call, or `None` if unlimited."""
+
+    verified: bool = field(init=False, repr=False, compare=False)
+    """whether the stack is proven to hold enough inputs for each function
+    if it holds enough inputs for the combinator."""
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "verified", self._verify())
+
     @stackmethod
     def __call__(self, stack: Stack) -> Stack:
+        if self.verified:
+            # Only the top-level inputs are verified.
+            verify_stack_size(self, stack, self.signature)
+        return self.__stackcall__(stack)
+
+    def __stackcall__(self, stack: Stack) -> Stack:
+        if self.executor is not None and len(self.children) > 1:
+            return self._call_concurrently(stack, self.executor)
+        call = unchecked_call if self.verified else constrained_call
         outputs = Stack()
-        for i, child in enumerate(self.children):
-            signature = self.children_signatures[i]
+        for child, signature in zip(self.children, self.children_signatures):
+            n_lower, n_upper = signature.index_bounds
+            outputs += call(child, stack[n_lower:n_upper], signature)
+        return outputs + stack[self.signature.n_in :]
+
+    def _verify(self) -> bool:
+        signature = self.signature
+        if signature.reshape_plan is not None or signature.out_shape is not None:
+            return False
+        if len(self.children) != len(self.children_signatures):
+            return False
+        n_out = 0
+        for child, child_signature in zip(self.children, self.children_signatures):
+            n_lower, n_upper = child_signature.index_bounds
+            if n_lower < 0 or n_upper > signature.n_in:
+                return False
+            if not is_verified(child, child_signature):
+                return False
+            n_out += child_signature.n_out
+        return n_out == signature.n_out
+
+    def _call_concurrently(self, stack: Stack, executor: Executor) -> Stack:
+        calls: List[_Call] = []
+        for child, signature in zip(self.children, self.children_signatures):
             n_lower, n_upper = signature.index_bounds
-            outputs += constrained_call(child, stack[n_lower:n_upper], signature)
+            calls.append((child, stack[n_lower:n_upper], signature))
+
+        # The first child runs in the calling thread, which would wait otherwise.
+        futures: List[Future[Stack]] = []
+        if isinstance(executor, ThreadPoolExecutor):
+            # Calls in threads are observed as nested ones.
+            contexts = observer.fork(len(calls))
+            for context, call in zip(contexts[1:], calls[1:]):
+                futures.append(executor.submit(_call_in_context, context, call))
+            outputs = _call_in_context(contexts[0], calls[0])
+        else:
+            for call in calls[1:]:
+                futures.append(executor.submit(constrained_call, *call))
+            outputs = constrained_call(*calls[0])
+
+        for future in futures:
+            outputs += future.result()
         return outputs + stack[self.signature.n_in :]
 
+    # pylint: disable=arguments-differ
+    @astackmethod
+    async def acall(self, stack: Stack) -> Stack:
+        """Applies the functions concurrently, awaiting their outputs."""
+        calls: List[Awaitable[Stack]] = []
+        for child, signature in zip(self.children, self.children_signatures):
+            n_lower, n_upper = signature.index_bounds
+            calls.append(constrained_acall(child, stack[n_lower:n_upper], signature))
+
+        if self.concurrency is not None:
+            semaphore = asyncio.Semaphore(self.concurrency)
+            calls = [_acquire_and_await(semaphore, call) for call in calls]
+
+        outputs = Stack()
+        for child_outputs in await asyncio.gather(*calls):
+            outputs += child_outputs
+        return outputs + stack[self.signature.n_in :]
+
+    @property
+    def __verified__(self) -> bool:
+        return self.verified
+
+    @property
+    def __pure__(self) -> bool:
+        return all(fn.is_pure(child) for child in self.children)
 
-def parallel(*children: FnIter) -> Parallel:
+    def __getstate__(self) -> Dict[str, Any]:
+        # Executors can't be passed to other processes.
+        return {**Combinator.__getstate__(self), "executor": None}
+
+
+_Call = tuple[Fn, Stack, Signature]
+
+
+def _call_in_context(context: contextvars.Context, call: _Call) -> Stack:
+    outputs: Stack = context.run(constrained_call, *call)
+    return outputs
+
+
+async def _acquire_and_await(
+    semaphore: asyncio.Semaphore, call: Awaitable[Stack]
+) -> Stack:
+    async with semaphore:
+        return await call
+
+
+def parallel(
+    *children: FnIter,
+    executor: Optional[Executor] = None,
+    concurrency: Optional[int] = None,
+) -> Parallel:
     """Creates a parallel combinator.
 
     The combinator applies functions in parallel to its inputs. Each function
@@ -45,8 +162,30 @@ def parallel(*children: FnIter) -> Parallel:
     >>> parallel(1, 2, 3, 4) == (1 + 2, 3 + 4)
     True
 
+    The functions may run concurrently, if an executor is given. Outputs
+    keep the order of the functions.
+
+    >>> from concurrent.futures import ThreadPoolExecutor
+    >>> with ThreadPoolExecutor() as executor:
+    ...     parallel = cb.parallel(op.add, op.add, executor=executor)
+    ...     parallel(1, 2, 3, 4) == (1 + 2, 3 + 4)
+    True
+
+    The asynchronous call awaits coroutine functions concurrently.
+
+    >>> import asyncio
+    >>> async def add(a, b):
+    ...     await asyncio.sleep(0.01)
+    ...     return a + b
+    >>> asyncio.run(cb.parallel(add, add).acall(1, 2, 3, 4))
+    (3, 7)
+
     Args:
         children: a sequence of functions.
+        executor: an executor running the functions concurrently.
+            Defaults to running them one after another.
+        concurrency: a maximum number of functions awaited at the same
+            time by the asynchronous call. Defaults to no limit.
 
     Returns:
         a combinator.
@@ -57,6 +196,8 @@ def parallel(*children: FnIter) -> Parallel:
         signature=signature,
         children=flat_children,
         children_signatures=children_signatures,
+        executor=executor,
+        concurrency=concurrency,
     )
 
 
@@ -68,7 +209,9 @@ def _estimate_parallel_signatures(
 ) -> tuple[Signature, List[Signature]]:
     def count(acc: _Initializer, child: Fn) -> _Initializer:
         in_total, out_total, signatures = acc
-        signature = replace(fn.infer_signature(child), start_index=in_total)
+        signature = fn.intern_signature(
+            replace(fn.infer_signature(child), start_index=in_total)
+        )
         return (
             in_total + signature.n_in,
             out_total + signature.n_out,
@@ -77,4 +220,5 @@ def _estimate_parallel_signatures(
 
     initializer: _Initializer = (0, 0, [])
     in_total, out_total, children_signatures = reduce(count, children, initializer)
-    return Signature(n_in=in_total, n_out=out_total), children_signatures
+    signature = Signature(n_in=in_total, n_out=out_total)
+    return fn.intern_signature(signature), children_signatures
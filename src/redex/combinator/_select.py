@@ -1,6 +1,7 @@
 """The select combinator."""
 
 from typing import Optional, List
+from redex import function as fn
 from redex.function import Signature
 from redex.stack import stackmethod, Stack
 from redex.combinator._base import Combinator
@@ -14,9 +15,20 @@ class Select(Combinator):
 
     @stackmethod
     def __call__(self, stack: Stack) -> Stack:
+        return self.__stackcall__(stack)
+
+    def __stackcall__(self, stack: Stack) -> Stack:
         selected = tuple(stack[i] for i in self.indices)
         return selected + stack[self.signature.n_in :]
 
+    @property
+    def __verified__(self) -> bool:
+        return True
+
+    @property
+    def __pure__(self) -> bool:
+        return True
+
 
 def select(indices: List[int], n_in: Optional[int] = None) -> Select:
     """Creates a select combinator.
@@ -41,4 +53,7 @@ def select(indices: List[int], n_in: Optional[int] = None) -> Select:
     if n_in is None:
         n_in = max(indices) + 1 if len(indices) != 0 else 0
 
-    return Select(signature=Signature(n_in=n_in, n_out=n_out), indices=indices)
+    return Select(
+        signature=fn.intern_signature(Signature(n_in=n_in, n_out=n_out)),
+        indices=indices,
+    )
@@ -2,11 +2,13 @@
 
 from typing import List
 from functools import reduce
+from dataclasses import field
 from redex.combinator._base import Combinator
 from redex import util
 from redex import function as fn
 from redex.function import Fn, FnIter, Signature
-from redex.stack import constrained_call, stackmethod, Stack
+from redex.stack import constrained_acall, constrained_call, unchecked_call, Stack
+from redex.stack import astackmethod, stackmethod, is_verified, verify_stack_size
 
 
 # pylint: disable=too-few-public-methods
@@ -18,13 +20,59 @@ class Serial(Combinator):
     children_signatures: List[Signature]
     """signatures of the composite functions."""
 
+    # pylint: disable=invalid-field-call
+    verified: bool = field(init=False, repr=False, compare=False)
+    """whether the stack is proven to hold enough inputs for each function
+    if it holds enough inputs for the combinator."""
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "verified", self._verify())
+
     @stackmethod
     def __call__(self, stack: Stack) -> Stack:
-        for i, child in enumerate(self.children):
-            signature = self.children_signatures[i]
-            stack = constrained_call(child, stack, signature)
+        if self.verified:
+            # Only the top-level inputs are verified.
+            verify_stack_size(self, stack, self.signature)
+        return self.__stackcall__(stack)
+
+    def __stackcall__(self, stack: Stack) -> Stack:
+        call = unchecked_call if self.verified else constrained_call
+        for child, signature in zip(self.children, self.children_signatures):
+            stack = call(child, stack, signature)
+        return stack
+
+    def _verify(self) -> bool:
+        signature = self.signature
+        if signature.reshape_plan is not None or signature.out_shape is not None:
+            return False
+        if len(self.children) != len(self.children_signatures):
+            return False
+        # The number of stack items available to the next function.
+        n_items = signature.n_in
+        for child, child_signature in zip(self.children, self.children_signatures):
+            if child_signature.n_in > n_items:
+                return False
+            if not is_verified(child, child_signature):
+                return False
+            n_items += child_signature.n_out - child_signature.n_in
+        return n_items == signature.n_out
+
+    # pylint: disable=arguments-differ
+    @astackmethod
+    async def acall(self, stack: Stack) -> Stack:
+        """Applies the functions in series, awaiting their outputs."""
+        for child, signature in zip(self.children, self.children_signatures):
+            stack = await constrained_acall(child, stack, signature)
         return stack
 
+    @property
+    def __verified__(self) -> bool:
+        return self.verified
+
+    @property
+    def __pure__(self) -> bool:
+        return all(fn.is_pure(child) for child in self.children)
+
 
 def serial(*children: FnIter) -> Serial:
     """Creates a serial combinator.
@@ -37,6 +85,14 @@ def serial(*children: FnIter) -> Serial:
     >>> serial(1, 2, 3, 4) == 1 + 2 + 3 + 4
     True
 
+    Coroutine functions are awaited by the asynchronous call.
+
+    >>> import asyncio
+    >>> async def add(a, b):
+    ...     return a + b
+    >>> asyncio.run(cb.serial(add, op.neg).acall(1, 2))
+    -3
+
     Args:
         children: a sequence of functions.
 
@@ -70,4 +126,5 @@ def _estimate_sequential_signatures(
 
     initializer: _Initializer = (0, 0, [])
     in_max, in_total, children_signatures = reduce(count, children, initializer)
-    return Signature(n_in=in_max, n_out=in_max - in_total), children_signatures
+    signature = Signature(n_in=in_max, n_out=in_max - in_total)
+    return fn.intern_signature(signature), children_signatures
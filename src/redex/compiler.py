@@ -0,0 +1,326 @@
+"""The compiler turns combinators into specialized python functions.
+
+A combinator tree is walked once. Stack-shuffling combinators (such as
+`select`, `drop`, `dup`) are resolved at compile time, so the generated
+function keeps stack items in local variables and calls functions directly.
+
+*Note that the compiled function follows declared signatures. A function
+that returns a different number of outputs than its signature declares
+is an error.*
+"""
+
+import re
+import builtins
+import linecache
+import itertools
+from functools import reduce
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from dataclasses import dataclass, field
+from redex import util
+from redex import function as fn
+from redex.function import Fn, FineCallable, Signature
+from redex.combinator import Drop, Dup, Foldl, Identity
+from redex.combinator import Parallel, Select, Serial
+
+
+@dataclass(frozen=True)
+class Compiled(FineCallable):
+    """The combinator compiled into a python function."""
+
+    combinator: Fn
+    """an original combinator."""
+
+    source: str = field(repr=False)
+    """a source code of the generated function."""
+
+    func: Fn = field(repr=False)
+    """a generated function."""
+
+    namespace: Dict[str, Any] = field(repr=False, compare=False)
+    """objects the generated function refers to by name."""
+
+    def __call__(self, *inputs: Any) -> Any:
+        return self.func(*inputs)
+
+
+# pylint: disable=redefined-builtin
+def compile(func: Fn) -> Compiled:
+    """Compiles a combinator into a single specialized python function.
+
+    >>> import operator as op
+    >>> from redex import combinator as cb
+    >>> from redex import compiler
+    >>> compiled = compiler.compile(cb.serial(cb.dup(), op.mul, op.add))
+    >>> compiled(3, 1) == 3 * 3 + 1
+    True
+
+    Args:
+        func: a combinator or any other function.
+
+    Returns:
+        a compiled combinator with the same signature as the original one.
+
+    Raises:
+        ValueError: if some function of the combinator requires more inputs
+            than available to it.
+    """
+    signature = fn.infer_signature(func)
+    emitter = _Emitter()
+    stack = _SymbolicStack(emitter.new_input)
+    # All declared inputs are outputs unless consumed, even if unused.
+    stack.take(func, signature.n_in)
+    emitter.emit(func, stack, signature)
+    name = "compiled_" + re.sub(r"\W", "_", fn.infer_name(func).lower())
+    n_in = max(signature.n_in, emitter.n_inputs)
+    source = emitter.source(name, fn.infer_name(func), n_in, stack.names)
+    return Compiled(
+        signature=Signature(n_in=n_in, n_out=len(stack.names)),
+        combinator=func,
+        source=source,
+        func=_define(name, source, emitter.namespace),
+        namespace=emitter.namespace,
+    )
+
+
+_Task = Callable[[], List["_Task"]]
+"""The deferred step of compilation, which returns steps to do next."""
+
+
+# pylint: disable=too-few-public-methods
+class _SymbolicStack:
+    """The stack of variable names.
+
+    Items below the known names are inputs that weren't used yet. If there
+    is a source of inputs, they are named on demand.
+    """
+
+    def __init__(
+        self,
+        new_input: Optional[Callable[[], str]] = None,
+        names: Optional[List[str]] = None,
+    ) -> None:
+        self.names = [] if names is None else names
+        self.new_input = new_input
+
+    def take(self, func: Fn, n_in: int) -> List[str]:
+        """Ensures the stack has at least `n_in` known names, and returns them."""
+        while len(self.names) < n_in:
+            if self.new_input is None:
+                raise ValueError(
+                    f"The `{fn.infer_name(func)}` takes {n_in} "
+                    f"positional arguments but {len(self.names)} were given."
+                )
+            self.names.append(self.new_input())
+        return self.names[:n_in]
+
+
+class _Emitter:
+    """Emits statements of the generated function."""
+
+    def __init__(self) -> None:
+        self.lines: List[str] = []
+        self.namespace: Dict[str, Any] = {"_outputs": _outputs}
+        self.n_inputs = 0
+        self._bound: Dict[int, str] = {}
+        self._counter = itertools.count()
+
+    def new_input(self) -> str:
+        """Names the next input from the top of the stack."""
+        name = f"v{self.n_inputs}"
+        self.n_inputs += 1
+        return name
+
+    def new_var(self) -> str:
+        """Names a new local variable."""
+        return f"t{next(self._counter)}"
+
+    def bind(self, obj: Any) -> str:
+        """Binds an object to a name visible to the generated function."""
+        key = id(obj)
+        if key not in self._bound:
+            name = f"_f{len(self._bound)}"
+            self._bound[key] = name
+            self.namespace[name] = obj
+        return self._bound[key]
+
+    def emit(self, func: Fn, stack: _SymbolicStack, signature: Signature) -> None:
+        """Emits statements applying the function to the stack."""
+        # The tree is walked with an explicit stack of tasks instead of
+        # recursion, so deeply nested combinators can be compiled.
+        tasks: List[_Task] = [self._task(func, stack, signature)]
+        while tasks:
+            tasks += reversed(tasks.pop()())
+
+    def _task(self, func: Fn, stack: _SymbolicStack, signature: Signature) -> _Task:
+        """Makes a task emitting statements applying the function to the stack."""
+        return lambda: self._emit_node(func, stack, signature)
+
+    def _emit_node(
+        self, func: Fn, stack: _SymbolicStack, signature: Signature
+    ) -> List[_Task]:
+        """Emits statements of the function, and returns tasks of its children."""
+        # pylint: disable=too-many-return-statements
+        if isinstance(func, Compiled):
+            return [self._task(func.combinator, stack, signature)]
+        if isinstance(func, Serial):
+            children = zip(func.children, func.children_signatures)
+            return [self._serial_child(child, s, stack) for child, s in children]
+        if isinstance(func, Parallel):
+            return self._emit_parallel(func, stack)
+        if isinstance(func, Select):
+            n_in = max([func.signature.n_in, *[i + 1 for i in func.indices]])
+            names = stack.take(func, n_in)
+            selected = [names[i] for i in func.indices]
+            stack.names = selected + stack.names[func.signature.n_in :]
+        elif isinstance(func, Drop):
+            stack.take(func, func.signature.n_in)
+            stack.names = stack.names[func.signature.n_in :]
+        elif isinstance(func, Dup):
+            names = stack.take(func, func.signature.n_in)
+            stack.names = names + stack.names
+        elif isinstance(func, Identity):
+            stack.take(func, func.signature.n_in)
+        elif isinstance(func, Foldl):
+            self._emit_foldl(func, stack)
+        else:
+            self._emit_call(func, stack, signature)
+        return []
+
+    def _serial_child(
+        self, child: Fn, signature: Signature, stack: _SymbolicStack
+    ) -> _Task:
+        """Makes a task emitting the child of the serial combinator."""
+
+        def enter() -> List[_Task]:
+            # Like `constrained_call`, a child sees only its own inputs.
+            names = stack.take(child, signature.n_in)
+            substack = _SymbolicStack(names=names)
+
+            def leave() -> List[_Task]:
+                stack.names = substack.names + stack.names[signature.n_in :]
+                return []
+
+            return [self._task(child, substack, signature), leave]
+
+        return enter
+
+    def _emit_parallel(self, func: Parallel, stack: _SymbolicStack) -> List[_Task]:
+        names = stack.take(func, func.signature.n_in)
+        substacks: List[_SymbolicStack] = []
+        tasks: List[_Task] = []
+        for child, signature in zip(func.children, func.children_signatures):
+            n_lower, n_upper = signature.index_bounds
+            substacks.append(_SymbolicStack(names=names[n_lower:n_upper]))
+            tasks.append(self._task(child, substacks[-1], signature))
+
+        def leave() -> List[_Task]:
+            outputs = [name for substack in substacks for name in substack.names]
+            stack.names = outputs + stack.names[func.signature.n_in :]
+            return []
+
+        return tasks + [leave]
+
+    def _emit_foldl(self, func: Foldl, stack: _SymbolicStack) -> None:
+        n_in = func.signature.n_in
+        names = stack.take(func, n_in)
+        op = self.bind(func.func)
+        if n_in == 0:
+            self.namespace["_reduce"] = reduce
+            self.lines.append(f"_reduce({op}, ())")
+            return
+        acc = names[0]
+        for name in names[1:]:
+            var = self.new_var()
+            self.lines.append(f"{var} = {op}({acc}, {name})")
+            acc = var
+        stack.names = [acc] + stack.names[n_in:]
+
+    def _emit_call(self, func: Fn, stack: _SymbolicStack, signature: Signature) -> None:
+        n_in, n_out = signature.n_in, signature.n_out
+        names = stack.take(func, n_in)
+        args = _shape_expression(signature.in_shape, iter(names))
+        title = fn.infer_name(func)
+        call = f"{self.bind(func)}({args})"
+        outputs = [self.new_var() for _ in range(n_out)]
+        out_shape = signature.out_shape
+        if n_out == 0:
+            self.lines.append(call)
+        elif out_shape:
+            # Unpack outputs of the declared shape.
+            targets = _shape_expression(out_shape, iter(outputs))
+            self.lines.append(f"{targets}, = {call}")
+        elif out_shape is not None:
+            self.lines.append(f"{outputs[0]} = {call}")
+        elif n_out == 1:
+            # Like `collect_outputs`, tuples of undeclared outputs are flattened.
+            output = outputs[0]
+            self.lines.append(f"{output} = {call}")
+            self.lines.append(f"if {output}.__class__ is tuple:")
+            self.lines.append(f"    {output}, = _outputs({output}, 1, {title!r})")
+        else:
+            self.lines.append(
+                f"{', '.join(outputs)} = _outputs({call}, {n_out}, {title!r})"
+            )
+        stack.names = outputs + stack.names[n_in:]
+
+    def source(self, name: str, title: str, n_in: int, outputs: List[str]) -> str:
+        """Generates a source code of the function."""
+        defaults = "".join(f", {bound}={bound}" for bound in self._bound.values())
+        inputs = [f"v{i}" for i in range(n_in)]
+        header = [
+            f"def {name}(*stack{defaults}):",
+            f"    if len(stack) < {n_in}:",
+            "        raise ValueError(",
+            f'            f"The `{title}` takes {n_in} "',
+            '            f"positional arguments but {len(stack)} were given."',
+            "        )",
+        ]
+        if len(inputs) == 1:
+            header.append("    v0 = stack[0]")
+        elif inputs:
+            header.append(f"    {', '.join(inputs)} = stack[:{n_in}]")
+        header.append(f"    rest = stack[{n_in}:]")
+        body = [f"    {line}" for line in self.lines]
+        return "\n".join(header + body + [f"    {_return(outputs)}", ""])
+
+
+def _shape_expression(shape: tuple[Any, ...], names: Iterator[str]) -> str:
+    """Builds a comma-separated expression of names shaped into tuples."""
+
+    def inner(shape: tuple[Any, ...]) -> str:
+        if not shape:
+            return next(names)
+        return f"({', '.join(inner(item) for item in shape)},)"
+
+    return ", ".join(inner(item) for item in shape)
+
+
+def _outputs(result: Any, n_out: int, name: str) -> List[Any]:
+    """Flattens undeclared outputs, and checks their number."""
+    outputs = util.flatten_tuples(util.expand_to_tuple(result))
+    if len(outputs) != n_out:
+        raise ValueError(
+            f"The `{name}` returned {len(outputs)} "
+            f"outputs but its signature declares {n_out}."
+        )
+    return outputs
+
+
+def _return(outputs: List[str]) -> str:
+    """Builds a return statement that squeezes outputs like `stackmethod`."""
+    if not outputs:
+        return "return rest[0] if len(rest) == 1 else rest"
+    if len(outputs) == 1:
+        return f"return ({outputs[0]}, *rest) if rest else {outputs[0]}"
+    return f"return ({', '.join(outputs)}, *rest)"
+
+
+def _define(name: str, source: str, namespace: Dict[str, Any]) -> Fn:
+    """Executes the source code and returns the defined function."""
+    filename = f"<redex.compiler:{name}>"
+    # Make the source available for tracebacks.
+    linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+    scope = dict(namespace)
+    exec(builtins.compile(source, filename, "exec"), scope)  # pylint: disable=exec-used
+    func: Fn = scope[name]
+    return func
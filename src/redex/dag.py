@@ -0,0 +1,429 @@
+"""The dataflow graph runs independent functions of a combinator concurrently.
+
+A combinator tree is lowered into a directed acyclic graph of calls, whose
+edges follow values from functions producing them to functions taking them.
+Stack-shuffling combinators (such as `select`, `drop`, `dup`) are resolved
+while lowering, and serial and parallel combinators are flattened. So
+functions that are called one after another by a serial combinator, but
+don't depend on each other's outputs, become independent nodes.
+
+The scheduler submits each node to an executor as soon as all its inputs are
+computed. Ready nodes are submitted in order of the cost of the longest chain
+of calls they start, so the latency of the call is bounded by the critical
+path of the graph rather than by the total work.
+
+*Note that the graph follows declared signatures. A function that returns
+a different number of outputs than its signature declares is an error.
+Functions run in order of their data dependencies only, so side effects
+of functions that aren't pure may happen in another order.*
+"""
+
+import heapq
+import contextvars
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from dataclasses import dataclass, field
+from concurrent.futures import FIRST_COMPLETED, Executor, Future
+from concurrent.futures import ThreadPoolExecutor, wait
+from redex import util
+from redex import function as fn
+from redex.function import Fn, FineCallable, Signature
+from redex.stack import constrained_call, Stack
+from redex.compiler import Compiled
+from redex.explain import explain
+from redex.combinator import Drop, Dup, Foldl, Identity, Parallel, Select, Serial
+
+_ACCUMULATE = Signature(n_in=2, n_out=1, out_shape=())
+"""The signature of a function folded by the associative foldl."""
+
+
+@dataclass(frozen=True)
+class Node:
+    """The call of a function in the dataflow graph."""
+
+    func: Fn = field(repr=False)
+    """a function."""
+
+    signature: Signature
+    """a signature the function is called with."""
+
+    inputs: tuple[int, ...]
+    """identifiers of values taken by the function."""
+
+    outputs: tuple[int, ...]
+    """identifiers of values output by the function."""
+
+    cost: float
+    """an estimated cost of the call."""
+
+    @property
+    def name(self) -> str:
+        """a name of the function."""
+        return fn.infer_name(self.func)
+
+
+# pylint: disable=too-many-instance-attributes
+@dataclass(frozen=True)
+class Graph(FineCallable):
+    """The combinator lowered into a dataflow graph."""
+
+    combinator: Fn
+    """an original combinator."""
+
+    nodes: List[Node] = field(repr=False)
+    """calls of functions in order of the original combinator."""
+
+    inputs: tuple[int, ...]
+    """identifiers of values taken from the stack, from its top."""
+
+    outputs: tuple[int, ...]
+    """identifiers of values pushed onto the stack, from its top."""
+
+    n_values: int
+    """a number of values in the graph."""
+
+    executor: Optional[Executor] = field(default=None, repr=False, compare=False)
+    """an executor running the nodes, or `None` to run them one after another."""
+
+    # pylint: disable=invalid-field-call
+    dependents: List[tuple[int, ...]] = field(init=False, repr=False, compare=False)
+    """indices of nodes that take outputs of each node."""
+
+    # pylint: disable=invalid-field-call
+    n_dependencies: List[int] = field(init=False, repr=False, compare=False)
+    """numbers of nodes whose outputs each node takes."""
+
+    # pylint: disable=invalid-field-call
+    priorities: List[float] = field(init=False, repr=False, compare=False)
+    """costs of the longest chains of calls starting at each node."""
+
+    def __post_init__(self) -> None:
+        producers: Dict[int, int] = {}
+        dependencies: List[set[int]] = []
+        for index, node in enumerate(self.nodes):
+            dependencies.append({producers[v] for v in node.inputs if v in producers})
+            producers.update((value, index) for value in node.outputs)
+        dependents: List[List[int]] = [[] for _ in self.nodes]
+        for index, producers_of_node in enumerate(dependencies):
+            for producer in sorted(producers_of_node):
+                dependents[producer].append(index)
+        # Nodes follow their dependencies, so chains are summed backwards.
+        priorities = [0.0] * len(self.nodes)
+        for index in reversed(range(len(self.nodes))):
+            tail = max((priorities[i] for i in dependents[index]), default=0.0)
+            priorities[index] = self.nodes[index].cost + tail
+        object.__setattr__(self, "dependents", [tuple(d) for d in dependents])
+        object.__setattr__(self, "n_dependencies", [len(d) for d in dependencies])
+        object.__setattr__(self, "priorities", priorities)
+
+    @property
+    def work(self) -> float:
+        """an estimated cost of all calls."""
+        return sum(node.cost for node in self.nodes)
+
+    @property
+    def span(self) -> float:
+        """an estimated cost of the critical path, the longest chain of calls."""
+        return max(self.priorities, default=0.0)
+
+    def __call__(self, *stack: Any) -> Any:
+        n_in = len(self.inputs)
+        if len(stack) < n_in:
+            raise ValueError(
+                f"The `{fn.infer_name(self.combinator)}` takes {n_in} "
+                f"positional arguments but {len(stack)} were given."
+            )
+        outputs = run(self, stack[:n_in], self.executor)
+        return util.squeeze_tuple((*outputs, *stack[n_in:]))
+
+
+def lower(func: Fn, executor: Optional[Executor] = None) -> Graph:
+    """Lowers a combinator into a dataflow graph.
+
+    >>> import operator as op
+    >>> from concurrent.futures import ThreadPoolExecutor
+    >>> from redex import combinator as cb
+    >>> from redex import dag
+    >>> # The second addition doesn't depend on the first one.
+    >>> func = cb.serial(op.add, cb.select([1, 2, 0]), op.add, op.mul)
+    >>> graph = dag.lower(func)
+    >>> len(graph.nodes), graph.work, graph.span
+    (3, 3.0, 2.0)
+    >>> with ThreadPoolExecutor() as executor:
+    ...     dag.run(graph, (1, 2, 3, 4), executor) == (func(1, 2, 3, 4),)
+    True
+
+    Args:
+        func: a combinator or any other function.
+        executor: an executor running the nodes of the graph when it's called.
+
+    Returns:
+        a graph with the same signature as the original combinator.
+
+    Raises:
+        ValueError: if some function of the combinator requires more inputs
+            than available to it.
+    """
+    signature = fn.infer_signature(func)
+    builder = _Builder()
+    stack = _ValueStack(builder.new_input)
+    # All declared inputs are outputs unless consumed, even if unused.
+    stack.take(func, signature.n_in)
+    builder.build(func, stack, signature)
+    inputs = tuple(builder.inputs)
+    return Graph(
+        signature=Signature(n_in=len(inputs), n_out=len(stack.values)),
+        combinator=func,
+        nodes=builder.nodes,
+        inputs=inputs,
+        outputs=tuple(stack.values),
+        n_values=builder.n_values,
+        executor=executor,
+    )
+
+
+def run(
+    graph: Graph,
+    inputs: Sequence[Any],
+    executor: Optional[Executor] = None,
+) -> Stack:
+    """Computes outputs of the graph.
+
+    Args:
+        graph: a dataflow graph.
+        inputs: values of inputs of the graph, from the top of the stack.
+        executor: an executor running the nodes, or `None` to run them
+            one after another in the calling thread.
+
+    Returns:
+        outputs of the graph, from the top of the stack.
+
+    Raises:
+        ValueError: if a number of inputs doesn't match the graph.
+    """
+    if len(inputs) != len(graph.inputs):
+        raise ValueError(
+            f"The graph of `{fn.infer_name(graph.combinator)}` takes "
+            f"{len(graph.inputs)} inputs but {len(inputs)} were given."
+        )
+    values: List[Any] = [None] * graph.n_values
+    for value, item in zip(graph.inputs, inputs):
+        values[value] = item
+    if executor is None:
+        for node in graph.nodes:
+            args = tuple(values[value] for value in node.inputs)
+            _store(node, constrained_call(node.func, args, node.signature), values)
+    else:
+        _run_concurrently(graph, values, executor)
+    return tuple(values[value] for value in graph.outputs)
+
+
+def _run_concurrently(graph: Graph, values: List[Any], executor: Executor) -> None:
+    """Submits nodes as soon as their inputs are computed."""
+    submit = _submitter(executor)
+    n_pending = list(graph.n_dependencies)
+    # Nodes starting longer chains of calls are submitted first.
+    ready = [(-graph.priorities[i], i) for i, n in enumerate(n_pending) if n == 0]
+    heapq.heapify(ready)
+    running: Dict["Future[Stack]", int] = {}
+    try:
+        while ready or running:
+            while ready:
+                _, index = heapq.heappop(ready)
+                node = graph.nodes[index]
+                args = tuple(values[value] for value in node.inputs)
+                running[submit(node, args)] = index
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = running.pop(future)
+                _store(graph.nodes[index], future.result(), values)
+                for dependent in graph.dependents[index]:
+                    n_pending[dependent] -= 1
+                    if n_pending[dependent] == 0:
+                        heapq.heappush(ready, (-graph.priorities[dependent], dependent))
+    finally:
+        # Nodes, whose outputs aren't needed anymore, don't start.
+        for future in running:
+            future.cancel()
+
+
+def _submitter(executor: Executor) -> Callable[[Node, Stack], "Future[Stack]"]:
+    """Makes a function submitting calls of nodes to the executor."""
+    if isinstance(executor, ThreadPoolExecutor):
+        # Calls in threads are seen by observers of the calling thread.
+        def submit_to_thread(node: Node, args: Stack) -> "Future[Stack]":
+            context = contextvars.copy_context()
+            return executor.submit(_call_in_context, context, node, args)
+
+        return submit_to_thread
+
+    def submit(node: Node, args: Stack) -> "Future[Stack]":
+        return executor.submit(constrained_call, node.func, args, node.signature)
+
+    return submit
+
+
+def _call_in_context(context: contextvars.Context, node: Node, args: Stack) -> Stack:
+    outputs: Stack = context.run(constrained_call, node.func, args, node.signature)
+    return outputs
+
+
+def _store(node: Node, outputs: Stack, values: List[Any]) -> None:
+    """Checks the number of outputs of the node, and stores them."""
+    if len(outputs) != len(node.outputs):
+        raise ValueError(
+            f"The `{node.name}` returned {len(outputs)} "
+            f"outputs but its signature declares {len(node.outputs)}."
+        )
+    for value, item in zip(node.outputs, outputs):
+        values[value] = item
+
+
+_Task = Callable[[], List["_Task"]]
+"""The deferred step of lowering, which returns steps to do next."""
+
+
+# pylint: disable=too-few-public-methods
+class _ValueStack:
+    """The stack of identifiers of values.
+
+    Items below the known values are inputs that weren't used yet. If there
+    is a source of inputs, they are identified on demand.
+    """
+
+    def __init__(
+        self,
+        new_input: Optional[Callable[[], int]] = None,
+        values: Optional[List[int]] = None,
+    ) -> None:
+        self.values = [] if values is None else values
+        self.new_input = new_input
+
+    def take(self, func: Fn, n_in: int) -> List[int]:
+        """Ensures the stack has at least `n_in` known values, and returns them."""
+        while len(self.values) < n_in:
+            if self.new_input is None:
+                raise ValueError(
+                    f"The `{fn.infer_name(func)}` takes {n_in} "
+                    f"positional arguments but {len(self.values)} were given."
+                )
+            self.values.append(self.new_input())
+        return self.values[:n_in]
+
+
+class _Builder:
+    """Adds nodes of the graph."""
+
+    def __init__(self) -> None:
+        self.nodes: List[Node] = []
+        self.inputs: List[int] = []
+        self.n_values = 0
+        self._costs: Dict[int, float] = {}
+
+    def new_input(self) -> int:
+        """Identifies the next input from the top of the stack."""
+        self.inputs.append(self.n_values)
+        self.n_values += 1
+        return self.inputs[-1]
+
+    def add(self, func: Fn, signature: Signature, inputs: List[int]) -> List[int]:
+        """Adds the call of the function, and returns its outputs."""
+        outputs = list(range(self.n_values, self.n_values + signature.n_out))
+        self.n_values += signature.n_out
+        key = id(func)
+        if key not in self._costs:
+            self._costs[key] = explain(func).cost
+        node = Node(func, signature, tuple(inputs), tuple(outputs), self._costs[key])
+        self.nodes.append(node)
+        return outputs
+
+    def build(self, func: Fn, stack: _ValueStack, signature: Signature) -> None:
+        """Adds nodes applying the function to the stack."""
+        # The tree is walked with an explicit stack of tasks instead of
+        # recursion, so deeply nested combinators can be lowered.
+        tasks: List[_Task] = [self._task(func, stack, signature)]
+        while tasks:
+            tasks += reversed(tasks.pop()())
+
+    def _task(self, func: Fn, stack: _ValueStack, signature: Signature) -> _Task:
+        """Makes a task adding nodes applying the function to the stack."""
+        return lambda: self._build_node(func, stack, signature)
+
+    def _build_node(
+        self, func: Fn, stack: _ValueStack, signature: Signature
+    ) -> List[_Task]:
+        """Adds nodes of the function, and returns tasks of its children."""
+        # pylint: disable=too-many-return-statements
+        if isinstance(func, (Compiled, Graph)):
+            return [self._task(func.combinator, stack, signature)]
+        if isinstance(func, Serial):
+            children = zip(func.children, func.children_signatures)
+            return [self._serial_child(child, s, stack) for child, s in children]
+        if isinstance(func, Parallel):
+            return self._build_parallel(func, stack)
+        if isinstance(func, Select):
+            n_in = max([func.signature.n_in, *[i + 1 for i in func.indices]])
+            values = stack.take(func, n_in)
+            selected = [values[i] for i in func.indices]
+            stack.values = selected + stack.values[func.signature.n_in :]
+        elif isinstance(func, Drop):
+            stack.take(func, func.signature.n_in)
+            stack.values = stack.values[func.signature.n_in :]
+        elif isinstance(func, Dup):
+            values = stack.take(func, func.signature.n_in)
+            stack.values = values + stack.values
+        elif isinstance(func, Identity):
+            stack.take(func, func.signature.n_in)
+        elif isinstance(func, Foldl) and func.associative and func.signature.n_in > 2:
+            self._build_associative_foldl(func, stack)
+        else:
+            values = stack.take(func, signature.n_in)
+            outputs = self.add(func, signature, values)
+            stack.values = outputs + stack.values[signature.n_in :]
+        return []
+
+    def _serial_child(
+        self, child: Fn, signature: Signature, stack: _ValueStack
+    ) -> _Task:
+        """Makes a task adding nodes of the child of the serial combinator."""
+
+        def enter() -> List[_Task]:
+            # Like `constrained_call`, a child sees only its own inputs.
+            values = stack.take(child, signature.n_in)
+            substack = _ValueStack(values=values)
+
+            def leave() -> List[_Task]:
+                stack.values = substack.values + stack.values[signature.n_in :]
+                return []
+
+            return [self._task(child, substack, signature), leave]
+
+        return enter
+
+    def _build_parallel(self, func: Parallel, stack: _ValueStack) -> List[_Task]:
+        values = stack.take(func, func.signature.n_in)
+        substacks: List[_ValueStack] = []
+        tasks: List[_Task] = []
+        for child, signature in zip(func.children, func.children_signatures):
+            n_lower, n_upper = signature.index_bounds
+            substacks.append(_ValueStack(values=values[n_lower:n_upper]))
+            tasks.append(self._task(child, substacks[-1], signature))
+
+        def leave() -> List[_Task]:
+            outputs = [value for substack in substacks for value in substack.values]
+            stack.values = outputs + stack.values[func.signature.n_in :]
+            return []
+
+        return tasks + [leave]
+
+    def _build_associative_foldl(self, func: Foldl, stack: _ValueStack) -> None:
+        """Folds pairs of neighbouring values level by level, so the graph
+        is as deep as a logarithm of the number of values."""
+        n_in = func.signature.n_in
+        level = stack.take(func, n_in)
+        while len(level) > 1:
+            pairs = range(0, len(level) - 1, 2)
+            folded = [
+                self.add(func.func, _ACCUMULATE, level[i : i + 2])[0] for i in pairs
+            ]
+            level = folded + level[len(pairs) * 2 :]
+        stack.values = level + stack.values[n_in:]
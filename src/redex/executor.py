@@ -0,0 +1,319 @@
+"""Executors run children of parallel combinators concurrently.
+
+Children of the parallel combinator (and branches of the branch combinator)
+work on disjoint inputs, so they may run concurrently by any
+`concurrent.futures.Executor`:
+
+- threads (`ThreadPoolExecutor`) suit functions that wait for I/O or
+  release the GIL (e.g. NumPy kernels);
+- processes suit CPU-bound python functions. The `WarmProcessPool` sends
+  the combinator to each worker process once, when the worker starts, and
+  then only refers to its functions by their indices. It may also pass
+  large NumPy arrays to workers in shared memory instead of copying them.
+
+Executors aren't sent to worker processes: nested parallel combinators run
+there one after another. Compiled combinators and programs of the virtual
+machine don't use executors.
+"""
+
+import os
+import sys
+import threading
+from dataclasses import dataclass
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Union
+from redex import serialize
+from redex.function import Fn, Signature
+from redex.stack import constrained_call, Stack
+
+_NODES: List[Fn] = []
+"""functions of the combinator registered in the worker process."""
+
+
+def _install_nodes(nodes: bytes) -> None:
+    """Initializes the worker process with serialized functions of the combinator."""
+    _NODES[:] = serialize.loads_many(nodes)
+
+
+def _call_node(index: int, *args: Any) -> Any:
+    """Calls a registered function of the combinator in the worker process."""
+    return constrained_call(_NODES[index], *args)
+
+
+@dataclass(frozen=True)
+class _SharedArray:
+    """The array placed in shared memory, which is sent instead of the array."""
+
+    name: str
+    """a name of the shared memory block."""
+
+    shape: tuple[int, ...]
+    """a shape of the array."""
+
+    dtype: Any
+    """a data type of the array."""
+
+
+def _call_with_shared_arrays(
+    node: Union[int, Fn], stack: Stack, signature: Optional[Signature] = None
+) -> Stack:
+    """Calls the function in the worker process with arrays in shared memory
+    rebuilt as read-only views."""
+    stack = tuple(
+        _attach(item) if isinstance(item, _SharedArray) else item for item in stack
+    )
+    func = _NODES[node] if isinstance(node, int) else node
+    try:
+        return constrained_call(func, stack, signature)
+    finally:
+        del stack
+        _detach_unused()
+
+
+_ATTACHED: List[tuple[SharedMemory, Any]] = []
+"""blocks of shared memory mapped by the worker process, with arrays
+viewing them."""
+
+
+def _attach(array: _SharedArray) -> Any:
+    """Maps the array in shared memory without copying it."""
+    import numpy  # pylint: disable=import-outside-toplevel
+
+    block = SharedMemory(name=array.name)
+    view = numpy.ndarray(array.shape, array.dtype, buffer=block.buf)
+    # Other functions may read the same block concurrently.
+    view.flags.writeable = False
+    _ATTACHED.append((block, view))
+    return view
+
+
+def _detach_unused() -> None:
+    """Unmaps blocks whose arrays aren't referenced anymore.
+
+    Arrays derived from the view refer to it, so the block stays mapped
+    while outputs (or anything else) refer to its memory. Such blocks are
+    checked again after the next call.
+    """
+    attached = []
+    while _ATTACHED:
+        block, view = _ATTACHED.pop()
+        # The only references are the variable and the argument.
+        if sys.getrefcount(view) > 2:
+            attached.append((block, view))
+            continue
+        del view
+        block.close()
+    _ATTACHED[:] = attached
+
+
+class _SharedMemoryTransport:
+    """Places large arrays into shared memory blocks.
+
+    A block is shared by all calls that take the same array while they run,
+    and it's released once the last of them is done.
+    """
+
+    def __init__(self, threshold: int) -> None:
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        # Blocks, arrays and numbers of calls using them, by ids of arrays.
+        # Arrays are kept alive, so their ids aren't reused.
+        self._blocks: Dict[int, tuple[SharedMemory, Any, int]] = {}
+
+    def pack(self, stack: Stack) -> tuple[Stack, List[int]]:
+        """Replaces large arrays on the stack with shared ones.
+
+        Returns:
+            the stack and ids of arrays whose blocks it uses.
+        """
+        numpy = sys.modules.get("numpy")
+        if numpy is None:
+            # Arrays can't be created without NumPy imported.
+            return stack, []
+        keys: List[int] = []
+        packed = []
+        for item in stack:
+            if (
+                type(item) is numpy.ndarray  # pylint: disable=unidiomatic-typecheck
+                and not item.dtype.hasobject
+                and item.nbytes >= max(self.threshold, 1)
+            ):
+                keys.append(id(item))
+                item = self._share(item, numpy)
+            packed.append(item)
+        return tuple(packed), keys
+
+    def _share(self, array: Any, numpy: Any) -> _SharedArray:
+        with self._lock:
+            block, _, n_calls = self._blocks.get(id(array), (None, array, 0))
+            if block is None:
+                block = SharedMemory(create=True, size=array.nbytes)
+                view = numpy.ndarray(array.shape, array.dtype, buffer=block.buf)
+                view[...] = array
+                del view
+            self._blocks[id(array)] = (block, array, n_calls + 1)
+        return _SharedArray(name=block.name, shape=array.shape, dtype=array.dtype)
+
+    def release(self, keys: List[int]) -> None:
+        """Releases blocks used by the finished call."""
+        with self._lock:
+            for key in keys:
+                block, array, n_calls = self._blocks[key]
+                if n_calls > 1:
+                    self._blocks[key] = (block, array, n_calls - 1)
+                    continue
+                del self._blocks[key]
+                block.close()
+                block.unlink()
+
+
+def _noop() -> None:
+    """Does nothing, but makes the worker process start."""
+
+
+def walk(func: Fn) -> List[Fn]:
+    """Lists functions of the combinator tree.
+
+    Args:
+        func: a combinator or any other function.
+
+    Returns:
+        the function and all its descendants in depth-first order.
+    """
+    nodes: List[Fn] = []
+    pending = [func]
+    while pending:
+        node = pending.pop()
+        nodes.append(node)
+        pending += reversed(getattr(node, "children", []))
+    return nodes
+
+
+class WarmProcessPool(Executor):
+    """The process pool with combinators preloaded by its workers.
+
+    >>> import operator as op
+    >>> from redex import combinator as cb
+    >>> from redex.executor import WarmProcessPool
+    >>> with WarmProcessPool(max_workers=2) as pool:
+    ...     branch = cb.branch(op.add, op.mul, executor=pool)
+    ...     pool.register(branch).warm()
+    ...     branch(3, 4)
+    (7, 12)
+
+    NumPy arrays of at least `shared_memory_threshold` bytes are copied into
+    shared memory once per call of the parallel combinator, and workers map
+    them as read-only arrays without copying. Outputs are sent back
+    as usual.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        mp_context: Any = None,
+        shared_memory_threshold: Optional[int] = None,
+    ) -> None:
+        """Initializes the pool. Worker processes start on the first use.
+
+        Args:
+            max_workers: a maximum number of worker processes.
+                Defaults to a number of processors.
+            mp_context: a multiprocessing context to start workers with.
+            shared_memory_threshold: a minimum size (in bytes) of arrays
+                passed to workers in shared memory, or `None` to send
+                all arrays by pickling them.
+        """
+        self._nodes: List[Fn] = []
+        self._indices: Dict[int, int] = {}
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._max_workers = max_workers
+        self._mp_context = mp_context
+        self._transport = (
+            None
+            if shared_memory_threshold is None
+            else _SharedMemoryTransport(shared_memory_threshold)
+        )
+
+    def register(self, func: Fn) -> "WarmProcessPool":
+        """Registers the combinator to preload by workers.
+
+        Calls of registered functions send only their indices and inputs
+        to workers. Other functions are sent with each call.
+
+        Args:
+            func: a combinator or any other function.
+
+        Returns:
+            the pool itself.
+
+        Raises:
+            RuntimeError: if workers have already started.
+        """
+        if self._pool is not None:
+            raise RuntimeError(
+                "Combinators must be registered before workers of the pool start."
+            )
+        for node in walk(func):
+            if id(node) not in self._indices:
+                self._indices[id(node)] = len(self._nodes)
+                self._nodes.append(node)
+        return self
+
+    def warm(self) -> None:
+        """Starts all worker processes and waits until they're ready."""
+        n_workers = self._max_workers or os.cpu_count() or 1
+        wait([self.submit(_noop) for _ in range(n_workers)])
+
+    def _start(self) -> ProcessPoolExecutor:
+        """Creates the underlying pool, which starts workers on demand."""
+        if self._pool is None:
+            if self._transport is not None:
+                # Workers share the tracker of shared memory with the pool, so
+                # blocks mapped by workers aren't reported as leaked by them.
+                resource_tracker.ensure_running()
+            # The combinator is serialized even if workers are forked, so they
+            # don't inherit executors of nested parallel combinators.
+            self._pool = ProcessPoolExecutor(
+                max_workers=self._max_workers,
+                mp_context=self._mp_context,
+                initializer=_install_nodes,
+                initargs=(serialize.dumps_many(self._nodes),),
+            )
+        return self._pool
+
+    # pylint: disable=arguments-differ
+    def submit(
+        self,
+        fn: Callable[..., Any],
+        /,
+        *args: Any,
+        **kwargs: Any,
+    ) -> "Future[Any]":
+        pool = self._start()
+        if fn is not constrained_call or not args:
+            return pool.submit(fn, *args, **kwargs)
+        func, *call = args
+        node: Union[int, Fn] = self._indices.get(id(func), func)
+        if self._transport is not None and call:
+            stack, keys = self._transport.pack(call[0])
+            if keys:
+                transport = self._transport
+                try:
+                    future = pool.submit(
+                        _call_with_shared_arrays, node, stack, *call[1:], **kwargs
+                    )
+                except BaseException:
+                    transport.release(keys)
+                    raise
+                future.add_done_callback(lambda _: transport.release(keys))
+                return future
+        if isinstance(node, int):
+            return pool.submit(_call_node, node, *call, **kwargs)
+        return pool.submit(fn, *args, **kwargs)
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        # pylint: disable=redefined-outer-name
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=cancel_futures)
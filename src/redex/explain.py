@@ -0,0 +1,380 @@
+"""The static analysis of combinator trees.
+
+`explain` walks the combinator tree without calling it, and reports
+statistics of each function in the tree: its signature, a maximum height
+of the stack during its call, a number of tuples allocated per call and
+an estimated cost of the call.
+
+Costs are relative to a call of a standard arithmetic function, which costs
+`1.0`. Functions may be annotated with their costs by `redex.function.cost`.
+Costs of combinators include costs of their functions and tuples they
+allocate. Measured timings, such as ones collected by
+`redex.observer.TimingObserver`, may be merged in to find the critical path
+by actual durations.
+
+*Note that statistics are estimates: the loop bodies are counted as many
+times as they repeat, or once for the while loop, and only the most
+expensive case of the switch is counted. Tuples allocated by functions that
+aren't combinators aren't counted. Functions nested in loop bodies are
+matched with timings of the first repetition.*
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Optional
+from redex import util
+from redex import function as fn
+from redex.function import Fn, Signature
+from redex.combinator import Combinator, Drop, Dup, Foldl, Identity, Memo
+from redex.combinator import Parallel, Repeat, Scan, Select, Serial, Switch
+from redex.combinator import WhileLoop
+
+FUNCTION_COST = 1.0
+"""the cost of a call of a function without the annotated cost."""
+
+ALLOCATION_COST = 0.25
+"""the cost of a tuple allocated by a combinator."""
+
+Timings = Mapping[tuple[str, ...], float]
+"""Measured durations (in seconds) keyed by paths of calls."""
+
+
+# pylint: disable=too-many-instance-attributes
+@dataclass
+class Node:
+    """Statistics of a function in the combinator tree."""
+
+    path: tuple[str, ...]
+    """a path of the function, like paths of calls reported to observers."""
+
+    func: Fn = field(repr=False)
+    """a function."""
+
+    signature: Signature
+    """a signature the function is called with."""
+
+    children: List["Node"] = field(default_factory=list, repr=False)
+    """statistics of functions called by the function."""
+
+    repetitions: int = 1
+    """a number of calls per call of the parent."""
+
+    stack_height: int = 0
+    """a maximum number of items on the stack during the call, counting
+    from inputs of the function."""
+
+    allocations: int = 0
+    """a number of tuples allocated per call, including tuples allocated
+    by called functions."""
+
+    cost: float = 0.0
+    """an estimated cost of the call, including costs of called functions."""
+
+    time: Optional[float] = None
+    """a measured duration (in seconds) of all calls per call of the parent,
+    or `None` if it isn't measured."""
+
+    @property
+    def name(self) -> str:
+        """a name of the function."""
+        return fn.infer_name(self.func)
+
+    @property
+    def depth(self) -> int:
+        """a depth of the function in the combinator tree."""
+        return len(self.path)
+
+
+@dataclass
+class Explanation:
+    """Statistics of the combinator tree."""
+
+    root: Node
+    """statistics of the top-level function."""
+
+    nodes: List[Node]
+    """statistics of all functions of the tree in depth-first order."""
+
+    critical_path: List[Node]
+    """functions that take the most time (or cost) at each level of the tree,
+    starting from the top-level function."""
+
+    @property
+    def n_nodes(self) -> int:
+        """a number of functions in the tree."""
+        return len(self.nodes)
+
+    @property
+    def depth(self) -> int:
+        """a maximum nesting depth of the tree."""
+        return max(node.depth for node in self.nodes)
+
+    @property
+    def stack_height(self) -> int:
+        """a maximum number of items on the stack during the call."""
+        return self.root.stack_height
+
+    @property
+    def allocations(self) -> int:
+        """a number of tuples allocated per call."""
+        return self.root.allocations
+
+    @property
+    def cost(self) -> float:
+        """an estimated cost of the call."""
+        return self.root.cost
+
+    def format(self) -> str:
+        """Formats statistics as a summary followed by a table of functions.
+
+        Returns:
+            a text.
+        """
+        critical = " > ".join(node.path[-1] for node in self.critical_path)
+        lines = [
+            f"nodes: {self.n_nodes}, depth: {self.depth}, "
+            f"stack height: {self.stack_height}, "
+            f"allocations: {self.allocations}, cost: {self.cost:.2f}",
+            f"critical path: {critical}",
+        ]
+        rows = [("function", "n_in", "n_out", "height", "allocs", "cost", "time")]
+        for node in self.nodes:
+            name = "  " * (node.depth - 1) + node.path[-1]
+            if node.repetitions != 1:
+                name += f" x{node.repetitions}"
+            rows.append(
+                (
+                    name,
+                    str(node.signature.n_in),
+                    str(node.signature.n_out),
+                    str(node.stack_height),
+                    str(node.allocations),
+                    f"{node.cost:.2f}",
+                    "-" if node.time is None else f"{node.time * 1e6:.1f} us",
+                )
+            )
+        lines.append(util.format_table(rows))
+        return "\n".join(lines)
+
+    def __str__(self) -> str:
+        return self.format()
+
+
+def explain(func: Fn, timings: Optional[Timings] = None) -> Explanation:
+    """Explains the combinator tree by its statistics.
+
+    >>> import operator as op
+    >>> from redex import combinator as cb
+    >>> from redex.explain import explain
+    >>> explanation = explain(cb.residual(op.neg))
+    >>> explanation.n_nodes, explanation.depth, explanation.stack_height
+    (7, 4, 2)
+    >>> [node.path[-1] for node in explanation.critical_path]
+    ['Serial', '0:Serial', '1:Parallel', '0:neg']
+
+    Args:
+        func: a combinator or any other function.
+        timings: measured durations (in seconds) keyed by paths of calls,
+            such as `durations` of `redex.observer.TimingObserver`.
+
+    Returns:
+        statistics of the tree.
+    """
+    root = Node(
+        path=(fn.infer_name(func),), func=func, signature=fn.infer_signature(func)
+    )
+    nodes: List[Node] = []
+    # The tree is walked with an explicit stack instead of recursion,
+    # so deeply nested combinators can be explained.
+    pending: List[tuple[Node, bool]] = [(root, False)]
+    while pending:
+        node, is_visited = pending.pop()
+        if is_visited:
+            _estimate(node)
+            continue
+        nodes.append(node)
+        if timings is not None:
+            node.time = _measure(node, timings)
+        node.children = [
+            Node(
+                path=(*node.path, f"{i}:{fn.infer_name(child)}"),
+                func=child,
+                signature=signature,
+                repetitions=repetitions,
+            )
+            for i, (child, signature, repetitions) in enumerate(_children(node.func))
+        ]
+        pending.append((node, True))
+        pending.extend((child, False) for child in reversed(node.children))
+    return Explanation(root=root, nodes=nodes, critical_path=_critical_path(root))
+
+
+def _measure(node: Node, timings: Timings) -> Optional[float]:
+    """Finds the measured duration of the function, summed over its calls
+    per call of the parent."""
+    if node.repetitions == 1:
+        return timings.get(node.path)
+    *parent, last = node.path
+    name = last.split(":", 1)[1]
+    durations = [timings.get((*parent, f"{i}:{name}")) for i in range(node.repetitions)]
+    measured = [duration for duration in durations if duration is not None]
+    return sum(measured) if measured else None
+
+
+# pylint: disable=too-many-return-statements
+def _children(func: Fn) -> List[tuple[Fn, Signature, int]]:
+    """Lists functions called by the function with their signatures
+    and numbers of calls."""
+    if isinstance(func, (Serial, Parallel)):
+        return [(c, s, 1) for c, s in zip(func.children, func.children_signatures)]
+    if isinstance(func, Memo):
+        return [(func.child, func.child_signature, 1)]
+    if isinstance(func, Repeat):
+        return [(func.body, func.body_signature, func.times)]
+    if isinstance(func, Scan):
+        return [(func.body, func.body_signature, func.n)]
+    if isinstance(func, WhileLoop):
+        return [
+            (func.cond, func.cond_signature, 1),
+            (func.body, func.body_signature, 1),
+        ]
+    if isinstance(func, Switch):
+        cases = zip(func.cases, func.cases_signatures)
+        return [(func.selector, func.selector_signature, 1)] + [
+            (case, signature, 1) for case, signature in cases
+        ]
+    return []
+
+
+def _estimate(node: Node) -> None:
+    """Estimates statistics of the node, whose children are estimated."""
+    func, signature, children = node.func, node.signature, node.children
+    estimate = _STACK_HEIGHTS.get(type(func), _leaf_stack_height)
+    node.stack_height = estimate(node)
+    allocations = _allocations(func, signature, len(children))
+    if isinstance(func, Switch):
+        # Only one case is called, so the most expensive one is counted.
+        selector, *cases = children
+        case = max(cases, key=lambda case: case.cost)
+        called = [(selector.allocations, selector.cost), (case.allocations, case.cost)]
+    else:
+        called = [
+            (child.allocations * child.repetitions, child.cost * child.repetitions)
+            for child in children
+        ]
+    node.allocations = allocations + sum(n for n, _ in called)
+    if not isinstance(func, Combinator) or fn.infer_cost(func) is not None:
+        own_cost = _function_cost(func)
+    elif isinstance(func, Foldl):
+        own_cost = _function_cost(func.func) * max(signature.n_in - 1, 0)
+    else:
+        own_cost = 0.0
+    node.cost = own_cost + allocations * ALLOCATION_COST + sum(c for _, c in called)
+
+
+def _function_cost(func: Fn) -> float:
+    value = fn.infer_cost(func)
+    return FUNCTION_COST if value is None else value
+
+
+# pylint: disable=too-many-return-statements
+def _allocations(func: Fn, signature: Signature, n_children: int) -> int:
+    """Estimates a number of tuples allocated by the combinator itself."""
+    if not isinstance(func, Combinator):
+        return 0
+    # A call of a function slices its inputs and the rest of the stack,
+    # collects its outputs and joins them with the rest.
+    per_call = 4 + (signature.reshape_plan is not None)
+    if isinstance(func, Serial):
+        return per_call * n_children
+    if isinstance(func, Parallel):
+        # Inputs of each function are sliced from the stack first, and
+        # outputs are joined with the rest of the stack at the end.
+        return (per_call + 2) * n_children + 2
+    if isinstance(func, (Memo, WhileLoop)):
+        return per_call * n_children + 1
+    if isinstance(func, Switch):
+        # The selector and one of the cases are called.
+        return per_call * 2
+    if isinstance(func, (Repeat, Scan)):
+        return per_call + 1
+    return _LEAF_ALLOCATIONS.get(type(func), 0)
+
+
+_LEAF_ALLOCATIONS: Dict[type, int] = {
+    Select: 3,
+    Drop: 1,
+    Dup: 3,
+    Identity: 0,
+    Foldl: 2,
+}
+"""numbers of tuples allocated by combinators without composite functions."""
+
+
+def _leaf_stack_height(node: Node) -> int:
+    return max(node.signature.n_in, node.signature.n_out)
+
+
+def _serial_stack_height(node: Node) -> int:
+    height = peak = node.signature.n_in
+    for child in node.children:
+        n_in, n_out = child.signature.n_in, child.signature.n_out
+        peak = max(peak, height - n_in + child.stack_height)
+        height += n_out - n_in
+    return max(peak, height)
+
+
+def _parallel_stack_height(node: Node) -> int:
+    n_in = node.signature.n_in
+    n_outputs, peak = 0, n_in
+    for child in node.children:
+        # Outputs of previous functions, the call, and inputs of next ones.
+        _, n_upper = child.signature.index_bounds
+        peak = max(peak, n_outputs + child.stack_height + n_in - n_upper)
+        n_outputs += child.signature.n_out
+    return max(peak, n_outputs)
+
+
+def _repeat_stack_height(node: Node) -> int:
+    (body,) = node.children
+    height = peak = node.signature.n_in
+    n_in, n_out = body.signature.n_in, body.signature.n_out
+    for _ in range(body.repetitions):
+        peak = max(peak, height - n_in + body.stack_height)
+        height += n_out - n_in
+        if n_out == n_in:
+            # The rest of repetitions are the same.
+            break
+    return max(peak, height)
+
+
+def _nested_stack_height(node: Node) -> int:
+    n_in = node.signature.n_in
+    heights = [n_in - c.signature.n_in + c.stack_height for c in node.children]
+    return max([n_in, node.signature.n_out, *heights])
+
+
+_STACK_HEIGHTS: Dict[type, Callable[[Node], int]] = {
+    Serial: _serial_stack_height,
+    Parallel: _parallel_stack_height,
+    Repeat: _repeat_stack_height,
+    Scan: _nested_stack_height,
+    Memo: _nested_stack_height,
+    WhileLoop: _nested_stack_height,
+    Switch: _nested_stack_height,
+}
+"""estimators of stack heights of combinators with composite functions."""
+
+
+def _critical_path(root: Node) -> List[Node]:
+    """Follows functions taking the most time (or cost) from the root."""
+
+    def weight(node: Node) -> Any:
+        # Measured functions outweigh estimated ones.
+        if node.time is not None:
+            return (1, node.time)
+        return (0, node.cost * node.repetitions)
+
+    path = [root]
+    while path[-1].children:
+        path.append(max(path[-1].children, key=weight))
+    return path
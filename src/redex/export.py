@@ -0,0 +1,296 @@
+"""Exporting compiled combinators as standalone python modules.
+
+Building a combinator tree constructs every combinator and infers signatures
+of all its functions. `export` writes the tree compiled by `redex.compiler`
+into a python module, so other processes load the checked and lowered plan
+without building the tree again:
+
+- functions are imported by their import paths, such as `operator.add`.
+  Functions that can't be imported (e.g. bound methods, partial functions)
+  are serialized by `redex.serialize`;
+- the module records a fingerprint of the tree, a hash of its serialized
+  structure, and the version of redex it is exported by.
+
+`PlanCache` keeps exported modules in a directory, so only the first
+process builds and compiles the tree.
+
+*Note that modules may include pickled functions, so only trusted modules
+must be loaded*.
+"""
+
+import os
+import ast
+import hashlib
+import tempfile
+import importlib
+import importlib.util
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+from dataclasses import dataclass, field
+from redex import serialize, compiler
+from redex import function as fn
+from redex.function import Fn, FineCallable
+from redex.version import __version__
+
+
+@dataclass(frozen=True)
+class Plan(FineCallable):
+    """The combinator loaded from the exported module."""
+
+    fingerprint: str
+    """a hash of the structure of the original combinator."""
+
+    path: Path
+    """a path of the module."""
+
+    func: Fn = field(repr=False)
+    """a compiled function."""
+
+    def __call__(self, *inputs: Any) -> Any:
+        return self.func(*inputs)
+
+
+def fingerprint(func: Fn) -> str:
+    """Hashes the structure of the combinator.
+
+    Equal combinators have equal fingerprints, and executors or caches
+    of combinators don't change them.
+
+    >>> import operator as op
+    >>> from redex import combinator as cb
+    >>> from redex.export import fingerprint
+    >>> fingerprint(cb.serial(op.add, op.neg)) == fingerprint(cb.serial(op.add, op.neg))
+    True
+
+    Args:
+        func: a combinator or any other function.
+
+    Returns:
+        a hexadecimal digest.
+    """
+    return hashlib.sha256(serialize.dumps(func)).hexdigest()
+
+
+def export(func: Fn, path: Union[str, Path]) -> None:
+    """Compiles the combinator, and writes it as a python module.
+
+    The module is written atomically, so concurrent processes see either
+    the whole module or none.
+
+    >>> import operator as op
+    >>> import tempfile, pathlib
+    >>> from redex import combinator as cb
+    >>> from redex.export import export, load
+    >>> with tempfile.TemporaryDirectory() as directory:
+    ...     path = pathlib.Path(directory, "plan.py")
+    ...     export(cb.serial(cb.dup(), op.mul, op.add), path)
+    ...     load(path)(3, 1) == 3 * 3 + 1
+    True
+
+    Args:
+        func: a combinator or any other function.
+        path: a path of the module.
+
+    Raises:
+        ValueError: if some function of the combinator requires more inputs
+            than available to it.
+        pickle.PicklingError: if some function can't be imported or pickled.
+    """
+    path = Path(path)
+    source = _module_source(func)
+    # The module is renamed into place once it's written completely.
+    descriptor, temporary = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.stem}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(descriptor, "w", encoding="utf-8") as file:
+            file.write(source)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def load(path: Union[str, Path]) -> Plan:
+    """Loads the exported module.
+
+    Args:
+        path: a path of the module.
+
+    Returns:
+        a plan with the same signature as the exported combinator.
+
+    Raises:
+        ValueError: if the module isn't exported by this version of redex.
+        ImportError: if some function the module imports can't be imported.
+    """
+    path = Path(path)
+    # Modules of other versions may import names that don't exist anymore,
+    # so the version is checked before the module is executed.
+    version = _exported_version(path.read_text(encoding="utf-8"))
+    if version != __version__:
+        raise ValueError(
+            f"The `{path}` is exported by redex `{version}`, "
+            f"but `{__version__}` is used."
+        )
+    name = "redex_plan_" + hashlib.sha256(str(path.resolve()).encode()).hexdigest()
+    spec = importlib.util.spec_from_file_location(name, path)
+    if spec is None or spec.loader is None:
+        raise ValueError(f"The `{path}` isn't a python module.")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return Plan(
+        signature=module.SIGNATURE,
+        fingerprint=module.FINGERPRINT,
+        path=path,
+        func=module.plan,
+    )
+
+
+class PlanCache:
+    """The directory of exported combinators.
+
+    >>> import operator as op
+    >>> import tempfile
+    >>> from redex import combinator as cb
+    >>> from redex.export import PlanCache
+    >>> with tempfile.TemporaryDirectory() as directory:
+    ...     cache = PlanCache(directory)
+    ...     plan = cache.load("residual", lambda: cb.residual(op.neg))
+    ...     # Other processes load the plan without building the combinator.
+    ...     same = PlanCache(directory).load("residual", lambda: None)
+    ...     plan(2), same.fingerprint == plan.fingerprint
+    (0, True)
+    """
+
+    def __init__(self, directory: Union[str, Path]) -> None:
+        """Initializes the cache.
+
+        Args:
+            directory: a directory of modules. It's created if it's missing.
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def path(self, key: str) -> Path:
+        """Finds a path of the module exported by the key.
+
+        Args:
+            key: a key of the combinator.
+
+        Returns:
+            a path of the module.
+        """
+        digest = hashlib.sha256(key.encode()).hexdigest()[:32]
+        return self.directory / f"plan_{digest}.py"
+
+    def load(self, key: str, build: Callable[[], Fn]) -> Plan:
+        """Loads the combinator, building and exporting it if it isn't cached.
+
+        Keys must change whenever combinators built by them change,
+        e.g. they may include versions of the code that builds them.
+
+        Args:
+            key: a key of the combinator.
+            build: a function that builds the combinator.
+
+        Returns:
+            a plan of the combinator.
+        """
+        path = self.path(key)
+        if path.exists():
+            try:
+                return load(path)
+            except (ValueError, ImportError, AttributeError):
+                # Modules exported by other versions of redex, or importing
+                # functions that don't exist anymore, are replaced.
+                pass
+        export(build(), path)
+        return load(path)
+
+    def plan(self, func: Fn) -> Plan:
+        """Loads the combinator keyed by its fingerprint, exporting it
+        if it isn't cached.
+
+        The combinator is built already, but it's compiled only once.
+
+        Args:
+            func: a combinator or any other function.
+
+        Returns:
+            a plan of the combinator.
+        """
+        key = fingerprint(func)
+        return self.load(f"fingerprint:{key}", lambda: func)
+
+
+def _module_source(func: Fn) -> str:
+    """Generates a source code of the module holding the compiled combinator."""
+    compiled = compiler.compile(func)
+    name = getattr(compiled.func, "__name__")
+    lines = [
+        f'"""The `{fn.infer_name(func)}` exported by redex {__version__}.',
+        "",
+        "The module is generated by `redex.export`, don't edit it.",
+        '"""',
+        "",
+        "# pylint: skip-file",
+        "from redex import serialize as _serialize",
+        "from redex.function import Signature",
+        *_bindings(compiled.namespace),
+        "",
+        f"REDEX_VERSION = {__version__!r}",
+        f"FINGERPRINT = {fingerprint(func)!r}",
+        f"SIGNATURE = Signature(n_in={compiled.signature.n_in}, "
+        f"n_out={compiled.signature.n_out})",
+        "",
+        "",
+        compiled.source.rstrip("\n"),
+        "",
+        "",
+        f"plan = {name}",
+        "",
+    ]
+    return "\n".join(lines)
+
+
+def _exported_version(source: str) -> Optional[str]:
+    """Finds the version of redex the module is exported by, without
+    executing it."""
+    for line in source.splitlines():
+        if line.startswith("REDEX_VERSION = "):
+            try:
+                version = ast.literal_eval(line[len("REDEX_VERSION = ") :])
+            except (ValueError, SyntaxError):
+                return None
+            return version if isinstance(version, str) else None
+    return None
+
+
+def _bindings(namespace: Dict[str, Any]) -> List[str]:
+    """Generates statements binding objects the compiled function refers to."""
+    lines = []
+    for name, obj in namespace.items():
+        statement = _import_statement(name, obj)
+        if statement is None:
+            statement = f"{name} = _serialize.loads({serialize.dumps(obj)!r})"
+        lines.append(statement)
+    return lines
+
+
+def _import_statement(name: str, obj: Any) -> Optional[str]:
+    """Generates the statement importing the object, or `None` if it can't
+    be imported."""
+    module = getattr(obj, "__module__", None)
+    qualname = getattr(obj, "__qualname__", None)
+    if not isinstance(module, str) or not isinstance(qualname, str):
+        return None
+    if module == "__main__" or not qualname.isidentifier():
+        return None
+    try:
+        imported = getattr(importlib.import_module(module), qualname)
+    except (ImportError, AttributeError):
+        return None
+    if imported is not obj:
+        return None
+    return f"from {module} import {qualname} as {name}"
@@ -1,20 +1,30 @@
 """Functions are building blocks for algorithms."""
 
+import math
 import types
 import inspect
-from typing import Any, Callable, Iterable, List, NoReturn, Optional, Union
-from dataclasses import dataclass
+import weakref
+import threading
+import builtins
+import operator
+import functools
+from typing import Any, Callable, Dict, Iterable, List, MutableMapping, NoReturn
+from typing import Optional, TypeVar, Union
+from dataclasses import dataclass, field
 from functools import reduce
 from redex import util
 
 
-@dataclass
+@util.slotted(weakref=True)
+@dataclass(frozen=True)
 class Signature:
     """The function signature.
 
     The signature describes properties essential for a function
     to work on the stack. These properties either inferred from function
-    type annotation or set explicitly.
+    type annotation or set explicitly. Signatures are immutable, because
+    they are shared by functions (use `dataclasses.replace` to change them).
+    Equal signatures may be shared with `intern_signature`.
     """
 
     n_in: int
@@ -30,11 +40,32 @@ class Signature:
     """the shape of inputs with `()` meaning the function doesn't
     have any input arguments."""
 
+    out_shape: Optional[tuple[Any, ...]] = None
+    """the declared shape of outputs with `()` meaning the function
+    returns a single value (or nothing if `n_out` is zero). If not set,
+    any tuples in outputs are flattened."""
+
+    reshape_plan: Optional[util.PlanFn] = field(init=False, repr=False, compare=False)
+    """the plan reshaping inputs into arguments, or `None` if arguments are flat."""
+
+    flatten_plan: Optional[util.PlanFn] = field(init=False, repr=False, compare=False)
+    """the plan flattening outputs of the declared shape, or `None` if they
+    are flat or their shape isn't declared."""
+
     def __post_init__(self) -> None:
         """Initializes the shape of inputs if its value isn't
-        set explicitly."""
+        set explicitly, and compiles plans for the shapes."""
         if not self.in_shape and self.n_in != 0:
-            self.in_shape = _infer_flat_input_shape(n_args=self.n_in)
+            in_shape = _infer_flat_input_shape(n_args=self.n_in)
+            object.__setattr__(self, "in_shape", in_shape)
+        object.__setattr__(self, "reshape_plan", util.reshape_plan(self.in_shape))
+        flatten_plan = util.flatten_plan(self.out_shape) if self.out_shape else None
+        object.__setattr__(self, "flatten_plan", flatten_plan)
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # Plans are recompiled instead of being pickled.
+        fields = (self.n_in, self.n_out, self.start_index, self.in_shape)
+        return (Signature, (*fields, self.out_shape))
 
     @property
     def index_bounds(self) -> tuple[int, int]:
@@ -43,7 +74,8 @@ class Signature:
         return (start, start + self.n_in)
 
 
-@dataclass
+@util.slotted()
+@dataclass(frozen=True)
 class FineCallable:
     """The callable object with a signature."""
 
@@ -54,6 +86,9 @@ class FineCallable:
 Fn = Callable[..., Any]
 """The function."""
 
+F = TypeVar("F", bound=Fn)
+"""The function of some type."""
+
 FnIter = Union[Fn, Iterable[Fn]]
 """A single function or sequence of functions."""
 # FnIter = Union[Fn, Iterable["FnIter"]]
@@ -100,9 +135,80 @@ def infer_signature(func: Fn) -> Signature:
     if isinstance(func, FineCallable):
         return func.signature
 
+    try:
+        return _BUILTIN_SIGNATURES[func]
+    except (KeyError, TypeError):
+        # Unhashable callables can't be found in the table.
+        pass
+
+    cache, key = _signature_cache(func)
+    if cache is None:
+        return _inspect_signature(func)
+
+    try:
+        signature: Optional[Signature] = cache.get(key)
+    except TypeError:
+        # The key doesn't support weak references.
+        return _inspect_signature(func)
+
+    if signature is None:
+        signature = cache[key] = _inspect_signature(func)
+    return signature
+
+
+def intern_signature(signature: Signature) -> Signature:
+    """Finds an equal signature shared by other functions.
+
+    Combinator trees have a lot of equal signatures. Sharing them saves
+    memory of large trees.
+
+    >>> from redex import function as fn
+    >>> signature = fn.intern_signature(fn.Signature(n_in=2, n_out=1))
+    >>> fn.intern_signature(fn.Signature(n_in=2, n_out=1)) is signature
+    True
+
+    Args:
+        signature: a signature.
+
+    Returns:
+        the shared signature equal to the given one.
+    """
+    key = (
+        signature.n_in,
+        signature.n_out,
+        signature.start_index,
+        signature.in_shape,
+        signature.out_shape,
+    )
+    with _SIGNATURES_LOCK:
+        return _SIGNATURES.setdefault(key, signature)
+
+
+_SIGNATURES: "weakref.WeakValueDictionary[Any, Signature]" = (
+    weakref.WeakValueDictionary()
+)
+"""shared signatures, keyed by their fields."""
+
+_SIGNATURES_LOCK = threading.Lock()
+"""the lock of shared signatures."""
+
+
+def _inspect_signature(func: Fn) -> Signature:
+    """Infers a signature of the function from its type annotation.
+
+    Args:
+        func: a function.
+
+    Returns:
+        the function signature.
+
+    Raises:
+        ValueError: if the annotation include variadic tuples.
+    """
     signature = inspect.signature(func)
     try:
         n_out = _count_outputs(func, signature)
+        out_shape = _infer_output_shape(func, signature)
         in_shape = _infer_input_shape(func, signature)
     except ValueError as err:
         raise ValueError(
@@ -116,9 +222,115 @@ def infer_signature(func: Fn) -> Signature:
         n_in=n_in,
         n_out=n_out,
         in_shape=in_shape,
+        out_shape=out_shape,
     )
 
 
+_Cache = MutableMapping[Any, Signature]
+
+_FUNCTION_SIGNATURES: "weakref.WeakKeyDictionary[Any, Signature]" = (
+    weakref.WeakKeyDictionary()
+)
+"""signatures of functions, builtins and classes, keyed by themselves."""
+
+_METHOD_SIGNATURES: "weakref.WeakKeyDictionary[Any, Signature]" = (
+    weakref.WeakKeyDictionary()
+)
+"""signatures of bound methods, keyed by their underlying functions."""
+
+_INSTANCE_SIGNATURES: "weakref.WeakKeyDictionary[Any, Signature]" = (
+    weakref.WeakKeyDictionary()
+)
+"""signatures of callable objects, keyed by their types."""
+
+_PARTIAL_SIGNATURES: "weakref.WeakKeyDictionary[Any, _Cache]" = (
+    weakref.WeakKeyDictionary()
+)
+"""signatures of partial functions, keyed by their underlying functions,
+then by a number of positional arguments and names of keyword arguments."""
+
+
+# pylint: disable=too-many-return-statements
+def _signature_cache(func: Fn) -> tuple[Optional[_Cache], Any]:
+    """Finds a cache for signatures of the function.
+
+    Bound methods, partial functions and callable objects are usually
+    created anew, so their signatures are cached by the objects they share.
+
+    Args:
+        func: a function.
+
+    Returns:
+        a cache and a key for the function, or `None` if the function
+        can't be cached.
+    """
+    if isinstance(func, functools.partial):
+        try:
+            cache = _PARTIAL_SIGNATURES.setdefault(func.func, {})
+        except TypeError:
+            # The function doesn't support weak references.
+            return None, None
+        return cache, (len(func.args), tuple(sorted(func.keywords)))
+
+    if isinstance(func, types.MethodType):
+        return _METHOD_SIGNATURES, func.__func__
+
+    if isinstance(func, types.BuiltinFunctionType):
+        # Builtin methods are bound to arbitrary objects, unlike functions.
+        if func.__self__ is None or isinstance(func.__self__, types.ModuleType):
+            return _FUNCTION_SIGNATURES, func
+        return None, None
+
+    if isinstance(func, (types.FunctionType, type)):
+        return _FUNCTION_SIGNATURES, func
+
+    if isinstance(getattr(type(func), "__call__", None), types.FunctionType):
+        return _INSTANCE_SIGNATURES, type(func)
+
+    return None, None
+
+
+def _builtin_signatures() -> Dict[Any, Signature]:
+    """Makes a table of signatures for standard functions.
+
+    Some of these functions don't have introspectable signatures at all,
+    others take variadic or optional arguments. Their signatures describe
+    the most common use.
+
+    Returns:
+        signatures keyed by functions.
+    """
+    spec = [
+        (operator, 1, 1, "abs index inv invert length_hint neg not_ pos truth"),
+        (operator, 2, 1, "add and_ concat contains countOf eq floordiv ge getitem"),
+        (operator, 2, 1, "gt indexOf is_ is_not le lshift lt matmul mod mul ne or_"),
+        (operator, 2, 1, "pow rshift sub truediv xor delitem"),
+        (operator, 2, 1, "iadd iand iconcat ifloordiv ilshift imatmul imod imul"),
+        (operator, 2, 1, "ior ipow irshift isub itruediv ixor"),
+        (operator, 3, 1, "setitem"),
+        (math, 1, 1, "acos acosh asin asinh atan atanh cbrt ceil cos cosh degrees"),
+        (math, 1, 1, "erf erfc exp exp2 expm1 fabs factorial floor fsum gamma"),
+        (math, 1, 1, "isfinite isinf isnan isqrt lgamma log log10 log1p log2 perm"),
+        (math, 1, 1, "prod radians sin sinh sqrt tan tanh trunc ulp"),
+        (math, 1, 2, "frexp modf"),
+        (math, 2, 1, "atan2 comb copysign dist fmod gcd hypot isclose lcm ldexp"),
+        (math, 2, 1, "nextafter pow remainder"),
+        (builtins, 1, 1, "abs all any ascii bin bool callable chr complex float"),
+        (builtins, 1, 1, "format frozenset hash hex id int iter len list next oct"),
+        (builtins, 1, 1, "ord repr reversed round set sorted str sum tuple"),
+        (builtins, 2, 1, "getattr hasattr isinstance issubclass max min pow"),
+        (builtins, 2, 2, "divmod"),
+    ]
+    signatures = {}
+    for module, n_in, n_out, names in spec:
+        signature = Signature(n_in=n_in, n_out=n_out)
+        for name in names.split():
+            # Some functions are only available in recent python versions.
+            if hasattr(module, name):
+                signatures[getattr(module, name)] = signature
+    return signatures
+
+
 def _count_outputs(func: Fn, signature: Optional[inspect.Signature] = None) -> int:
     """Counts a number of outputs of the function.
 
@@ -166,6 +378,39 @@ def _count_outputs(func: Fn, signature: Optional[inspect.Signature] = None) -> i
     return 1
 
 
+def _infer_output_shape(
+    func: Fn,
+    signature: Optional[inspect.Signature] = None,
+) -> Optional[tuple[Any, ...]]:
+    """Infers a shape of outputs of the function.
+
+    Only a shape of outputs defined as a parameterized tuple is declared.
+    Outputs of any other type are flattened at the time of call.
+
+    Args:
+        func: a function.
+        signature: optional signature of the function. If not set,
+            it will be inferred.
+
+    Returns:
+        a shape of outputs, or `None` if it's not declared.
+
+    Raises:
+        ValueError: if the annotation include variadic tuples.
+            Variadic tuples nested in other then tuple annotations
+            (e.g. `Sequence(tuple[Any, ...])`) are fine.
+    """
+    if signature is None:
+        signature = inspect.signature(func)
+
+    output_type = signature.return_annotation
+    if isinstance(output_type, types.GenericAlias) and output_type.__origin__ is tuple:
+        # `ValueError` may be reised if type annotation include variadic tuples.
+        return util.infer_tuple_annotation_shape(output_type)
+
+    return None
+
+
 def _infer_input_shape(
     func: Fn,
     signature: Optional[inspect.Signature] = None,
@@ -211,6 +456,7 @@ def _infer_input_shape(
     return tuple(shapes)
 
 
+@functools.lru_cache(maxsize=None)
 def _infer_flat_input_shape(n_args: int) -> tuple[Any, ...]:
     """Compute a shape of inputs that function are not tuples.
 
@@ -221,3 +467,119 @@ def _infer_flat_input_shape(n_args: int) -> tuple[Any, ...]:
         a shape of inputs.
     """
     return tuple([()] * n_args)
+
+
+_BUILTIN_SIGNATURES = _builtin_signatures()
+"""signatures of standard functions."""
+
+
+def pure(func: F) -> F:
+    """Marks the function as pure.
+
+    Outputs of the pure function depend only on its inputs, and the function
+    doesn't have any side effects. So, optimizations may skip or share
+    its calls.
+
+    >>> from redex import function as fn
+    >>> @fn.pure
+    ... def double(x):
+    ...     return x * 2
+    >>> fn.is_pure(double)
+    True
+
+    Args:
+        func: a function.
+
+    Returns:
+        the same function.
+    """
+    setattr(func, "__pure__", True)
+    return func
+
+
+def is_pure(func: Fn) -> bool:
+    """Checks whether the function is pure.
+
+    Standard arithmetic functions are pure. Combinators are pure if all
+    their composite functions are pure.
+
+    Args:
+        func: a function.
+
+    Returns:
+        `True` if the function is known to be pure, `False` otherwise.
+    """
+    try:
+        if func in _PURE_BUILTINS:
+            return True
+    except TypeError:
+        # Unhashable callables can't be found in the set.
+        pass
+    return getattr(func, "__pure__", False) is True
+
+
+def cost(value: float) -> Callable[[F], F]:
+    """Annotates the function with an estimated cost of its call.
+
+    The cost is relative to a call of a standard arithmetic function,
+    which costs `1.0`. Costs are used by `redex.explain`.
+
+    >>> from redex import function as fn
+    >>> @fn.cost(10.0)
+    ... def solve(x):
+    ...     return x
+    >>> fn.infer_cost(solve)
+    10.0
+
+    Args:
+        value: an estimated cost.
+
+    Returns:
+        a decorator annotating the function.
+    """
+
+    def annotate(func: F) -> F:
+        setattr(func, "__cost__", value)
+        return func
+
+    return annotate
+
+
+def infer_cost(func: Fn) -> Optional[float]:
+    """Finds the annotated cost of the function.
+
+    Args:
+        func: a function.
+
+    Returns:
+        an estimated cost of the call, or `None` if it isn't annotated.
+    """
+    value = getattr(func, "__cost__", None)
+    return None if value is None else float(value)
+
+
+def _pure_builtins() -> frozenset[Any]:
+    """Makes a set of standard functions without side effects."""
+    spec = [
+        (operator, "abs add and_ concat contains countOf eq floordiv ge getitem"),
+        (operator, "gt indexOf index inv invert is_ is_not le lshift lt matmul"),
+        (operator, "mod mul ne neg not_ or_ pos pow rshift sub truediv truth xor"),
+        (math, "acos acosh asin asinh atan atan2 atanh cbrt ceil comb copysign"),
+        (math, "cos cosh degrees dist erf erfc exp exp2 expm1 fabs factorial"),
+        (math, "floor fmod frexp gamma gcd hypot isclose isfinite isinf isnan"),
+        (math, "isqrt lcm ldexp lgamma log log10 log1p log2 modf nextafter perm"),
+        (math, "pow radians remainder sin sinh sqrt tan tanh trunc ulp"),
+        (builtins, "abs ascii bin bool chr complex divmod float hex int len max"),
+        (builtins, "min oct ord pow repr round str"),
+    ]
+    return frozenset(
+        getattr(module, name)
+        for module, names in spec
+        for name in names.split()
+        # Some functions are only available in recent python versions.
+        if hasattr(module, name)
+    )
+
+
+_PURE_BUILTINS = _pure_builtins()
+"""standard functions without side effects."""
@@ -0,0 +1,758 @@
+"""Observers watch combinators execute.
+
+Installed observers are notified before and after each call of a function
+by a combinator, including the top-level call of a combinator. Each call
+is identified by its path in the combinator tree, such as
+`("Serial", "1:Parallel", "0:add")`, where each item is a name of the function
+prefixed with its position among calls made by the parent.
+
+When no observer is installed, combinators only check that the list of
+observers is empty. Observers may skip calls made by a top-level call
+(see `Observer.observes_nested`), which are then made directly as well.
+Compiled combinators and programs of the virtual machine aren't observed.
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import tracemalloc
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, IO, Iterator, List, Optional, Union
+from pathlib import Path
+from redex import util
+from redex import function as fn
+from redex.function import Fn, Signature
+
+
+@dataclass
+class Event:
+    """The call of a function observed by observers."""
+
+    func: Fn
+    """a called function."""
+
+    path: tuple[str, ...]
+    """a path of the call in the combinator tree."""
+
+    stack: tuple[Any, ...] = field(repr=False)
+    """a stack the function is applied to."""
+
+    signature: Optional[Signature]
+    """a signature of the function."""
+
+    start: float = 0.0
+    """a time the call started (in seconds of `time.perf_counter`)."""
+
+    duration: Optional[float] = None
+    """a duration of the call (in seconds), or `None` if the call isn't finished."""
+
+    error: Optional[BaseException] = None
+    """an exception raised by the call."""
+
+    @property
+    def depth(self) -> int:
+        """a depth of the call in the combinator tree."""
+        return len(self.path)
+
+    @property
+    def stack_size(self) -> int:
+        """a size of the stack the function is applied to."""
+        return len(self.stack)
+
+
+class Observer:
+    """The base class for observers."""
+
+    def before(self, event: Event) -> None:
+        """Called before the function is called."""
+
+    def after(self, event: Event) -> None:
+        """Called after the function is called, even if it raised an exception."""
+
+    def observes_nested(self, event: Event) -> bool:
+        """Called after `before` for top-level calls to decide whether calls
+        made by the function are observed.
+
+        Nested calls are observed if any installed observer observes them.
+        Otherwise, they're made directly, as if no observer is installed.
+
+        Returns:
+            whether the observer is notified about nested calls.
+        """
+        # pylint: disable=unused-argument
+        return True
+
+
+OBSERVERS: List[Observer] = []
+"""installed observers (use `install` and `uninstall` to change them)."""
+
+_Call = Callable[[Fn, tuple[Any, ...], Any], tuple[Any, ...]]
+
+
+@dataclass
+class _Frame:
+    """The call in progress."""
+
+    path: tuple[str, ...]
+    n_children: int = 0
+    observed: bool = True
+
+
+_FRAME: contextvars.ContextVar[Optional[_Frame]] = contextvars.ContextVar(
+    "redex_observer_frame", default=None
+)
+
+
+def install(observer: Observer) -> None:
+    """Installs the observer.
+
+    Args:
+        observer: an observer to notify about calls.
+    """
+    OBSERVERS.append(observer)
+
+
+def uninstall(observer: Observer) -> None:
+    """Uninstalls the observer.
+
+    Args:
+        observer: an installed observer.
+
+    Raises:
+        ValueError: if the observer isn't installed.
+    """
+    OBSERVERS.remove(observer)
+
+
+@contextmanager
+def observing(*observers: Observer) -> Iterator[None]:
+    """Installs observers for the duration of the context.
+
+    >>> import operator as op
+    >>> from redex import combinator as cb
+    >>> from redex import observer as obs
+    >>> trace = obs.ChromeTraceObserver()
+    >>> with obs.observing(trace):
+    ...     cb.serial(op.add, op.neg)(1, 2)
+    -3
+    >>> [event["name"] for event in trace.events]
+    ['add', 'neg', 'Serial']
+
+    Args:
+        observers: observers to install.
+    """
+    for observer in observers:
+        install(observer)
+    try:
+        yield
+    finally:
+        for observer in observers:
+            uninstall(observer)
+
+
+def is_observing() -> bool:
+    """Checks whether some call is being observed in the current context.
+
+    Returns:
+        `True` if a call is in progress, `False` otherwise.
+    """
+    return _FRAME.get() is not None
+
+
+def fork(n_calls: int) -> List[contextvars.Context]:
+    """Makes contexts for calls that run concurrently.
+
+    The calls keep their positions among calls made by the parent, as if
+    they were made one after another.
+
+    Args:
+        n_calls: a number of calls.
+
+    Returns:
+        a context to run each call in.
+    """
+    parent = _FRAME.get()
+    if parent is not None and not parent.observed:
+        # Calls inherit the frame, which isn't observed.
+        return [contextvars.copy_context() for _ in range(n_calls)]
+    contexts = []
+    for i in range(n_calls):
+        context = contextvars.copy_context()
+        if parent is not None:
+            frame = _Frame(path=parent.path, n_children=parent.n_children + i)
+            context.run(_FRAME.set, frame)
+        contexts.append(context)
+    if parent is not None:
+        parent.n_children += n_calls
+    return contexts
+
+
+def observe(
+    func: Fn,
+    stack: tuple[Any, ...],
+    signature: Optional[Signature],
+    call: _Call,
+) -> tuple[Any, ...]:
+    """Makes an observed call of the function.
+
+    Args:
+        func: a function to call.
+        stack: a stack the function is applied to.
+        signature: a signature of the function.
+        call: makes the actual call given the function, stack and signature.
+
+    Returns:
+        the stack returned by the call.
+    """
+    parent = _FRAME.get()
+    if parent is not None and not parent.observed:
+        # Calls made by the unobserved top-level call are made directly.
+        return call(func, stack, signature)
+
+    name = fn.infer_name(func)
+    if parent is None:
+        path: tuple[str, ...] = (name,)
+    else:
+        path = (*parent.path, f"{parent.n_children}:{name}")
+        parent.n_children += 1
+
+    event = Event(func=func, path=path, stack=stack, signature=signature)
+    for observer in OBSERVERS:
+        observer.before(event)
+
+    observed = parent is not None or any(
+        observer.observes_nested(event) for observer in OBSERVERS
+    )
+    token = _FRAME.set(_Frame(path=path, observed=observed))
+    event.start = time.perf_counter()
+    try:
+        return call(func, stack, signature)
+    except BaseException as err:
+        event.error = err
+        raise
+    finally:
+        event.duration = time.perf_counter() - event.start
+        _FRAME.reset(token)
+        for observer in reversed(OBSERVERS):
+            observer.after(event)
+
+
+class ChromeTraceObserver(Observer):
+    """Records calls as Chrome trace events.
+
+    The trace can be opened with `chrome://tracing` or Perfetto.
+    """
+
+    def __init__(self, max_events: Optional[int] = None) -> None:
+        """Initializes the observer.
+
+        Args:
+            max_events: a maximum number of events to record. Events
+                beyond the limit are ignored.
+        """
+        self.events: List[Dict[str, Any]] = []
+        self.max_events = max_events
+
+    def after(self, event: Event) -> None:
+        if self.max_events is not None and len(self.events) >= self.max_events:
+            return
+        self.events.append(
+            {
+                "name": fn.infer_name(event.func),
+                "cat": "redex",
+                "ph": "X",
+                "ts": event.start * 1e6,
+                "dur": (event.duration or 0.0) * 1e6,
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+                "args": {
+                    "path": "/".join(event.path),
+                    "stack_size": event.stack_size,
+                    "error": None if event.error is None else repr(event.error),
+                },
+            }
+        )
+
+    def dump(self, file: IO[str]) -> None:
+        """Writes the trace in JSON format.
+
+        Args:
+            file: a text file to write to.
+        """
+        json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, file)
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Writes the trace to a file in JSON format.
+
+        Args:
+            path: a path of the file.
+        """
+        with open(path, "w", encoding="utf-8") as file:
+            self.dump(file)
+
+
+class TimingObserver(Observer):
+    """Sums durations of calls by their paths.
+
+    >>> import operator as op
+    >>> from redex import combinator as cb
+    >>> from redex import observer as obs
+    >>> timing = obs.TimingObserver()
+    >>> with obs.observing(timing):
+    ...     cb.serial(op.add, op.neg)(1, 2)
+    -3
+    >>> sorted(timing.counts.items())
+    [(('Serial',), 1), (('Serial', '0:add'), 1), (('Serial', '1:neg'), 1)]
+    """
+
+    def __init__(self) -> None:
+        # Total durations (in seconds) and numbers of calls by paths.
+        self.durations: Dict[tuple[str, ...], float] = {}
+        self.counts: Dict[tuple[str, ...], int] = {}
+
+    def after(self, event: Event) -> None:
+        path = event.path
+        self.durations[path] = self.durations.get(path, 0.0) + (event.duration or 0.0)
+        self.counts[path] = self.counts.get(path, 0) + 1
+
+
+class LoggingObserver(Observer):
+    """Logs calls with the debug level."""
+
+    def __init__(self, logger: Optional[logging.Logger] = None) -> None:
+        """Initializes the observer.
+
+        Args:
+            logger: a logger to use. Defaults to the root logger.
+        """
+        self.logger = logger or logging.getLogger()
+
+    def before(self, event: Event) -> None:
+        self.logger.debug(
+            "constrained_call :: %s stack_size=%s  signature=%s",
+            "/".join(event.path).ljust(20),
+            event.stack_size,
+            event.signature,
+        )
+
+
+@dataclass
+class MemoryStats:
+    """Memory used by calls of a function."""
+
+    calls: int = 0
+    """a number of calls."""
+
+    peak: int = 0
+    """the largest growth of traced memory during a call (in bytes)."""
+
+    retained: int = 0
+    """a number of bytes allocated by calls, but not released by their ends,
+    including bytes retained by called functions."""
+
+    own_retained: int = 0
+    """a number of bytes retained by calls, excluding bytes retained
+    by called functions."""
+
+
+@dataclass
+class _MemoryFrame:
+    """The observed call in progress."""
+
+    start: int
+    peak: int
+    children_retained: int = 0
+
+
+class MemoryObserver(Observer):
+    """Measures memory allocated by calls by their paths.
+
+    Memory is traced by `tracemalloc`, which is started by the first observed
+    call unless it's tracing already. Tracing slows python down, so the
+    observer should be installed only for profiling. Stack-shuffling
+    combinators and tuples rebuilt by serial and parallel combinators show
+    up as functions retaining memory.
+
+    The observer also tracks values on stacks of calls in progress: the peak
+    number of distinct values, and the peak total size of them. Sizes of
+    arrays are their `nbytes`, and sizes of other values are shallow.
+
+    >>> import operator as op
+    >>> from redex import combinator as cb
+    >>> from redex import observer as obs
+    >>> memory = obs.MemoryObserver()
+    >>> with obs.observing(memory):
+    ...     cb.serial(cb.dup(), op.add)(1)
+    2
+    >>> memory.stop()
+    >>> memory.stats[("Serial", "0:Dup")].calls, memory.peak_stack_values
+    (1, 1)
+
+    *Note that memory is traced for the whole process, so calls should be
+    observed in a single thread. Measurements include memory allocated
+    by the observer itself.*
+    """
+
+    def __init__(self) -> None:
+        self.stats: Dict[tuple[str, ...], MemoryStats] = {}
+        self.peak_stack_values = 0
+        self.peak_stack_bytes = 0
+        self._frames: List[_MemoryFrame] = []
+        self._stacks: List[tuple[Any, ...]] = []
+        self._started = False
+
+    def before(self, event: Event) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started = True
+        self._stacks.append(event.stack)
+        values = {id(item): item for stack in self._stacks for item in stack}
+        self.peak_stack_values = max(self.peak_stack_values, len(values))
+        n_bytes = sum(_value_size(item) for item in values.values())
+        self.peak_stack_bytes = max(self.peak_stack_bytes, n_bytes)
+        del values
+        current = self._update_peaks()
+        self._frames.append(_MemoryFrame(start=current, peak=current))
+
+    def after(self, event: Event) -> None:
+        current = self._update_peaks()
+        frame = self._frames.pop()
+        self._stacks.pop()
+        retained = current - frame.start
+        stats = self.stats.setdefault(event.path, MemoryStats())
+        stats.calls += 1
+        stats.peak = max(stats.peak, frame.peak - frame.start)
+        stats.retained += retained
+        stats.own_retained += retained - frame.children_retained
+        if self._frames:
+            self._frames[-1].children_retained += retained
+
+    def _update_peaks(self) -> int:
+        """Folds the peak of traced memory into calls in progress, and returns
+        the traced memory."""
+        current, peak = tracemalloc.get_traced_memory()
+        for frame in self._frames:
+            frame.peak = max(frame.peak, peak)
+        tracemalloc.reset_peak()
+        return current
+
+    def stop(self) -> None:
+        """Stops tracing memory, if the observer started it."""
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
+
+    def ranking(self, limit: Optional[int] = None) -> List[tuple[str, MemoryStats]]:
+        """Ranks functions by bytes they retain themselves.
+
+        Args:
+            limit: a maximum number of functions to rank.
+
+        Returns:
+            paths of functions (joined by `/`) and their statistics,
+            starting from the function retaining the most.
+        """
+        ranked = sorted(
+            self.stats.items(),
+            key=lambda item: (item[1].own_retained, item[1].peak),
+            reverse=True,
+        )
+        return [("/".join(path), stats) for path, stats in ranked[:limit]]
+
+    def report(self, limit: Optional[int] = 10) -> str:
+        """Formats the ranking of functions as a table.
+
+        Args:
+            limit: a maximum number of functions to report.
+
+        Returns:
+            a table.
+        """
+        lines = [
+            f"peak stack values: {self.peak_stack_values}, "
+            f"peak stack size: {self.peak_stack_bytes} B"
+        ]
+        rows = [("function", "calls", "own retained", "retained", "peak")]
+        for path, stats in self.ranking(limit):
+            rows.append(
+                (
+                    path,
+                    str(stats.calls),
+                    f"{stats.own_retained} B",
+                    f"{stats.retained} B",
+                    f"{stats.peak} B",
+                )
+            )
+        lines.append(util.format_table(rows))
+        return "\n".join(lines)
+
+
+def _value_size(item: Any) -> int:
+    """Estimates a size of the value (in bytes)."""
+    n_bytes = getattr(item, "nbytes", None)
+    if isinstance(n_bytes, int):
+        return n_bytes
+    return sys.getsizeof(item)
+
+
+LATENCY_BUCKETS = tuple(1e-6 * 2 ** (i / 2) for i in range(55))
+"""upper bounds (in seconds) of buckets of latency histograms, from 1 us to
+about 2 minutes, growing by a factor of the square root of 2."""
+
+
+@dataclass
+class LatencyHistogram:
+    """The histogram of durations of calls with log-spaced buckets."""
+
+    # pylint: disable=invalid-field-call
+    counts: List[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+    """numbers of durations in each bucket, followed by a number of durations
+    beyond the last bucket."""
+
+    total: float = 0.0
+    """a sum of durations (in seconds)."""
+
+    count: int = 0
+    """a number of durations."""
+
+    def add(self, duration: float) -> None:
+        """Adds the duration (in seconds) to the histogram."""
+        if duration <= LATENCY_BUCKETS[0]:
+            index = 0
+        else:
+            index = math.ceil(2 * math.log2(duration / LATENCY_BUCKETS[0]) - 1e-9)
+            index = min(index, len(LATENCY_BUCKETS))
+        self.counts[index] += 1
+        self.total += duration
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimates the quantile of durations by the upper bound of its bucket.
+
+        >>> from redex.observer import LatencyHistogram
+        >>> histogram = LatencyHistogram()
+        >>> for duration in [0.001] * 99 + [0.1]:
+        ...     histogram.add(duration)
+        >>> histogram.quantile(0.5) >= 0.001, histogram.quantile(0.999) >= 0.1
+        (True, True)
+
+        Args:
+            q: a quantile between 0 and 1.
+
+        Returns:
+            the estimate (in seconds), or `None` if the histogram is empty.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return bound
+        return math.inf
+
+
+class MetricsObserver(Observer):
+    """Counts calls and errors, and collects latency histograms by paths.
+
+    Top-level calls and their errors are counted exactly. A `sample_rate`
+    fraction of top-level calls is sampled evenly: their latencies are
+    collected, and calls they make are counted and timed too. Calls made
+    by other top-level calls aren't observed, so they're as cheap as if
+    no observer is installed.
+
+    >>> import operator as op
+    >>> from redex import combinator as cb
+    >>> from redex import observer as obs
+    >>> metrics = obs.MetricsObserver(sample_rate=0.5)
+    >>> with obs.observing(metrics):
+    ...     for i in range(4):
+    ...         _ = cb.serial(op.add, op.neg)(i, 1)
+    >>> stats = metrics.as_dict()
+    >>> stats["Serial"]["calls"], stats["Serial"]["sampled"]
+    (4, 2)
+    >>> stats["Serial/1:neg"]["calls"], stats["Serial/1:neg"]["sampled"]
+    (2, 2)
+
+    Metrics may be exported in the text format of Prometheus, e.g. to a file
+    read by the textfile collector of the node exporter, or served over HTTP.
+    """
+
+    def __init__(self, sample_rate: float = 1.0) -> None:
+        """Initializes the observer.
+
+        Args:
+            sample_rate: a fraction of top-level calls whose latencies
+                are collected.
+
+        Raises:
+            ValueError: if the rate isn't between 0 and 1.
+        """
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError(f"The sample rate must be between 0 and 1: {sample_rate}.")
+        self.sample_rate = sample_rate
+        self.calls: Dict[tuple[str, ...], int] = {}
+        self.errors: Dict[tuple[str, ...], int] = {}
+        self.latencies: Dict[tuple[str, ...], LatencyHistogram] = {}
+        self._lock = threading.Lock()
+        self._credit = 0.0
+        # Calls made by a top-level call, even in other threads, inherit
+        # its decision.
+        self._sampled: contextvars.ContextVar[bool] = contextvars.ContextVar(
+            f"redex_metrics_sampled_{id(self)}", default=False
+        )
+
+    def before(self, event: Event) -> None:
+        if event.depth != 1:
+            return
+        with self._lock:
+            self._credit += self.sample_rate
+            # Rounding errors of accumulated rates are tolerated.
+            sampled = self._credit >= 1.0 - 1e-9
+            if sampled:
+                self._credit -= 1.0
+        self._sampled.set(sampled)
+
+    def observes_nested(self, event: Event) -> bool:
+        return self._sampled.get()
+
+    def after(self, event: Event) -> None:
+        sampled = self._sampled.get()
+        if event.depth != 1 and not sampled:
+            # Nested calls are observed for other observers.
+            return
+        path = event.path
+        with self._lock:
+            self.calls[path] = self.calls.get(path, 0) + 1
+            if event.error is not None:
+                self.errors[path] = self.errors.get(path, 0) + 1
+            if sampled and event.duration is not None:
+                histogram = self.latencies.get(path)
+                if histogram is None:
+                    histogram = self.latencies[path] = LatencyHistogram()
+                histogram.add(event.duration)
+
+    def as_dict(self) -> Dict[str, Dict[str, Any]]:
+        """Summarizes metrics by paths joined by `/`.
+
+        Returns:
+            numbers of calls and errors, a number of sampled calls, and
+            50th, 99th and 99.9th percentiles of their latencies (in seconds,
+            or `None` if no call is sampled).
+        """
+        with self._lock:
+            summary = {}
+            for path, calls in self.calls.items():
+                histogram = self.latencies.get(path, LatencyHistogram())
+                summary["/".join(path)] = {
+                    "calls": calls,
+                    "errors": self.errors.get(path, 0),
+                    "sampled": histogram.count,
+                    "p50": histogram.quantile(0.5),
+                    "p99": histogram.quantile(0.99),
+                    "p999": histogram.quantile(0.999),
+                }
+            return summary
+
+    def prometheus(self, prefix: str = "redex") -> str:
+        """Formats metrics in the text format of Prometheus.
+
+        Args:
+            prefix: a prefix of names of metrics.
+
+        Returns:
+            counters `<prefix>_calls_total` and `<prefix>_errors_total`, and
+            a histogram `<prefix>_call_duration_seconds` labeled by paths.
+        """
+        lines = []
+        with self._lock:
+            for name, help_text, counts in (
+                ("calls_total", "Calls of functions by combinators.", self.calls),
+                ("errors_total", "Calls that raised exceptions.", self.errors),
+            ):
+                lines.append(f"# HELP {prefix}_{name} {help_text}")
+                lines.append(f"# TYPE {prefix}_{name} counter")
+                for path, count in counts.items():
+                    lines.append(f"{prefix}_{name}{{{_path_label(path)}}} {count}")
+            name = f"{prefix}_call_duration_seconds"
+            lines.append(f"# HELP {name} Durations of sampled calls.")
+            lines.append(f"# TYPE {name} histogram")
+            for path, histogram in self.latencies.items():
+                label = _path_label(path)
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, histogram.counts):
+                    cumulative += count
+                    lines.append(
+                        f'{name}_bucket{{{label},le="{bound:.6g}"}} {cumulative}'
+                    )
+                lines.append(f'{name}_bucket{{{label},le="+Inf"}} {histogram.count}')
+                lines.append(f"{name}_sum{{{label}}} {histogram.total!r}")
+                lines.append(f"{name}_count{{{label}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: Union[str, Path], prefix: str = "redex") -> None:
+        """Writes metrics in the text format of Prometheus to a file.
+
+        The file is replaced atomically, so collectors never read it partially.
+
+        Args:
+            path: a path of the file.
+            prefix: a prefix of names of metrics.
+        """
+        path = Path(path)
+        temporary = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        temporary.write_text(self.prometheus(prefix), encoding="utf-8")
+        os.replace(temporary, path)
+
+    def serve_prometheus(
+        self, port: int, host: str = "127.0.0.1", prefix: str = "redex"
+    ) -> ThreadingHTTPServer:
+        """Serves metrics in the text format of Prometheus over HTTP
+        in a background thread.
+
+        Args:
+            port: a port to listen on, or `0` to choose any free port.
+            host: a host to listen on.
+            prefix: a prefix of names of metrics.
+
+        Returns:
+            the server. Call its `shutdown` method to stop it.
+        """
+        observer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """Responds to any request with metrics."""
+
+            # pylint: disable=invalid-name
+            def do_GET(self) -> None:
+                """Sends metrics."""
+                body = observer.prometheus(prefix).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                # pylint: disable=redefined-builtin
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+def _path_label(path: tuple[str, ...]) -> str:
+    """Formats the path as a label of Prometheus metrics."""
+    value = "/".join(path)
+    for char, escaped in (("\\", "\\\\"), ('"', '\\"'), ("\n", "\\n")):
+        value = value.replace(char, escaped)
+    return f'path="{value}"'
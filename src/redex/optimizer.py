@@ -0,0 +1,430 @@
+"""The optimizer rewrites combinators into equivalent ones that are faster to call.
+
+Each stack-shuffling combinator (`select`, `drop`, `dup`, `identity`) rebuilds
+the stack, so the optimizer leaves as few of them as possible:
+
+- nested serial combinators are inlined into their parents;
+- chains of adjacent stack-shuffling combinators are merged into a single
+  `select` (or `drop`), and shuffles which don't change the stack are removed;
+- parallel stack-shuffling combinators are merged into a single `select`;
+- pure functions, whose outputs are dropped right away, aren't called;
+- equal pure functions at the beginning of branches, which take the same
+  inputs, are computed once for all the branches.
+
+Optimized combinators have the same signatures as the original ones, and
+return the same outputs. However, they may raise errors in different ways
+(e.g. skipped functions don't raise errors anymore), and they may not
+verify that a stack has enough inputs if these inputs are not used.
+"""
+
+from typing import Dict, List, Optional, Union
+from dataclasses import dataclass, replace
+from concurrent.futures import Executor
+from redex import function as fn
+from redex.function import Fn, Signature
+from redex.combinator import Combinator, Drop, Dup, Identity, Parallel, Select, Serial
+from redex.combinator import drop, identity, parallel, select, serial
+
+
+@dataclass(frozen=True)
+class _Shuffle:
+    """The symbolic stack-shuffling combinator.
+
+    The shuffle takes `n_in` items off the stack, and pushes the items
+    at `indices` back onto the stack.
+    """
+
+    indices: tuple[int, ...]
+    """0-based indices of pushed items relative to the top of the stack."""
+
+    n_in: int
+    """a number of items taken off the stack."""
+
+    def then(self, other: "_Shuffle") -> "_Shuffle":
+        """Composes the shuffle with the following one."""
+        # The following shuffle may take more items than this one pushes.
+        n_extra = max(0, other.n_in - len(self.indices))
+        indices = self.indices + tuple(range(self.n_in, self.n_in + n_extra))
+        return _Shuffle(
+            indices=tuple(indices[i] for i in other.indices) + indices[other.n_in :],
+            n_in=self.n_in + n_extra,
+        )
+
+    def is_identity(self) -> bool:
+        """Checks whether the shuffle doesn't change the stack."""
+        return self.indices == tuple(range(self.n_in))
+
+
+_Child = Union[_Shuffle, tuple[Fn, Signature]]
+
+
+@dataclass
+class _Group:
+    """Branches sharing the same prefix."""
+
+    prefix: Fn
+    """the first function of the branches."""
+
+    positions: tuple[int, ...]
+    """positions of inputs of the prefix on the stack before the branches."""
+
+    start: int
+    """the index of the first input of the prefix among inputs of branches."""
+
+    size: int = 0
+    """a number of the branches."""
+
+    offset: int = 0
+    """the index of the first output of the prefix among shared outputs."""
+
+    @property
+    def signature(self) -> Signature:
+        """the signature of the prefix."""
+        return fn.infer_signature(self.prefix)
+
+
+@dataclass
+class _Arm:
+    """The branch."""
+
+    func: Fn
+    """the function of the branch."""
+
+    signature: Signature
+    """the signature of the branch."""
+
+    group: Optional[_Group] = None
+    """the group of branches sharing the prefix, or `None` if not shared."""
+
+    rest: Optional[Fn] = None
+    """the function applied after the shared prefix."""
+
+    @property
+    def n_prefix(self) -> int:
+        """the number of inputs of the shared prefix."""
+        return 0 if self.group is None else self.group.signature.n_in
+
+    @property
+    def end(self) -> int:
+        """the index after the last input of the branch among inputs of branches."""
+        return self.signature.start_index + self.signature.n_in
+
+
+def optimize(func: Fn) -> Fn:
+    """Optimizes the combinator.
+
+    >>> import operator as op
+    >>> from redex import combinator as cb
+    >>> from redex.optimizer import optimize
+    >>> shuffles = cb.serial(cb.dup(), cb.select([1, 0]), cb.identity(), cb.drop())
+    >>> type(optimize(shuffles)).__name__
+    'Identity'
+    >>> optimize(cb.serial(cb.dup(), cb.serial(op.add, op.neg)))(2)
+    -4
+
+    Args:
+        func: a combinator or any other function.
+
+    Returns:
+        an optimized combinator with the same signature as the original one,
+        or the same function if it can't be optimized.
+    """
+    optimized: Dict[int, Fn] = {}
+    # The post-order traversal: children are optimized before their parents.
+    nodes: List[tuple[Fn, bool]] = [(func, False)]
+    while nodes:
+        node, is_visited = nodes.pop()
+        if id(node) in optimized:
+            continue
+        children = node.children if isinstance(node, (Serial, Parallel)) else []
+        if is_visited or not children:
+            optimized[id(node)] = _optimize_node(node, optimized)
+            continue
+        nodes.append((node, True))
+        nodes.extend((child, False) for child in reversed(children))
+    result = optimized[id(func)]
+    if isinstance(func, Combinator) and not isinstance(result, Combinator):
+        # Combinators pass the rest of the stack through, but other
+        # functions don't, so the function is kept in a combinator.
+        return replace(serial(result), signature=func.signature)
+    return result
+
+
+def _optimize_node(node: Fn, optimized: Dict[int, Fn]) -> Fn:
+    """Optimizes the combinator, whose children are already optimized."""
+    if isinstance(node, Serial):
+        children = [optimized[id(child)] for child in node.children]
+        return _optimize_serial(node, children)
+    if isinstance(node, Parallel):
+        children = [optimized[id(child)] for child in node.children]
+        return _optimize_parallel(node, children)
+    return node
+
+
+def _optimize_serial(node: Serial, children: List[Fn]) -> Fn:
+    result: List[_Child] = []
+    pending = list(zip(children, node.children_signatures))
+    pending.reverse()
+    while pending:
+        child, signature = pending.pop()
+        if _is_inlinable(child, signature):
+            assert isinstance(child, Serial)
+            inlined = zip(child.children, child.children_signatures)
+            pending.extend(reversed(list(inlined)))
+            continue
+        shuffle = _as_shuffle(child, signature)
+        if shuffle is not None:
+            _push_shuffle(result, shuffle)
+            continue
+        shared = _share_prefixes(result, child)
+        if shared is not None:
+            pending.extend(
+                (func, fn.infer_signature(func)) for func in reversed(shared)
+            )
+            continue
+        result.append((child, signature))
+
+    n_in = node.signature.n_in
+    flat_children: List[Fn] = []
+    for item in result:
+        materialized = _materialize(item)
+        if materialized is not None:
+            flat_children.append(materialized)
+    if not flat_children and node.signature == Signature(n_in=n_in, n_out=n_in):
+        return identity(n_in=n_in)
+    if len(flat_children) == 1:
+        single = flat_children[0]
+        if fn.infer_signature(single) == node.signature:
+            return single
+    return replace(serial(*flat_children), signature=node.signature)
+
+
+def _optimize_parallel(node: Parallel, children: List[Fn]) -> Fn:
+    shuffles = [
+        _as_shuffle(child, signature)
+        for child, signature in zip(children, node.children_signatures)
+    ]
+    if children and all(shuffle is not None for shuffle in shuffles):
+        indices: List[int] = []
+        for shuffle, signature in zip(shuffles, node.children_signatures):
+            assert shuffle is not None
+            offset = signature.start_index
+            indices.extend(offset + i for i in shuffle.indices)
+        return select(indices=indices, n_in=node.signature.n_in)
+    return Parallel(
+        signature=node.signature,
+        children=children,
+        children_signatures=node.children_signatures,
+        executor=node.executor,
+        concurrency=node.concurrency,
+    )
+
+
+def _share_prefixes(result: List[_Child], func: Fn) -> Optional[List[Fn]]:
+    """Computes equal prefixes of branches once.
+
+    Branches are children of the parallel combinator preceded by a shuffle
+    (as the `branch` combinator is built). If the first functions of some
+    branches are equal, pure, and take the same items of the stack before
+    the shuffle, then they are computed once and their outputs are copied
+    to those branches.
+
+    Returns:
+        children replacing the parallel combinator, or `None` if branches
+        don't share any prefix.
+    """
+    if not isinstance(func, Parallel) or not result:
+        return None
+    shuffle = result[-1]
+    if not isinstance(shuffle, _Shuffle):
+        return None
+
+    def position(index: int) -> int:
+        """Finds a position of the item on the stack before the shuffle."""
+        if index < len(shuffle.indices):
+            return shuffle.indices[index]
+        return shuffle.n_in + index - len(shuffle.indices)
+
+    arms: List[_Arm] = []
+    groups: List[_Group] = []
+    for child, signature in zip(func.children, func.children_signatures):
+        split = _split_prefix(child, signature)
+        arm = _Arm(child, signature)
+        arms.append(arm)
+        if split is None or not _is_shareable(split[0]):
+            continue
+        prefix, arm.rest = split
+        start = signature.start_index
+        end = start + fn.infer_signature(prefix).n_in
+        positions = tuple(map(position, range(start, end)))
+        arm.group = _find_group(groups, _Group(prefix, positions, start))
+        arm.group.size += 1
+
+    groups = [group for group in groups if group.size > 1]
+    if not groups:
+        return None
+    for arm in arms:
+        if arm.group is not None and arm.group.size < 2:
+            arm.group, arm.rest = None, None
+    return _shared_children(func, groups, arms)
+
+
+def _find_group(groups: List[_Group], new_group: _Group) -> _Group:
+    """Finds the group of branches sharing the prefix, or adds a new one."""
+    for group in groups:
+        if group.positions == new_group.positions and group.prefix == new_group.prefix:
+            return group
+    groups.append(new_group)
+    return new_group
+
+
+def _shared_children(
+    func: Parallel, groups: List[_Group], arms: List[_Arm]
+) -> List[Fn]:
+    """Makes children computing shared prefixes once."""
+    # The prefixes are computed along with the rest of the stack.
+    indices: List[int] = []
+    for group in groups:
+        indices.extend(range(group.start, group.start + group.signature.n_in))
+    for arm in arms:
+        indices.extend(range(arm.signature.start_index + arm.n_prefix, arm.end))
+    n_rest = len(indices) - sum(group.signature.n_in for group in groups)
+    prefixes = [group.prefix for group in groups]
+    if n_rest:
+        prefixes.append(identity(n_in=n_rest))
+
+    # Outputs of the prefixes are copied to each branch.
+    offset = 0
+    for group in groups:
+        group.offset = offset
+        offset += group.signature.n_out
+    branch_indices: List[int] = []
+    rests: List[Fn] = []
+    for arm in arms:
+        if arm.group is not None:
+            n_out = arm.group.signature.n_out
+            branch_indices.extend(range(arm.group.offset, arm.group.offset + n_out))
+        n_arm_rest = arm.end - arm.signature.start_index - arm.n_prefix
+        branch_indices.extend(range(offset, offset + n_arm_rest))
+        offset += n_arm_rest
+        rests.append(arm.rest if arm.rest is not None else arm.func)
+
+    executor, concurrency = func.executor, func.concurrency
+    return [
+        select(indices=indices, n_in=func.signature.n_in),
+        _parallel(prefixes, executor, concurrency),
+        select(indices=branch_indices, n_in=offset),
+        _parallel(rests, executor, concurrency),
+    ]
+
+
+def _push_shuffle(result: List[_Child], shuffle: _Shuffle) -> None:
+    """Pushes the shuffle, merging it with preceding children if possible."""
+    while result:
+        last = result[-1]
+        if isinstance(last, _Shuffle):
+            shuffle = last.then(shuffle)
+        elif _is_dropped(last, shuffle):
+            # Outputs of the pure function are dropped, so it's not called.
+            _, signature = last
+            n_out = signature.n_out
+            shuffle = _Shuffle((), signature.n_in).then(
+                _Shuffle(
+                    indices=tuple(i - n_out for i in shuffle.indices),
+                    n_in=shuffle.n_in - n_out,
+                )
+            )
+        else:
+            break
+        result.pop()
+    result.append(shuffle)
+
+
+def _is_dropped(child: tuple[Fn, Signature], shuffle: _Shuffle) -> bool:
+    """Checks whether the shuffle drops all outputs of the pure function."""
+    func, signature = child
+    n_out = signature.n_out
+    return (
+        shuffle.n_in >= n_out
+        and all(i >= n_out for i in shuffle.indices)
+        and fn.is_pure(func)
+    )
+
+
+# pylint: disable=too-many-return-statements
+def _as_shuffle(func: Fn, signature: Signature) -> Optional[_Shuffle]:
+    """Represents the stack-shuffling combinator as a symbolic shuffle."""
+    if signature.reshape_plan is not None or signature.out_shape is not None:
+        return None
+    n_in = signature.n_in
+    if isinstance(func, Select):
+        # Indices beyond inputs are left as they are, because they refer
+        # to the rest of the stack only if the combinator is called directly.
+        if any(not 0 <= i < n_in for i in func.indices):
+            return None
+        return _Shuffle(tuple(func.indices), n_in)
+    if isinstance(func, Drop):
+        return _Shuffle((), n_in)
+    if isinstance(func, Dup):
+        return _Shuffle(tuple(range(n_in)) * 2, n_in)
+    if isinstance(func, Identity):
+        return _Shuffle(tuple(range(n_in)), n_in)
+    return None
+
+
+def _materialize(child: _Child) -> Optional[Fn]:
+    """Turns the symbolic shuffle back into a combinator."""
+    if not isinstance(child, _Shuffle):
+        return child[0]
+    if child.is_identity():
+        return None
+    if not child.indices:
+        return drop(n_in=child.n_in)
+    return select(indices=list(child.indices), n_in=child.n_in)
+
+
+def _is_shareable(func: Fn) -> bool:
+    """Checks whether the function is worth computing once."""
+    signature = fn.infer_signature(func)
+    return fn.is_pure(func) and _as_shuffle(func, signature) is None
+
+
+def _split_prefix(func: Fn, signature: Signature) -> Optional[tuple[Fn, Fn]]:
+    """Splits the function into its first function and the rest."""
+    if not _is_inlinable(func, signature):
+        return func, identity(n_in=signature.n_out)
+    assert isinstance(func, Serial)
+    if not func.children:
+        return None
+    prefix, *children = func.children
+    prefix_signature = func.children_signatures[0]
+    n_in = signature.n_in - prefix_signature.n_in + prefix_signature.n_out
+    rest = replace(serial(*children), signature=Signature(n_in, signature.n_out))
+    return prefix, _optimize_serial(rest, rest.children)
+
+
+def _parallel(
+    children: List[Fn],
+    executor: Optional[Executor],
+    concurrency: Optional[int],
+) -> Fn:
+    """Creates an optimized parallel combinator."""
+    node = parallel(*children, executor=executor, concurrency=concurrency)
+    return _optimize_parallel(node, node.children)
+
+
+def _is_inlinable(func: Fn, signature: Signature) -> bool:
+    """Checks whether the serial combinator works the same when inlined."""
+    if not isinstance(func, Serial):
+        return False
+    if signature.reshape_plan is not None or signature.out_shape is not None:
+        return False
+    # The combinator may take more inputs than its children need,
+    # but it must not change the stack size differently.
+    n_max, n_total = 0, 0
+    for child_signature in func.children_signatures:
+        n_total += child_signature.n_in
+        n_max = max(n_max, n_total)
+        n_total -= child_signature.n_out
+    n_in, n_out = signature.n_in, signature.n_out
+    return n_in >= n_max and n_in - n_out == n_total
@@ -0,0 +1,455 @@
+"""The compact serialization format of combinator trees.
+
+Combinator trees are serialized as a flat table of nodes, where parents
+refer to their children by indices in the table:
+
+- equal subtrees are stored once;
+- functions are referenced by their import paths, such as `_operator:add`.
+  Functions that can't be imported (e.g. bound methods, partial functions)
+  are pickled;
+- signatures aren't stored, but derived on load by combinator constructors.
+  Only signatures that differ from the derived ones are stored;
+- executors of parallel combinators aren't stored, and caches of memoization
+  combinators are stored empty.
+
+`redex.executor.WarmProcessPool` sends combinators to worker processes in
+this format, so sending them is cheap. Pickling combinators doesn't use it,
+so other picklers (e.g. `cloudpickle`) still handle lambdas and closures.
+The format is versioned: data of an unknown version isn't loaded.
+
+*Note that serialized data may include pickled functions, so only trusted
+data must be loaded*.
+"""
+
+import io
+import typing
+import pickle
+import importlib
+from dataclasses import fields, replace
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from redex import function as fn
+from redex.function import Fn, Signature
+from redex.combinator import Combinator, Drop, Dup, Foldl, Identity, Memo
+from redex.combinator import Parallel, Repeat, Scan, Select, Serial, Switch
+from redex.combinator import WhileLoop
+from redex.combinator import drop, dup, foldl, identity, memo, parallel
+from redex.combinator import repeat, scan, select, serial, switch, while_loop
+
+FORMAT_VERSION = 1
+"""the version of the serialization format."""
+
+_MAGIC = "redex"
+"""the marker of serialized data."""
+
+_Entry = tuple[Any, ...]
+"""The serialized node: its kind, arguments and an optional signature."""
+
+_Resolve = Callable[[int], Fn]
+"""The function finding a node by its index."""
+
+
+def dumps(func: Fn) -> bytes:
+    """Serializes the combinator tree.
+
+    >>> import operator as op
+    >>> from redex import combinator as cb
+    >>> from redex import serialize
+    >>> branch = cb.branch(cb.serial(op.neg, op.abs), cb.serial(op.neg, op.abs))
+    >>> serialize.loads(serialize.dumps(branch)) == branch
+    True
+
+    Args:
+        func: a combinator or any other function.
+
+    Returns:
+        serialized data.
+
+    Raises:
+        pickle.PicklingError: if some function can't be imported or pickled.
+    """
+    return dumps_many([func])
+
+
+def loads(data: bytes) -> Fn:
+    """Deserializes the combinator tree.
+
+    Args:
+        data: serialized data.
+
+    Returns:
+        a combinator or any other function.
+
+    Raises:
+        ValueError: if the data isn't serialized by `dumps` of a known version.
+    """
+    func: Fn = loads_many(data)[0]
+    return func
+
+
+def dumps_many(funcs: Sequence[Fn]) -> bytes:
+    """Serializes combinator trees, sharing their equal subtrees.
+
+    Args:
+        funcs: combinators or any other functions.
+
+    Returns:
+        serialized data.
+
+    Raises:
+        pickle.PicklingError: if some function can't be imported or pickled.
+    """
+    encoder = _Encoder()
+    roots = tuple(encoder.encode(func) for func in funcs)
+    document = (_MAGIC, FORMAT_VERSION, tuple(encoder.entries), roots)
+    return pickle.dumps(document, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def loads_many(data: bytes) -> List[Fn]:
+    """Deserializes combinator trees.
+
+    Args:
+        data: serialized data.
+
+    Returns:
+        combinators or any other functions.
+
+    Raises:
+        ValueError: if the data isn't serialized by `dumps_many`
+            of a known version.
+    """
+    try:
+        magic, version, entries, roots = _DocumentUnpickler(io.BytesIO(data)).load()
+    except (pickle.UnpicklingError, ValueError, TypeError, EOFError) as err:
+        raise ValueError("The data isn't a serialized combinator.") from err
+    if magic != _MAGIC:
+        raise ValueError("The data isn't a serialized combinator.")
+    if version != FORMAT_VERSION:
+        raise ValueError(
+            f"The serialization format {version} isn't supported, "
+            f"only {FORMAT_VERSION} is."
+        )
+
+    nodes: List[Fn] = []
+    for entry in entries:
+        nodes.append(_decode(entry, nodes.__getitem__))
+    return [nodes[root] for root in roots]
+
+
+# pylint: disable=too-few-public-methods
+class _DocumentUnpickler(pickle.Unpickler):
+    """The unpickler of documents, which consist of builtin values only."""
+
+    def find_class(self, module: str, name: str) -> Any:
+        raise pickle.UnpicklingError(f"The `{module}.{name}` isn't expected.")
+
+
+class _Encoder:
+    """Encodes functions into a table of entries."""
+
+    def __init__(self) -> None:
+        self.entries: List[_Entry] = []
+        self._nodes: List[Fn] = []
+        self._indices: Dict[_Entry, int] = {}
+        self._by_id: Dict[int, int] = {}
+
+    def encode(self, func: Fn) -> int:
+        """Encodes the function with its descendants, and returns its index."""
+        # The tree is walked with an explicit stack instead of recursion,
+        # so deeply nested combinators can be encoded.
+        pending: List[tuple[Fn, bool]] = [(func, False)]
+        while pending:
+            node, is_visited = pending.pop()
+            if id(node) in self._by_id:
+                continue
+            dependencies = _dependencies(node)
+            if is_visited or not dependencies:
+                self._add(node)
+                continue
+            pending.append((node, True))
+            pending.extend((child, False) for child in reversed(dependencies))
+        return self._by_id[id(func)]
+
+    def _add(self, node: Fn) -> None:
+        entry = _encode(node, self._by_id.__getitem__, self._nodes.__getitem__)
+        index = self._indices.get(entry)
+        if index is None:
+            index = self._indices[entry] = len(self.entries)
+            self.entries.append(entry)
+            self._nodes.append(node)
+        self._by_id[id(node)] = index
+
+
+# pylint: disable=too-many-return-statements
+def _dependencies(node: Fn) -> List[Fn]:
+    """Lists functions the node refers to."""
+    if isinstance(node, (Serial, Parallel)):
+        return list(node.children)
+    if isinstance(node, Foldl):
+        return [node.func]
+    if isinstance(node, Memo):
+        return [node.child] if node.key is None else [node.child, node.key]
+    if isinstance(node, (Repeat, Scan)):
+        return [node.body]
+    if isinstance(node, WhileLoop):
+        return [node.cond, node.body]
+    if isinstance(node, Switch):
+        return [node.selector, *node.cases]
+    if isinstance(node, Combinator) and type(node) not in _ENCODERS:
+        return [value for value in _field_values(node) if callable(value)]
+    return []
+
+
+def _encode(node: Fn, index_of: Callable[[int], int], resolve: _Resolve) -> _Entry:
+    """Encodes the node, whose dependencies are already encoded."""
+
+    def ref(func: Fn) -> int:
+        return index_of(id(func))
+
+    encoder = _ENCODERS.get(type(node))
+    if encoder is None:
+        if isinstance(node, Combinator):
+            return ("dataclass", _import_path(type(node)), _encode_fields(node, ref))
+        path = _import_path(node)
+        if path is not None:
+            return ("import", path)
+        return ("pickle", pickle.dumps(node, protocol=pickle.HIGHEST_PROTOCOL))
+
+    kind, args = encoder(node, ref)
+    # Signatures are stored only if they differ from the derived ones.
+    derived = _DECODERS[kind](args, resolve)
+    signature: Signature = getattr(node, "signature")
+    override = None
+    if derived.signature != signature or _children_signatures(
+        derived
+    ) != _children_signatures(node):
+        override = (
+            _encode_signature(signature),
+            tuple(map(_encode_signature, _children_signatures(node) or [])),
+        )
+    return (kind, args, override)
+
+
+def _decode(entry: _Entry, resolve: _Resolve) -> Fn:
+    kind = entry[0]
+    if kind == "import":
+        func: Fn = _import(entry[1])
+        return func
+    if kind == "pickle":
+        func = pickle.loads(entry[1])
+        return func
+    if kind == "dataclass":
+        return _decode_fields(_import(entry[1]), entry[2], resolve)
+
+    _, args, override = entry
+    node: Fn = _DECODERS[kind](args, resolve)
+    if override is not None:
+        signature, children_signatures = override
+        changes: Dict[str, Any] = {"signature": _decode_signature(signature)}
+        if isinstance(node, (Serial, Parallel)):
+            changes["children_signatures"] = [
+                _decode_signature(s) for s in children_signatures
+            ]
+        node = replace(typing.cast(Any, node), **changes)
+    return node
+
+
+def _children_signatures(node: Fn) -> Optional[List[Signature]]:
+    if isinstance(node, (Serial, Parallel)):
+        return node.children_signatures
+    return None
+
+
+_Encoded = tuple[str, tuple[Any, ...]]
+
+
+def _encode_serial(node: Serial, ref: Callable[[Fn], int]) -> _Encoded:
+    return "serial", tuple(map(ref, node.children))
+
+
+def _encode_parallel(node: Parallel, ref: Callable[[Fn], int]) -> _Encoded:
+    return "parallel", (tuple(map(ref, node.children)), node.concurrency)
+
+
+def _encode_select(node: Select, _ref: Callable[[Fn], int]) -> _Encoded:
+    return "select", (tuple(node.indices), node.signature.n_in)
+
+
+def _encode_drop(node: Drop, _ref: Callable[[Fn], int]) -> _Encoded:
+    return "drop", (node.signature.n_in,)
+
+
+def _encode_dup(node: Dup, _ref: Callable[[Fn], int]) -> _Encoded:
+    return "dup", (node.signature.n_in,)
+
+
+def _encode_identity(node: Identity, _ref: Callable[[Fn], int]) -> _Encoded:
+    return "identity", (node.signature.n_in,)
+
+
+def _encode_foldl(node: Foldl, ref: Callable[[Fn], int]) -> _Encoded:
+    return "foldl", (ref(node.func), node.signature.n_in, node.associative)
+
+
+def _encode_memo(node: Memo, ref: Callable[[Fn], int]) -> _Encoded:
+    key = None if node.key is None else ref(node.key)
+    cache = node.cache
+    return "memo", (
+        ref(node.child),
+        cache.maxsize,
+        cache.max_bytes,
+        key,
+        node.by_identity,
+    )
+
+
+def _encode_repeat(node: Repeat, ref: Callable[[Fn], int]) -> _Encoded:
+    return "repeat", (ref(node.body), node.times)
+
+
+def _encode_while_loop(node: WhileLoop, ref: Callable[[Fn], int]) -> _Encoded:
+    return "while_loop", (ref(node.cond), ref(node.body))
+
+
+def _encode_scan(node: Scan, ref: Callable[[Fn], int]) -> _Encoded:
+    return "scan", (ref(node.body), node.n)
+
+
+def _encode_switch(node: Switch, ref: Callable[[Fn], int]) -> _Encoded:
+    return "switch", (ref(node.selector), *map(ref, node.cases))
+
+
+_ENCODERS: Dict[type, Callable[[Any, Callable[[Fn], int]], _Encoded]] = {
+    Serial: _encode_serial,
+    Parallel: _encode_parallel,
+    Select: _encode_select,
+    Drop: _encode_drop,
+    Dup: _encode_dup,
+    Identity: _encode_identity,
+    Foldl: _encode_foldl,
+    Memo: _encode_memo,
+    Repeat: _encode_repeat,
+    WhileLoop: _encode_while_loop,
+    Scan: _encode_scan,
+    Switch: _encode_switch,
+}
+"""encoders of arguments of builtin combinators, keyed by their types."""
+
+
+def _decode_memo(args: tuple[Any, ...], resolve: _Resolve) -> Memo:
+    child, maxsize, max_bytes, key, by_identity = args
+    return memo(
+        resolve(child),
+        maxsize=maxsize,
+        max_bytes=max_bytes,
+        key=None if key is None else resolve(key),
+        by_identity=by_identity,
+    )
+
+
+_DECODERS: Dict[str, Callable[[tuple[Any, ...], _Resolve], Any]] = {
+    "serial": lambda args, resolve: serial(*map(resolve, args)),
+    "parallel": lambda args, resolve: parallel(
+        *map(resolve, args[0]), concurrency=args[1]
+    ),
+    "select": lambda args, _: select(indices=list(args[0]), n_in=args[1]),
+    "drop": lambda args, _: drop(n_in=args[0]),
+    "dup": lambda args, _: dup(n_in=args[0]),
+    "identity": lambda args, _: identity(n_in=args[0]),
+    "foldl": lambda args, resolve: foldl(
+        resolve(args[0]), n_in=args[1], associative=args[2]
+    ),
+    "memo": _decode_memo,
+    "repeat": lambda args, resolve: repeat(resolve(args[0]), times=args[1]),
+    "while_loop": lambda args, resolve: while_loop(resolve(args[0]), resolve(args[1])),
+    "scan": lambda args, resolve: scan(resolve(args[0]), n=args[1]),
+    "switch": lambda args, resolve: switch(*map(resolve, args)),
+}
+"""decoders of builtin combinators from their arguments, keyed by their kinds."""
+
+
+def _field_values(node: Combinator) -> List[Any]:
+    """Lists values of fields, with sequences of functions flattened."""
+    values = []
+    for field in fields(node):
+        value = getattr(node, field.name)
+        if isinstance(value, list) and all(map(callable, value)):
+            values.extend(value)
+        else:
+            values.append(value)
+    return values
+
+
+def _encode_fields(node: Combinator, ref: Callable[[Fn], int]) -> tuple[Any, ...]:
+    """Encodes fields of the combinator of an unknown type."""
+    encoded = []
+    for field in fields(node):
+        if not field.init:
+            continue
+        value = getattr(node, field.name)
+        if isinstance(value, Signature):
+            item: tuple[Any, ...] = ("signature", _encode_signature(value))
+        elif callable(value):
+            item = ("ref", ref(value))
+        elif isinstance(value, list) and all(map(callable, value)) and value:
+            item = ("refs", tuple(map(ref, value)))
+        elif isinstance(value, list) and all(isinstance(v, Signature) for v in value):
+            item = ("signatures", tuple(map(_encode_signature, value)))
+        else:
+            item = ("value", pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        encoded.append((field.name, item))
+    return tuple(encoded)
+
+
+def _decode_fields(
+    cls: Callable[..., Fn], encoded: tuple[Any, ...], resolve: _Resolve
+) -> Fn:
+    kwargs: Dict[str, Any] = {}
+    for name, (kind, value) in encoded:
+        if kind == "signature":
+            kwargs[name] = _decode_signature(value)
+        elif kind == "ref":
+            kwargs[name] = resolve(value)
+        elif kind == "refs":
+            kwargs[name] = list(map(resolve, value))
+        elif kind == "signatures":
+            kwargs[name] = list(map(_decode_signature, value))
+        else:
+            kwargs[name] = pickle.loads(value)
+    return cls(**kwargs)
+
+
+def _encode_signature(signature: Signature) -> tuple[Any, ...]:
+    return (
+        signature.n_in,
+        signature.n_out,
+        signature.start_index,
+        signature.in_shape,
+        signature.out_shape,
+    )
+
+
+def _decode_signature(encoded: tuple[Any, ...]) -> Signature:
+    return fn.intern_signature(Signature(*encoded))
+
+
+def _import_path(obj: Any) -> Optional[str]:
+    """Finds the path the object is imported by, or `None` if it can't be."""
+    module = getattr(obj, "__module__", None)
+    qualname = getattr(obj, "__qualname__", None)
+    if not isinstance(module, str) or not isinstance(qualname, str):
+        return None
+    path = f"{module}:{qualname}"
+    try:
+        if _import(path) is obj:
+            return path
+    except (ImportError, AttributeError):
+        pass
+    return None
+
+
+def _import(path: str) -> Any:
+    module, qualname = path.split(":")
+    obj = importlib.import_module(module)
+    for name in qualname.split("."):
+        obj = getattr(obj, name)
+    return obj
@@ -1,9 +1,10 @@
 """The stack is used by combinators to pass data between functions."""
 
-from typing import Any, Callable, Optional
+import inspect
+from typing import Any, Callable, Coroutine, Optional
 from functools import wraps
-import logging
 from redex import util
+from redex import observer
 from redex import function as fn
 from redex.function import Fn, Signature
 
@@ -15,6 +16,9 @@ Stack = tuple[Any, ...]  # type:ignore
 StackMethod = Callable[[Any, Stack], Stack]
 """The method from stack state to stack state."""
 
+AsyncStackMethod = Callable[..., Coroutine[Any, Any, Any]]
+"""The coroutine method from stack state to stack state."""
+
 
 def constrained_call(
     func: Fn,
@@ -48,20 +52,175 @@ def constrained_call(
     if signature is None:
         signature = fn.infer_signature(func)
 
-    n_in, in_shape = signature.n_in, signature.in_shape
-    stack_size = len(stack)
+    if observer.OBSERVERS:
+        return observer.observe(func, stack, signature, _apply)
+
+    return _apply(func, stack, signature)
+
+
+def _apply(func: Fn, stack: Stack, signature: Signature) -> Stack:
+    """Applies the function with arguments taken from the stack."""
+    n_in = signature.n_in
+    verify_stack_size(func, stack, signature)
+    reshape = signature.reshape_plan
+    inputs = stack[:n_in] if reshape is None else reshape(stack)
+    return collect_outputs(func(*inputs), signature) + stack[n_in:]
+
+
+def unchecked_call(func: Fn, stack: Stack, signature: Signature) -> Stack:
+    """Applies the function with arguments taken from the stack,
+    which is known to hold enough of them.
+
+    Like `constrained_call`, but the size of the stack isn't verified.
+    Combinators verified at construction (see `is_verified`) call their
+    functions this way, and combinators among the functions are applied
+    to the stack directly.
+
+    Args:
+        func: a function to call.
+        stack: arguments available for the call, at least `n_in` of them.
+        signature: a signature of the function.
+
+    Returns:
+        function outputs and rest of the stack.
+
+    >>> import operator as op
+    >>> from redex import function as fn
+    >>> from redex.stack import unchecked_call
+    >>> unchecked_call(op.add, (1, 2, 0), fn.infer_signature(op.add))
+    (3, 0)
+    """
+    if observer.OBSERVERS:
+        return observer.observe(func, stack, signature, _apply)
+
+    n_in = signature.n_in
+    reshape = signature.reshape_plan
+    stackcall = getattr(func, "__stackcall__", None)
+    if stackcall is None or reshape is not None:
+        inputs = stack[:n_in] if reshape is None else reshape(stack)
+        return collect_outputs(func(*inputs), signature) + stack[n_in:]
+    # The same outputs the call of the combinator returns.
+    outputs = util.squeeze_tuple(stackcall(stack[:n_in]))
+    return collect_outputs(outputs, signature) + stack[n_in:]
+
+
+def is_verified(func: Fn, signature: Optional[Signature] = None) -> bool:
+    """Checks that the function is verified to take inputs only from
+    the stack of its declared size, and return declared number of outputs.
+
+    Combinators are verified at construction: they're verified if
+    their functions are, and their signatures are consistent with
+    signatures of their functions. Functions that aren't combinators
+    are assumed to follow their signatures.
+
+    >>> import operator as op
+    >>> from dataclasses import replace
+    >>> from redex import combinator as cb
+    >>> from redex.function import Signature
+    >>> from redex.stack import is_verified
+    >>> is_verified(cb.serial(op.add, cb.dup()))
+    True
+    >>> is_verified(replace(cb.serial(op.add), signature=Signature(1, 0)))
+    False
 
-    logging.debug(
-        "constrained_call :: %s stack_size=%s  signature=%s",
-        fn.infer_name(func).ljust(20),
-        stack_size,
-        signature,
+    Args:
+        func: a function.
+        signature: optional signature the function is called with. If set,
+            it must agree with the signature of the function.
+
+    Returns:
+        whether the function is verified.
+    """
+    verified = getattr(func, "__verified__", None)
+    if verified is None:
+        return True
+    if signature is None:
+        return bool(verified)
+    own_signature = fn.infer_signature(func)
+    return (
+        bool(verified)
+        and own_signature.n_in == signature.n_in
+        and own_signature.n_out == signature.n_out
     )
 
+
+async def constrained_acall(
+    func: Fn,
+    stack: Stack,
+    signature: Optional[Signature] = None,
+) -> Stack:
+    """Applies the function with arguments taken from the stack,
+    awaiting its outputs.
+
+    Like `constrained_call`, but combinators are applied with their `acall`
+    method, and outputs of coroutine functions (or any other awaitable
+    outputs) are awaited. Asynchronous calls aren't observed.
+
+    Args:
+        func: a function to call.
+        stack: arguments available for the call.
+        signature: optional signature of the function. If not set,
+            it will be inferred.
+
+    Returns:
+        function outputs and rest of the stack.
+
+    Raises:
+        ValueError: if a number of arguments on the stack less
+            than required for function call.
+
+    >>> import asyncio
+    >>> from redex.stack import constrained_acall
+    >>> async def add(a, b):
+    ...     return a + b
+    >>> asyncio.run(constrained_acall(func=add, stack=(1, 2, 0)))
+    (3, 0)
+    """
+    if signature is None:
+        signature = fn.infer_signature(func)
+
+    n_in = signature.n_in
     verify_stack_size(func, stack, signature)
-    inputs = util.reshape_tuples(stack[:n_in], in_shape)
-    outputs = tuple(util.flatten_tuples(util.expand_to_tuple(func(*inputs))))
-    return outputs + stack[n_in:]
+    reshape = signature.reshape_plan
+    inputs = stack[:n_in] if reshape is None else reshape(stack)
+    acall = getattr(func, "acall", None)
+    result = func(*inputs) if acall is None else acall(*inputs)
+    if inspect.isawaitable(result):
+        result = await result
+    return collect_outputs(result, signature) + stack[n_in:]
+
+
+def collect_outputs(result: Any, signature: Signature) -> Stack:
+    """Collects outputs of the function to place them onto the stack.
+
+    Outputs are flattened according to their declared shape `out_shape`.
+    If the shape isn't declared, any tuples in outputs are flattened.
+    A function without outputs doesn't push anything onto the stack.
+
+    Args:
+        result: a value returned by the function.
+        signature: a signature of the function.
+
+    Returns:
+        function outputs.
+
+    >>> from redex.stack import collect_outputs
+    >>> from redex.function import Signature
+    >>> collect_outputs((1, (2, 3)), Signature(n_in=0, n_out=3))
+    (1, 2, 3)
+    >>> collect_outputs((1, (2, 3)), Signature(n_in=0, n_out=2, out_shape=((), ())))
+    (1, (2, 3))
+    """
+    out_shape = signature.out_shape
+    if out_shape is None:
+        if not signature.n_out:
+            # The function returns `None` or its outputs are ignored.
+            return ()
+        return tuple(util.flatten_tuples(util.expand_to_tuple(result)))
+    if not out_shape:
+        return (result,) if signature.n_out else ()
+    flatten = signature.flatten_plan
+    return tuple(result) if flatten is None else flatten(result)
 
 
 def verify_stack_size(
@@ -120,8 +279,37 @@ def stackmethod(method: Fn) -> StackMethod:
         Add()(1, 2)  # -> 3
     """
 
+    def call(self: Any, stack: Stack, _signature: Optional[Signature]) -> Stack:
+        outputs: Stack = method(self, stack)
+        return outputs
+
     @wraps(method)
     def inner(self: Any, *inputs: Any) -> Any:
-        return util.squeeze_tuple(method(self, util.expand_to_tuple(inputs)))
+        stack = util.expand_to_tuple(inputs)
+        if observer.OBSERVERS and not observer.is_observing():
+            # The top-level call, nested calls are observed by `constrained_call`.
+            signature = getattr(self, "signature", None)
+            return util.squeeze_tuple(observer.observe(self, stack, signature, call))
+        return util.squeeze_tuple(method(self, stack))
+
+    return inner
+
+
+def astackmethod(method: Fn) -> AsyncStackMethod:
+    """Wraps a any coroutine method to an asynchronous stackmethod.
+
+    Like `stackmethod`, but the method is a coroutine function.
+
+    Args:
+        method: a coroutine method to wrap.
+
+    Returns:
+        an asynchronous stackmethod.
+    """
+
+    @wraps(method)
+    async def inner(self: Any, *inputs: Any) -> Any:
+        stack = util.expand_to_tuple(inputs)
+        return util.squeeze_tuple(await method(self, stack))
 
     return inner
@@ -0,0 +1,157 @@
+"""The streaming mode maps combinators over iterables of stacks.
+
+Stacks are taken from an iterable lazily, so the iterable may be unbounded
+and only a single chunk of stacks is kept in memory at a time. A combinator
+is prepared once for the whole stream: it's either compiled into a python
+function applied to each stack, or lowered for the batched mode applied
+to chunks of stacks.
+
+Compiled functions aren't observed and don't use executors. So stacks are
+applied to the combinator itself while some observer is installed, and
+combinators with executors aren't compiled.
+
+Each item of the iterable is a stack: a tuple of inputs, or a single input
+that isn't a tuple. Outputs are yielded in order, in the same form as
+the outputs of the combinator call.
+"""
+
+import time
+import itertools
+from typing import Any, Iterable, Iterator, List, Optional
+from redex import util
+from redex import batch
+from redex import compiler
+from redex import observer
+from redex.executor import walk
+from redex.function import Fn
+
+MAX_CHUNK_SIZE = 65536
+"""the maximum size of chunks adapted to the target latency."""
+
+
+def stream(
+    func: Fn,
+    items: Iterable[Any],
+    chunk_size: int = 256,
+    target_latency: Optional[float] = None,
+    batched: bool = False,
+) -> Iterator[Any]:
+    """Lazily applies the combinator to each stack of the iterable.
+
+    >>> import operator as op
+    >>> from redex import combinator as cb
+    >>> from redex.streaming import stream
+    >>> list(stream(cb.serial(op.add, op.neg), [(1, 2), (3, 4)]))
+    [-3, -7]
+    >>> list(stream(op.add, [(1, 2), (3, 4)], batched=True))
+    [3, 7]
+
+    Args:
+        func: a combinator or any other function.
+        items: an iterable of stacks.
+        chunk_size: a number of stacks taken from the iterable at a time
+            in the batched mode (or initial number if the size is adapted).
+            Otherwise, stacks are taken one at a time.
+        target_latency: a desired time (in seconds) to process a chunk of
+            stacks in the batched mode. If set, the chunk size is adapted
+            to observed latency.
+        batched: whether chunks of stacks are applied in the batched mode
+            (see `redex.batch`). Otherwise, the combinator is compiled
+            and applied to each stack.
+
+    Returns:
+        an iterator of outputs.
+
+    Raises:
+        ValueError: if some function of the combinator requires more inputs
+            than available to it, if the chunk size isn't positive, or if
+            the target latency is set without the batched mode.
+    """
+    if chunk_size < 1:
+        raise ValueError(f"The chunk size must be positive, but {chunk_size} given.")
+    if batched:
+        return _stream_batched(batch.vmap(func), items, chunk_size, target_latency)
+    if target_latency is not None:
+        raise ValueError("The target latency is only supported in the batched mode.")
+    if any(getattr(node, "executor", None) is not None for node in walk(func)):
+        return _stream_each(func, None, items)
+    return _stream_each(func, compiler.compile(func).func, items)
+
+
+def _stream_each(func: Fn, compiled: Optional[Fn], items: Iterable[Any]) -> Iterator[Any]:
+    """Applies the combinator to each stack, by its compiled function
+    if it's set and no observer is installed."""
+    for item in items:
+        call = func if compiled is None or observer.OBSERVERS else compiled
+        yield call(*item) if isinstance(item, tuple) else call(item)
+
+
+def _stream_batched(
+    batched: batch.Batched,
+    items: Iterable[Any],
+    chunk_size: int,
+    target_latency: Optional[float],
+) -> Iterator[Any]:
+    """Applies the batched combinator to chunks of stacks."""
+    iterator = iter(items)
+    while True:
+        rows = [
+            util.expand_to_tuple(item)
+            for item in itertools.islice(iterator, chunk_size)
+        ]
+        if not rows:
+            return
+
+        start = time.perf_counter()
+        columns = _transpose(rows)
+        outputs = batch.run(batched.program, columns, n_rows=len(rows))
+        latency = time.perf_counter() - start
+        for row in zip(*outputs):
+            yield util.squeeze_tuple(row)
+
+        if target_latency is not None:
+            chunk_size = adapt_chunk_size(
+                chunk_size, len(rows), latency, target_latency
+            )
+
+
+def _transpose(rows: List[tuple[Any, ...]]) -> tuple[Any, ...]:
+    """Turns rows of the chunk into columns."""
+    n_columns = len(rows[0])
+    if any(len(row) != n_columns for row in rows):
+        raise ValueError("All stacks of the chunk must have the same size.")
+    return tuple(list(column) for column in zip(*rows))
+
+
+def adapt_chunk_size(
+    chunk_size: int,
+    n_rows: int,
+    latency: float,
+    target_latency: float,
+) -> int:
+    """Estimates the chunk size that is processed with the target latency.
+
+    The size changes at most twice per chunk, so a single outlier doesn't
+    swing it.
+
+    >>> from redex.streaming import adapt_chunk_size
+    >>> adapt_chunk_size(100, 100, latency=0.01, target_latency=0.02)
+    200
+    >>> adapt_chunk_size(100, 100, latency=0.04, target_latency=0.02)
+    50
+
+    Args:
+        chunk_size: a current chunk size.
+        n_rows: a number of stacks in the processed chunk.
+        latency: a time (in seconds) the chunk was processed.
+        target_latency: a desired time (in seconds) to process a chunk.
+
+    Returns:
+        the next chunk size.
+    """
+    if latency <= 0.0:
+        estimate = chunk_size * 2
+    else:
+        estimate = int(n_rows * target_latency / latency)
+    estimate = max(chunk_size // 2, min(chunk_size * 2, estimate))
+    return max(1, min(MAX_CHUNK_SIZE, estimate))
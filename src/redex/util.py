@@ -1,11 +1,14 @@
 """General utility functions."""
 
 import types
-from typing import Any, Callable, Iterable, List
-from functools import reduce
+import itertools
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence
+from functools import reduce, lru_cache
+from dataclasses import fields
 
 PredicateFn = Callable[[Any], bool]
 SelectFn = Callable[[Any], Iterable[Any]]
+PlanFn = Callable[[Any], tuple[Any, ...]]
 
 
 def expand_to_tuple(item: Any) -> tuple[Any, ...]:
@@ -248,6 +251,160 @@ def reshape_tuples(item: Any, shape: tuple[Any, ...]) -> Any:
     return shaped
 
 
+@lru_cache(maxsize=None)
+def reshape_plan(shape: tuple[Any, ...]) -> Optional[PlanFn]:
+    """Compiles a shape into a function reshaping a flat sequence into tuples.
+
+    The plan takes items by their indices, so it doesn't walk the shape
+    on every call. Plans are compiled once for each shape.
+
+    Args:
+        shape: a desired shape of a sequence.
+
+    Returns:
+        a function from a flat sequence to shaped tuples, or `None` if
+        the shape is flat and the sequence doesn't need to be reshaped.
+
+    >>> from redex import util
+    >>> plan = util.reshape_plan(((),(((),()),())))
+    >>> plan((1,2,3,4))
+    (1, ((2, 3), 4))
+    >>> util.reshape_plan(((),())) is None
+    True
+    """
+    if not any(shape):
+        return None
+
+    return _define_plan(_index_expression(shape, itertools.count()))
+
+
+@lru_cache(maxsize=None)
+def flatten_plan(shape: tuple[Any, ...]) -> Optional[PlanFn]:
+    """Compiles a shape into a function flattening tuples of that shape.
+
+    Unlike `flatten_tuples`, the plan only flattens tuples described
+    by the shape. Plans are compiled once for each shape.
+
+    Args:
+        shape: a shape of tuples.
+
+    Returns:
+        a function from shaped tuples to a flat tuple, or `None` if
+        the shape is flat and tuples don't need to be flattened.
+
+    >>> from redex import util
+    >>> plan = util.flatten_plan(((),(((),()),())))
+    >>> plan((1, ((2, 3), 4)))
+    (1, 2, 3, 4)
+    >>> util.flatten_plan(((),())) is None
+    True
+    """
+    if not any(shape):
+        return None
+
+    return _define_plan(f"({', '.join(_path_expressions(shape, 'x'))},)")
+
+
+def slotted(weakref: bool = False) -> Callable[[type], Any]:
+    """Makes a decorator recreating the dataclass with `__slots__` for its fields.
+
+    Instances of the slotted class don't have `__dict__`, so they take less
+    memory (like `dataclass(slots=True)` since python 3.10). Fields already
+    slotted by base classes aren't slotted again.
+
+    Args:
+        weakref: whether instances of the class support weak references.
+
+    Returns:
+        a class decorator.
+
+    >>> from dataclasses import dataclass
+    >>> from redex import util
+    >>> @util.slotted()
+    ... @dataclass(frozen=True)
+    ... class Point:
+    ...     x: int
+    ...     y: int = 0
+    >>> Point(1), hasattr(Point(1), "__dict__")
+    (Point(x=1, y=0), False)
+    """
+
+    def decorate(cls: type) -> Any:
+        inherited = {
+            name
+            for base in cls.__mro__[1:]
+            for name in base.__dict__.get("__slots__", ())
+        }
+        names = [field.name for field in fields(cls) if field.name not in inherited]
+        if weakref and "__weakref__" not in inherited:
+            names.append("__weakref__")
+        namespace = dict(cls.__dict__)
+        for name in names:
+            # Default values are kept by the generated initializer.
+            namespace.pop(name, None)
+        namespace.pop("__dict__", None)
+        namespace.pop("__weakref__", None)
+        namespace["__slots__"] = tuple(names)
+        slotted_cls = type(cls)(cls.__name__, cls.__bases__, namespace)
+        slotted_cls.__qualname__ = cls.__qualname__
+        return slotted_cls
+
+    return decorate
+
+
+def format_table(rows: Sequence[Sequence[str]]) -> str:
+    """Formats rows of cells as a table with aligned columns.
+
+    The first column is aligned to the left, and other columns are
+    aligned to the right.
+
+    Args:
+        rows: rows of cells, starting with a header. All rows have
+            the same number of cells.
+
+    Returns:
+        a table.
+
+    >>> from redex import util
+    >>> print(util.format_table([("name", "calls"), ("add", "12"), ("neg", "3")]))
+    name  calls
+    add      12
+    neg       3
+    """
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    lines = []
+    for row in rows:
+        name, *values = row
+        cells = [name.ljust(widths[0])]
+        cells += [value.rjust(width) for value, width in zip(values, widths[1:])]
+        lines.append("  ".join(cells).rstrip())
+    return "\n".join(lines)
+
+
+def _index_expression(shape: tuple[Any, ...], indices: Iterator[int]) -> str:
+    """Builds an expression of tuples of the shape with items taken by indices."""
+    items = [
+        _index_expression(item, indices) if item else f"x[{next(indices)}]"
+        for item in shape
+    ]
+    return f"({', '.join(items)},)"
+
+
+def _path_expressions(shape: tuple[Any, ...], prefix: str) -> List[str]:
+    """Builds expressions of items in tuples of the shape by their paths."""
+    paths: List[str] = []
+    for i, item in enumerate(shape):
+        path = f"{prefix}[{i}]"
+        paths += _path_expressions(item, path) if item else [path]
+    return paths
+
+
+def _define_plan(expression: str) -> PlanFn:
+    """Defines a function of a single argument `x` from the expression."""
+    plan: PlanFn = eval(f"lambda x: {expression}")  # pylint: disable=eval-used
+    return plan
+
+
 def _flatten(
     item: Any,
     predicate: PredicateFn,
@@ -267,8 +424,9 @@ def _flatten(
 
     def inner(acc: List[Any], item: Any) -> List[Any]:
         if predicate(item):
-            return acc + reduce(inner, select(item), [])
-        return acc + [item]
+            return reduce(inner, select(item), acc)
+        acc.append(item)
+        return acc
 
     if predicate(item):
         return reduce(inner, select(item), [])
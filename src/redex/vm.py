@@ -0,0 +1,250 @@
+"""The virtual machine executes combinators without recursion.
+
+A combinator tree is lowered into a flat list of instructions. Instructions
+run over a single preallocated list that holds the stack, so neither nested
+combinators consume python frames nor each step copies the whole stack.
+
+The stack grows downwards: the top of the stack is the item at the stack
+pointer, and an item at the depth `d` is placed at `sp + d`. Each instruction
+operates on a window of the stack at some depth (offset) from the top, which
+lets children of the parallel combinator work in place.
+
+*Note that the machine follows declared signatures. A function that returns
+a different number of outputs than its signature declares is an error.*
+"""
+
+from functools import reduce
+from typing import Any, List, Optional
+from dataclasses import dataclass, field
+from redex import util
+from redex import function as fn
+from redex.function import Fn, FineCallable, Signature
+from redex.stack import collect_outputs
+from redex.compiler import Compiled
+from redex.combinator import Drop, Dup, Foldl, Identity, Parallel, Select, Serial
+
+CALL = 0
+"""calls a function: `arg` is a tuple of the function, its input reshaping plan
+and its signature."""
+
+SELECT = 1
+"""replaces inputs with copies of selected items: `arg` is a tuple of indices."""
+
+DUP = 2
+"""duplicates inputs."""
+
+DROP = 3
+"""removes inputs."""
+
+FOLD = 4
+"""folds inputs with a function of two arguments: `arg` is the function."""
+
+Instruction = tuple[int, int, int, int, Any]
+"""The instruction: an opcode, a depth of the window from the top
+of the stack, a number of inputs and outputs, and an argument."""
+
+_Node = tuple[Fn, Signature, int, Optional[int]]
+"""The node to lower: a function, its signature, a depth of its window
+from the top of the stack, and a window size (`None` if unbounded)."""
+
+
+@dataclass(frozen=True)
+class Program(FineCallable):
+    """The combinator lowered into a flat list of instructions."""
+
+    combinator: Fn
+    """an original combinator."""
+
+    instructions: List[Instruction] = field(repr=False)
+    """instructions to execute."""
+
+    headroom: int
+    """a maximum number of items the stack grows by during execution."""
+
+    def __call__(self, *inputs: Any) -> Any:
+        return util.squeeze_tuple(run(self, inputs))
+
+
+def lower(func: Fn) -> Program:
+    """Lowers a combinator into a flat list of instructions.
+
+    >>> import operator as op
+    >>> from redex import combinator as cb
+    >>> from redex import vm
+    >>> program = vm.lower(cb.serial(cb.dup(), op.mul, op.add))
+    >>> program(3, 1) == 3 * 3 + 1
+    True
+
+    Args:
+        func: a combinator or any other function.
+
+    Returns:
+        a program with the same signature as the original combinator.
+
+    Raises:
+        ValueError: if some function of the combinator requires more inputs
+            than available to it.
+    """
+    signature = fn.infer_signature(func)
+    instructions: List[Instruction] = []
+    # The tree is walked with an explicit stack instead of recursion.
+    nodes: List[_Node] = [(func, signature, 0, None)]
+    while nodes:
+        nodes += reversed(_lower_node(*nodes.pop(), instructions))
+
+    n_in, headroom = _estimate_stack_bounds(instructions)
+    n_in = max(n_in, signature.n_in)
+    return Program(
+        signature=Signature(n_in=n_in, n_out=n_in + _stack_change(instructions)),
+        combinator=func,
+        instructions=instructions,
+        headroom=headroom,
+    )
+
+
+def _lower_node(
+    node: Fn,
+    signature: Signature,
+    offset: int,
+    window: Optional[int],
+    instructions: List[Instruction],
+) -> List[_Node]:
+    """Lowers a node into instructions.
+
+    Args:
+        node: a function to lower.
+        signature: a signature of the function.
+        offset: a depth of the function window from the top of the stack.
+        window: a number of items available to the function.
+        instructions: instructions to append to.
+
+    Returns:
+        child nodes to lower next in order.
+    """
+    n_in, n_out = signature.n_in, signature.n_out
+    if window is not None and n_in > window:
+        _raise_less_inputs(node, n_in, window)
+
+    if isinstance(node, (Program, Compiled)):
+        return [(node.combinator, signature, offset, window)]
+    if isinstance(node, Serial):
+        children = zip(node.children, node.children_signatures)
+        return [(child, s, offset, s.n_in) for child, s in children]
+    if isinstance(node, Parallel):
+        nodes: List[_Node] = []
+        for child, child_signature in zip(node.children, node.children_signatures):
+            nodes.append((child, child_signature, offset, child_signature.n_in))
+            offset += child_signature.n_out
+        return nodes
+
+    if isinstance(node, Select):
+        n_select = max([n_in, *[i + 1 for i in node.indices]])
+        if window is not None and n_select > window:
+            _raise_less_inputs(node, n_select, window)
+        instructions.append((SELECT, offset, n_in, n_out, tuple(node.indices)))
+    elif isinstance(node, Dup):
+        instructions.append((DUP, offset, n_in, n_out, None))
+    elif isinstance(node, Drop):
+        instructions.append((DROP, offset, n_in, n_out, None))
+    elif isinstance(node, Foldl):
+        instructions.append((FOLD, offset, n_in, n_out, node.func))
+    elif isinstance(node, Identity):
+        # The identity only requires its inputs, which is verified by now.
+        pass
+    else:
+        plan = signature.reshape_plan
+        instructions.append((CALL, offset, n_in, n_out, (node, plan, signature)))
+    return []
+
+
+def run(program: Program, inputs: tuple[Any, ...]) -> tuple[Any, ...]:
+    """Executes the program.
+
+    Args:
+        program: a program to execute.
+        inputs: the stack to apply the program to.
+
+    Returns:
+        the stack after execution.
+
+    Raises:
+        ValueError: if a number of inputs less than required by the program,
+            or if some function returns a different number of outputs
+            than its signature declares.
+    """
+    # The loop is kept inline, because it's the hottest path.
+    # pylint: disable=too-many-locals,too-many-branches
+    n_inputs = len(inputs)
+    if n_inputs < program.signature.n_in:
+        _raise_less_inputs(program.combinator, program.signature.n_in, n_inputs)
+
+    size = n_inputs + program.headroom
+    mem: List[Any] = [None] * size
+    sp = size - n_inputs
+    mem[sp:] = inputs
+    for opcode, offset, n_in, n_out, arg in program.instructions:
+        base = sp + offset
+        if opcode == CALL:
+            func, plan, signature = arg
+            args = mem[base : base + n_in]
+            result = func(*args) if plan is None else func(*plan(args))
+            values: Any = collect_outputs(result, signature)
+            if len(values) != n_out:
+                raise ValueError(
+                    f"The `{fn.infer_name(func)}` returned {len(values)} "
+                    f"outputs but its signature declares {n_out}."
+                )
+        elif opcode == SELECT:
+            values = [mem[base + i] for i in arg]
+        elif opcode == DUP:
+            values = mem[base : base + n_in] * 2
+        elif opcode == DROP:
+            values = ()
+        else:
+            values = (reduce(arg, mem[base : base + n_in]),)
+
+        if n_in == n_out:
+            mem[base : base + n_out] = values
+            continue
+
+        new_sp = sp + n_in - n_out
+        if offset:
+            # Move items above the window.
+            mem[new_sp : new_sp + offset] = mem[sp:base]
+        mem[new_sp + offset : new_sp + offset + n_out] = values
+        if new_sp > sp:
+            # Release references to removed items.
+            mem[sp:new_sp] = [None] * (new_sp - sp)
+        sp = new_sp
+
+    return tuple(mem[sp:])
+
+
+def _estimate_stack_bounds(instructions: List[Instruction]) -> tuple[int, int]:
+    """Estimates a required number of inputs and a maximum growth of the stack.
+
+    Args:
+        instructions: instructions to execute.
+
+    Returns:
+        a number of inputs and a number of items the stack grows by.
+    """
+    n_required, headroom, change = 0, 0, 0
+    for opcode, offset, n_in, n_out, arg in instructions:
+        n_depth = max([n_in, *[i + 1 for i in arg]]) if opcode == SELECT else n_in
+        n_required = max(n_required, offset + n_depth - change)
+        change += n_out - n_in
+        headroom = max(headroom, change)
+    return n_required, headroom
+
+
+def _stack_change(instructions: List[Instruction]) -> int:
+    """Counts a change of the stack size after execution."""
+    return sum(n_out - n_in for _, _, n_in, n_out, _ in instructions)
+
+
+def _raise_less_inputs(func: Fn, n_in: int, n_available: int) -> None:
+    raise ValueError(
+        f"The `{fn.infer_name(func)}` takes {n_in} "
+        f"positional arguments but {n_available} were given."
+    )
@@ -0,0 +1,90 @@
+from typing import Any
+import asyncio
+import unittest
+import operator as op
+from redex import combinator as cb
+from redex.stack import constrained_acall
+
+
+async def add(a: Any, b: Any) -> Any:
+    await asyncio.sleep(0)
+    return a + b
+
+
+async def pair(a: Any) -> tuple[Any, Any]:
+    return a, a + 1
+
+
+class ConstrainedAcallTest(unittest.TestCase):
+    def test_coroutine_function(self):
+        self.assertEqual(asyncio.run(constrained_acall(add, (1, 2, 0))), (3, 0))
+
+    def test_function(self):
+        self.assertEqual(asyncio.run(constrained_acall(op.add, (1, 2, 0))), (3, 0))
+
+    def test_outputs(self):
+        self.assertEqual(asyncio.run(constrained_acall(pair, (1, 0))), (1, 2, 0))
+
+    def test_less_input(self):
+        with self.assertRaises(ValueError):
+            asyncio.run(constrained_acall(add, (1,)))
+
+
+class AcallTest(unittest.TestCase):
+    def test_serial(self):
+        serial = cb.serial(add, op.neg, pair)
+        self.assertEqual(asyncio.run(serial.acall(1, 2)), (-3, -2))
+
+    def test_same_as_call(self):
+        combinator = cb.serial(
+            cb.branch(cb.residual(op.add), cb.select(indices=[1])),
+            cb.parallel(op.mul, cb.dup()),
+            cb.add(n_in=3),
+        )
+        self.assertEqual(asyncio.run(combinator.acall(1, 2, 3)), combinator(1, 2, 3))
+
+    def test_parallel(self):
+        parallel = cb.parallel(add, op.sub, pair)
+        self.assertEqual(
+            asyncio.run(parallel.acall(1, 2, 3, 4, 5, 6)), (3, -1, 5, 6, 6)
+        )
+
+    def test_branch(self):
+        branch = cb.branch(add, cb.serial(add, op.neg))
+        self.assertEqual(asyncio.run(branch.acall(1, 2)), (3, -3))
+
+    def test_parallel_concurrent(self):
+        async def meet(mine: asyncio.Event, theirs: asyncio.Event) -> Any:
+            # Would wait forever if the children ran one after another.
+            mine.set()
+            await asyncio.wait_for(theirs.wait(), timeout=10)
+            return 0
+
+        async def main() -> Any:
+            first, second = asyncio.Event(), asyncio.Event()
+            return await cb.parallel(meet, meet).acall(first, second, second, first)
+
+        self.assertEqual(asyncio.run(main()), (0, 0))
+
+    def test_concurrency_limit(self):
+        running, peak = 0, 0
+
+        async def task(a: Any) -> Any:
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.001)
+            running -= 1
+            return a
+
+        branch = cb.branch(task, task, task, task, concurrency=2)
+        self.assertEqual(asyncio.run(branch.acall(1)), (1, 1, 1, 1))
+        self.assertEqual(peak, 2)
+
+    def test_nested_combinator(self):
+        serial = cb.serial(cb.serial(add, add), cb.foldl(op.mul, n_in=2))
+        self.assertEqual(asyncio.run(serial.acall(1, 2, 3, 4)), (1 + 2 + 3) * 4)
+
+    def test_select(self):
+        select = cb.select(indices=[1, 0])
+        self.assertEqual(asyncio.run(select.acall(1, 2)), (2, 1))
@@ -0,0 +1,171 @@
+from typing import Any
+import unittest
+import operator as op
+import numpy as np
+from redex import combinator as cb
+from redex.function import Signature
+from redex.batch import vmap, vectorized, is_vectorized, Batched
+
+
+class VmapTest(unittest.TestCase):
+    def test_signature(self):
+        batched = vmap(cb.serial(op.add, op.add))
+        self.assertEqual(batched.signature, Signature(n_in=3, n_out=1))
+
+    def test_function(self):
+        batched = vmap(op.add)
+        self.assertEqual(batched([1, 2], [3, 4]), [1 + 3, 2 + 4])
+
+    def test_serial(self):
+        batched = vmap(cb.serial(op.add, op.neg))
+        self.assertEqual(batched([1, 2], [3, 4]), [-(1 + 3), -(2 + 4)])
+
+    def test_parallel(self):
+        batched = vmap(cb.parallel(op.add, op.neg))
+        self.assertEqual(batched([1, 2], [3, 4], [5, 6]), ([4, 6], [-5, -6]))
+
+    def test_branch(self):
+        batched = vmap(cb.branch(op.add, op.sub))
+        self.assertEqual(batched([1, 2], [3, 5]), ([4, 7], [-2, -3]))
+
+    def test_select(self):
+        x, y = [1, 2], [3, 4]
+        outputs = vmap(cb.select(indices=[1, 0, 0]))(x, y)
+        self.assertEqual(outputs, (y, x, x))
+        self.assertIs(outputs[0], y)
+
+    def test_drop(self):
+        self.assertEqual(vmap(cb.drop())([1, 2], [3, 4]), [3, 4])
+
+    def test_dup(self):
+        self.assertEqual(vmap(cb.dup())([1, 2]), ([1, 2], [1, 2]))
+
+    def test_foldl(self):
+        batched = vmap(cb.sub(n_in=3))
+        self.assertEqual(batched([5, 6], [1, 2], [1, 1]), [3, 3])
+
+    def test_foldl_arrays(self):
+        batched = vmap(cb.div(n_in=3))
+        outputs = batched(
+            np.array([8.0, 6.0]), np.array([2.0, 3.0]), np.array([2.0, 1.0])
+        )
+        self.assertIsInstance(outputs, np.ndarray)
+        np.testing.assert_array_equal(outputs, [2.0, 2.0])
+
+    def test_foldl_arrays_custom_function(self):
+        batched = vmap(cb.foldl(max, n_in=2))
+        outputs = batched(np.array([1, 5]), np.array([3, 2]))
+        self.assertEqual(outputs, [3, 5])
+
+    def test_multiple_outputs(self):
+        def func(x: Any) -> tuple[Any, Any]:
+            return x, x * 2
+
+        batched = vmap(cb.serial(func, op.add))
+        self.assertEqual(batched([1, 2]), [3, 6])
+
+    def test_no_outputs(self):
+        seen = []
+
+        def func(x: Any) -> None:
+            seen.append(x)
+
+        self.assertEqual(vmap(cb.serial(func))([1, 2], [3, 4]), [3, 4])
+        self.assertEqual(seen, [1, 2])
+
+    def test_no_inputs(self):
+        def func() -> int:
+            return 1
+
+        self.assertEqual(vmap(func)([0, 0]), ([1, 1], [0, 0]))
+
+    def test_no_columns(self):
+        def func() -> int:
+            return 1
+
+        self.assertEqual(vmap(func)(n_rows=3), [1, 1, 1])
+        with self.assertRaises(ValueError):
+            vmap(func)()
+
+    def test_rows_mismatch(self):
+        with self.assertRaises(ValueError):
+            vmap(op.add)([1, 2], [3, 4], n_rows=3)
+
+    def test_empty_batch(self):
+        self.assertEqual(vmap(cb.parallel(op.add, op.neg))([], [], []), ([], []))
+
+    def test_input_shape(self):
+        def func(x: tuple[Any, Any], y: Any) -> Any:
+            return x[0] * x[1] + y
+
+        self.assertEqual(vmap(func)([1, 2], [3, 4], [5, 6]), [8, 14])
+
+    def test_less_columns(self):
+        with self.assertRaises(ValueError):
+            vmap(op.add)([1, 2])
+
+    def test_different_lengths(self):
+        with self.assertRaises(ValueError):
+            vmap(op.add)([1, 2], [1])
+
+    def test_wrong_outputs(self):
+        def func(x: Any) -> tuple[Any, Any]:
+            return (x,)
+
+        with self.assertRaises(ValueError):
+            vmap(func)([1, 2])
+
+    def test_same_as_combinator(self):
+        combinator = cb.serial(
+            cb.branch(cb.residual(op.add), cb.select(indices=[1])),
+            cb.parallel(op.mul, cb.dup()),
+            cb.add(n_in=3),
+        )
+        rows = [(1, 2, 3), (3, 4, 5), (-1, 7, 0)]
+        columns = [list(column) for column in zip(*rows)]
+        self.assertEqual(vmap(combinator)(*columns), [combinator(*row) for row in rows])
+
+
+class VectorizedTest(unittest.TestCase):
+    def test_marker(self):
+        @vectorized
+        def func(x):
+            return x
+
+        self.assertTrue(is_vectorized(func))
+        self.assertFalse(is_vectorized(op.add))
+
+    def test_called_once(self):
+        calls = []
+
+        @vectorized
+        def func(x: Any, y: Any) -> Any:
+            calls.append((x, y))
+            return x * y
+
+        outputs = vmap(cb.serial(func, op.neg))(np.array([1, 2]), np.array([3, 4]))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(outputs, [-3, -8])
+
+    def test_multiple_outputs(self):
+        @vectorized
+        def func(x: Any) -> tuple[Any, Any]:
+            return x + 1, x - 1
+
+        outputs = vmap(func)(np.array([1, 2]))
+        np.testing.assert_array_equal(outputs[0], [2, 3])
+        np.testing.assert_array_equal(outputs[1], [0, 1])
+
+    def test_tuple_column(self):
+        @vectorized
+        def func(x):
+            return tuple(x)
+
+        self.assertEqual(vmap(func)([1, 2]), (1, 2))
+
+    def test_nested_batched(self):
+        inner = vmap(cb.serial(op.add, op.neg))
+        self.assertIsInstance(inner, Batched)
+        self.assertTrue(is_vectorized(inner))
+        outputs = vmap(cb.serial(inner, cb.dup()))([1, 2], [3, 4])
+        self.assertEqual(outputs, ([-4, -6], [-4, -6]))
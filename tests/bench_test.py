@@ -0,0 +1,84 @@
+import os
+import io
+import tempfile
+import unittest
+import operator as op
+from contextlib import redirect_stdout
+from redex import bench
+from redex import combinator as cb
+from redex.bench.__main__ import main
+
+
+def result(name, latency):
+    return bench.Result(name, "micro", {}, 0.0, latency, latency, 0, 1)
+
+
+class MeasureTest(unittest.TestCase):
+    def test_measure(self):
+        benchmark = bench.Benchmark("add", lambda: cb.add(), (1, 2))
+        measured = bench.measure(benchmark, repeat=2, min_time=0.001)
+        self.assertEqual(measured.name, "add")
+        self.assertGreater(measured.latency, 0.0)
+        self.assertGreaterEqual(measured.latency_median, measured.latency)
+        self.assertGreaterEqual(measured.peak_memory, 0)
+        self.assertGreaterEqual(measured.n_calls, 1)
+
+    def test_peak_memory(self):
+        benchmark = bench.Benchmark("alloc", lambda: lambda n: [0] * n, (100000,))
+        measured = bench.measure(benchmark, repeat=1, min_time=0.0)
+        self.assertGreaterEqual(measured.peak_memory, 100000 * 8)
+
+    def test_run_pattern(self):
+        benchmarks = [
+            bench.Benchmark("add", lambda: op.add, (1, 2)),
+            bench.Benchmark("sub", lambda: op.sub, (1, 2)),
+        ]
+        results = bench.run(benchmarks, pattern="^a", repeat=1, min_time=0.0)
+        self.assertEqual([result.name for result in results], ["add"])
+
+    def test_suite(self):
+        for benchmark in bench.benchmarks():
+            with self.subTest(benchmark.name):
+                benchmark.build()(*benchmark.inputs)
+
+
+class CompareTest(unittest.TestCase):
+    def test_compare(self):
+        base = [result("a", 1.0), result("b", 1.0), result("c", 1.0), result("d", 1.0)]
+        new = [result("a", 2.0), result("b", 0.5), result("c", 1.05), result("e", 1.0)]
+        statuses = {c.name: c.status for c in bench.compare(base, new, threshold=0.1)}
+        self.assertEqual(
+            statuses,
+            {"a": "slower", "b": "faster", "c": "same", "d": "removed", "e": "added"},
+        )
+
+    def test_save_load(self):
+        results = [result("a", 1.0)]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "results.json")
+            bench.save(results, path)
+            self.assertEqual(bench.load(path), results)
+
+    def test_load_unknown(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "results.json")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write("{}")
+            with self.assertRaises(ValueError):
+                bench.load(path)
+
+
+class MainTest(unittest.TestCase):
+    def test_run_and_compare(self):
+        with tempfile.TemporaryDirectory() as directory:
+            base = os.path.join(directory, "base.json")
+            new = os.path.join(directory, "new.json")
+            bench.save([result("serial", 1.0)], base)
+            output = io.StringIO()
+            with redirect_stdout(output):
+                args = ["run", "-k", "^serial$", "--repeat", "1", "--min-time", "0"]
+                self.assertEqual(main(args + ["--output", new]), 0)
+                self.assertEqual(main(["compare", base, new]), 0)
+                self.assertEqual(main(["compare", new, base]), 1)
+            self.assertIn("serial", output.getvalue())
+            self.assertIn("faster", output.getvalue())
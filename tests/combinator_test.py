@@ -1,6 +1,16 @@
+import copy
+import pickle
+import dataclasses
 import unittest
+import functools
+from unittest import mock
+import threading
 import operator as op
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from redex import combinator as cb
+from redex.combinator._fold import AGGREGATE_SIZE, CHUNK_SIZE
+from redex.combinator._memo import make_key
 from redex.function import Signature
 
 
@@ -15,6 +25,48 @@ class CombinatorTest(unittest.TestCase):
         except:
             self.fail("__init__ is not implemented for Add class.")
 
+    def test_combinator_is_frozen(self):
+        serial = cb.serial(op.add, cb.dup())
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            serial.children = []
+        self.assertEqual(dataclasses.replace(serial, children=[])(1, 2), (1, 2))
+
+    def test_combinator_is_slotted(self):
+        for combinator in [cb.serial(op.add), cb.parallel(op.add), cb.dup(), cb.add()]:
+            self.assertFalse(hasattr(combinator, "__dict__"))
+
+    def test_shared_signatures(self):
+        parallel = cb.parallel(cb.dup(), cb.dup())
+        self.assertIs(cb.dup().signature, cb.dup().signature)
+        self.assertIs(
+            parallel.children_signatures[1],
+            cb.parallel(op.neg, cb.dup()).children_signatures[1],
+        )
+
+    def test_pickle(self):
+        serial = cb.serial(op.add, cb.branch(cb.dup(), cb.select([1, 0])))
+        unpickled = pickle.loads(pickle.dumps(serial))
+        self.assertEqual(unpickled, serial)
+        self.assertEqual(unpickled(1, 2, 3), serial(1, 2, 3))
+
+    def test_copy(self):
+        serial = cb.serial(op.add, cb.memo(op.neg))
+        for copied in [copy.copy(serial), copy.deepcopy(serial)]:
+            self.assertEqual(copied, serial)
+            self.assertEqual(copied(1, 2, 3), serial(1, 2, 3))
+        self.assertIs(copy.copy(serial).children, serial.children)
+        self.assertIsNot(copy.deepcopy(serial).children, serial.children)
+
+    def test_copy_keeps_executor(self):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            combinators = [
+                cb.parallel(op.add, op.sub, executor=executor),
+                cb.foldl(op.add, 4, associative=True, executor=executor),
+            ]
+            for combinator in combinators:
+                self.assertIs(copy.copy(combinator).executor, executor)
+                self.assertIs(copy.deepcopy(combinator).executor, executor)
+
 
 class SerialTest(unittest.TestCase):
     def test_signature(self):
@@ -47,6 +99,23 @@ class SerialTest(unittest.TestCase):
         serial = cb.serial(op.add)
         self.assertEqual(serial(1, 2, 3, 4), (1 + 2, 3, 4))
 
+    def test_verified(self):
+        serial = cb.serial(cb.dup(), cb.drop(), cb.serial(op.add, cb.dup()))
+        self.assertTrue(serial.verified)
+        with mock.patch("redex.combinator._drop.verify_stack_size") as verify:
+            self.assertEqual(serial(1, 2, 3), (3, 3, 3))
+        verify.assert_not_called()
+        with self.assertRaises(ValueError):
+            serial(1)
+
+    def test_unverified(self):
+        serial = cb.serial(op.add)
+        serial = dataclasses.replace(serial, signature=Signature(n_in=1, n_out=0))
+        self.assertFalse(serial.verified)
+        self.assertEqual(serial(1, 2), 3)
+        with self.assertRaises(ValueError):
+            serial(1)
+
     def test_less_input(self):
         serial = cb.serial(op.add)
         with self.assertRaises(ValueError):
@@ -84,6 +153,11 @@ class BranchTest(unittest.TestCase):
         branch = cb.branch(op.add)
         self.assertEqual(branch(1, 2, 3, 4), (1 + 2, 3, 4))
 
+    def test_executor(self):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            branch = cb.branch(op.add, op.sub, op.neg, executor=executor)
+            self.assertEqual(branch(1, 2), (1 + 2, 1 - 2, -1))
+
     def test_less_input(self):
         branch = cb.branch(op.add)
         with self.assertRaises(ValueError):
@@ -126,6 +200,36 @@ class ParallelTest(unittest.TestCase):
         with self.assertRaises(ValueError):
             parallel(1)
 
+    def test_executor(self):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            parallel = cb.parallel(op.add, op.sub, op.neg, executor=executor)
+            self.assertEqual(parallel(1, 2, 3, 4, 5, 6), (1 + 2, 3 - 4, -5, 6))
+
+    def test_executor_concurrent(self):
+        barrier = threading.Barrier(2, timeout=10)
+
+        def wait(x):
+            barrier.wait()
+            return x
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            parallel = cb.parallel(wait, wait, executor=executor)
+            self.assertEqual(parallel(1, 2), (1, 2))
+
+    def test_executor_error(self):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            parallel = cb.parallel(op.add, op.truediv, executor=executor)
+            with self.assertRaises(ZeroDivisionError):
+                parallel(1, 2, 3, 0)
+
+    def test_executor_not_pickled(self):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            parallel = cb.parallel(op.add, op.sub, executor=executor)
+            restored = pickle.loads(pickle.dumps(parallel))
+        self.assertIsNone(restored.executor)
+        self.assertEqual(restored, parallel)
+        self.assertEqual(restored(1, 2, 3, 4), (1 + 2, 3 - 4))
+
 
 class ResidualTest(unittest.TestCase):
     def test_signature(self):
@@ -332,6 +436,81 @@ class IdentityTest(unittest.TestCase):
             identity(1)
 
 
+class FoldlTest(unittest.TestCase):
+    def test_builtin_aggregates(self):
+        for func, items in [
+            (op.add, tuple(range(10))),
+            (op.mul, tuple(range(1, 10))),
+            (op.mul, tuple(x / 3 for x in range(1, 10))),
+            (op.add, (1, 2.5, True, 4)),
+            (op.sub, tuple(range(10))),
+            (op.add, tuple(range(AGGREGATE_SIZE))),
+            (op.add, (*range(AGGREGATE_SIZE), -0.0)),
+            (op.mul, tuple(1 + x / AGGREGATE_SIZE for x in range(AGGREGATE_SIZE))),
+        ]:
+            with self.subTest(func=func, items=items):
+                foldl = cb.foldl(func, n_in=len(items))
+                self.assertEqual(foldl(*items), functools.reduce(func, items))
+
+    def test_few_scalars_reduced(self):
+        with mock.patch("redex.combinator._fold._fold") as fold:
+            self.assertEqual(cb.foldl(op.add, n_in=3)(1, 2, 3), 6)
+            self.assertEqual(cb.foldl(op.mul, n_in=8)(*[0.5] * 8), 0.5**8)
+        fold.assert_not_called()
+
+    def test_executor_not_pickled(self):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            foldl = cb.foldl(op.concat, n_in=3, associative=True, executor=executor)
+            restored = pickle.loads(pickle.dumps(foldl))
+        self.assertIsNone(restored.executor)
+        self.assertEqual(restored("a", "b", "c"), "abc")
+
+    def test_arrays(self):
+        items = [np.arange(1, 5, dtype=np.int8) * i for i in range(1, 50)]
+        for func in [op.add, op.sub, op.mul, op.truediv, op.or_]:
+            with self.subTest(func):
+                foldl = cb.foldl(func, n_in=len(items))
+                expected = functools.reduce(func, items)
+                actual = foldl(*items)
+                np.testing.assert_array_equal(actual, expected)
+                self.assertEqual(actual.dtype, expected.dtype)
+        np.testing.assert_array_equal(items[1], [2, 4, 6, 8])
+
+    def test_mixed_arrays(self):
+        items = [np.ones(2, dtype=np.int8), np.ones(2), np.full(2, 0.5)]
+        result = cb.foldl(op.add, n_in=3)(*items)
+        np.testing.assert_array_equal(result, [2.5, 2.5])
+        np.testing.assert_array_equal(items[0], [1, 1])
+
+    def test_associative(self):
+        calls = []
+
+        def concat(a, b):
+            calls.append((a, b))
+            return a + b
+
+        foldl = cb.foldl(concat, n_in=5, associative=True)
+        self.assertEqual(foldl("a", "b", "c", "d", "e"), "abcde")
+        self.assertIn(("ab", "cd"), calls)
+        self.assertEqual(cb.foldl(concat, n_in=1, associative=True)("a"), "a")
+
+    def test_associative_executor(self):
+        n_in = 4 * CHUNK_SIZE + 3
+        items = [(i,) for i in range(n_in)]
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            foldl = cb.foldl(op.concat, n_in=n_in, associative=True, executor=executor)
+            self.assertEqual(foldl(*items), tuple(range(n_in)))
+
+    def test_unhashable_function(self):
+        class Add:
+            __hash__ = None
+
+            def __call__(self, a, b):
+                return a + b
+
+        self.assertEqual(cb.foldl(Add(), n_in=3)(1, 2, 3), 6)
+
+
 class AddTest(unittest.TestCase):
     def test_signature(self):
         add = cb.add()
@@ -458,3 +637,270 @@ class DivTest(unittest.TestCase):
         div = cb.div(n_in=2)
         with self.assertRaises(ValueError):
             div(1)
+
+
+class RepeatTest(unittest.TestCase):
+    def test_signature(self):
+        for body in [op.add, op.neg, cb.dup(), cb.select([0, 1, 1]), cb.drop()]:
+            for times in [0, 1, 3]:
+                with self.subTest(body=body, times=times):
+                    repeat = cb.repeat(body, times=times)
+                    serial = cb.serial(*[body] * times)
+                    self.assertEqual(repeat.signature, serial.signature)
+                    self.assertTrue(repeat.verified)
+
+    def test_repeat(self):
+        repeat = cb.repeat(cb.serial(cb.dup(), op.add), times=10)
+        self.assertEqual(repeat(1, 2), (1024, 2))
+
+    def test_many_times(self):
+        repeat = cb.repeat(op.neg, times=100001)
+        self.assertEqual(repeat(1), -1)
+
+    def test_less_input(self):
+        with self.assertRaises(ValueError):
+            cb.repeat(op.add, times=3)(1, 2, 3)
+
+    def test_negative_times(self):
+        with self.assertRaises(ValueError):
+            cb.repeat(op.add, times=-1)
+
+
+class WhileLoopTest(unittest.TestCase):
+    def test_while_loop(self):
+        def step(a: int, b: int) -> tuple[int, int]:
+            return b, a + b
+
+        while_loop = cb.while_loop(lambda a: a < 100, step)
+        self.assertEqual(while_loop.signature, Signature(n_in=2, n_out=2))
+        self.assertEqual(while_loop(0, 1, 5), (144, 233, 5))
+        self.assertEqual(while_loop(100, 1), (100, 1))
+
+    def test_less_input(self):
+        while_loop = cb.while_loop(lambda a, b: a < b, cb.identity(1))
+        with self.assertRaises(ValueError):
+            while_loop(1)
+
+    def test_stack_size_changed(self):
+        with self.assertRaises(ValueError):
+            cb.while_loop(bool, op.add)
+
+    def test_many_outputs_of_predicate(self):
+        with self.assertRaises(ValueError):
+            cb.while_loop(cb.dup(), op.neg)
+
+
+class ScanTest(unittest.TestCase):
+    def test_scan(self):
+        def cumsum(total: int, item: int) -> tuple[int, int]:
+            return total + item, total + item
+
+        scan = cb.scan(cumsum, n=3)
+        self.assertEqual(scan.signature, Signature(n_in=4, n_out=4))
+        self.assertEqual(scan(0, 1, 2, 3, 9), (6, 1, 3, 6, 9))
+
+    def test_without_carry(self):
+        self.assertEqual(cb.scan(op.neg, n=3)(1, 2, 3), (-1, -2, -3))
+
+    def test_empty(self):
+        self.assertEqual(cb.scan(cb.identity(2), n=0)(1, 2), (1, 2))
+
+    def test_less_input(self):
+        with self.assertRaises(ValueError):
+            cb.scan(op.neg, n=3)(1, 2)
+
+    def test_invalid_body(self):
+        with self.assertRaises(ValueError):
+            cb.scan(op.add, n=3)
+
+    def test_unverified_less_input(self):
+        class Step(cb.Combinator):
+            def __call__(self, total, item):
+                return total + item, total + item
+
+        scan = cb.scan(Step(signature=Signature(n_in=2, n_out=2)), n=4)
+        self.assertFalse(scan.verified)
+        self.assertEqual(scan(0, 1, 2, 3, 4), (10, 1, 3, 6, 10))
+        with self.assertRaises(ValueError):
+            scan(0, 1, 2)
+
+
+class SwitchTest(unittest.TestCase):
+    def test_switch(self):
+        def opcode(code: int, a: int, b: int) -> int:
+            return code
+
+        cases = [cb.serial(cb.drop(), f) for f in (op.add, op.sub, op.mul)]
+        switch = cb.switch(opcode, *cases)
+        self.assertEqual(switch.signature, Signature(n_in=3, n_out=1))
+        self.assertEqual([switch(i, 5, 3) for i in range(3)], [8, 2, 15])
+        self.assertEqual(switch(0, 5, 3, 9), (8, 9))
+
+    def test_only_selected_case_runs(self):
+        calls = []
+
+        def record(name):
+            def call(a):
+                calls.append(name)
+                return a
+
+            return call
+
+        switch = cb.switch(cb.identity(1), record("zero"), record("one"))
+        switch(1)
+        self.assertEqual(calls, ["one"])
+
+    def test_cases_with_less_input(self):
+        switch = cb.switch(lambda a, b: b, op.neg, cb.identity(2))
+        self.assertEqual(switch.signature, Signature(n_in=2, n_out=2))
+        self.assertEqual(switch(3, 0), (-3, 0))
+        self.assertEqual(switch(3, 1), (3, 1))
+
+    def test_incompatible_cases(self):
+        with self.assertRaisesRegex(ValueError, "change the size of the stack"):
+            cb.switch(cb.identity(1), op.add, op.neg)
+
+    def test_invalid_selector(self):
+        with self.assertRaises(ValueError):
+            cb.switch(cb.dup(), op.neg)
+        with self.assertRaises(ValueError):
+            cb.switch(cb.identity(1))
+
+    def test_index_out_of_range(self):
+        switch = cb.switch(cb.identity(1), op.neg, op.neg)
+        for index in (2, -1):
+            with self.subTest(index):
+                with self.assertRaisesRegex(ValueError, "has `2` cases"):
+                    switch(index)
+
+    def test_less_input(self):
+        with self.assertRaises(ValueError):
+            cb.switch(lambda a, b: 0, op.add)(1)
+
+    def test_composes(self):
+        cases = [cb.serial(cb.drop(), f) for f in (op.add, op.sub)]
+        serial = cb.serial(cb.switch(cb.identity(1), *cases), op.neg)
+        self.assertEqual(serial(1, 5, 3), -2)
+        self.assertTrue(serial.verified)
+
+    def test_cond(self):
+        absolute = cb.cond(lambda a: a < 0, op.neg, cb.identity(1))
+        self.assertEqual(absolute.signature, Signature(n_in=1, n_out=1))
+        self.assertEqual((absolute(-3), absolute(3)), (3, 3))
+        non_empty = cb.cond(len, cb.identity(1), cb.serial(cb.drop(), lambda: [0]))
+        self.assertEqual((non_empty([1]), non_empty([])), ([1], [0]))
+
+    def test_cond_invalid(self):
+        with self.assertRaises(ValueError):
+            cb.cond(cb.dup(), op.neg, op.neg)
+        with self.assertRaises(ValueError):
+            cb.cond(bool, op.neg, op.add)
+
+
+class MemoTest(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+
+    def func(self, a, b):
+        self.calls.append((a, b))
+        return a + b, a - b
+
+    def test_signature(self):
+        memo = cb.memo(op.add)
+        self.assertEqual(memo.signature, Signature(n_in=2, n_out=1))
+
+    def test_cached(self):
+        memo = cb.memo(cb.serial(op.add, op.neg))
+        self.assertEqual(memo(1, 2, 5), (-3, 5))
+        self.assertEqual(memo(1, 2, 6), (-3, 6))
+        self.assertEqual((memo.cache.hits, memo.cache.misses), (1, 1))
+
+    def test_multiple_outputs(self):
+        func = cb.serial(self.func)
+        memo = cb.memo(cb.parallel(func))
+        self.assertEqual(memo(3, 1), (4, 2))
+        self.assertEqual(memo(3, 1), (4, 2))
+        self.assertEqual(self.calls, [(3, 1)])
+
+    def test_maxsize(self):
+        memo = cb.memo(self.func, maxsize=2)
+        for a in [1, 2, 3]:
+            memo(a, 0)
+        self.assertEqual(len(memo.cache), 2)
+        self.assertEqual(memo(1, 0), (1, 1))
+
+    def test_recently_used_stays(self):
+        cache = cb.MemoCache(maxsize=2)
+        cache.put("old", (1,), cost=1.0, inputs=())
+        cache.put("used", (2,), cost=1.0, inputs=())
+        cache.get("old")
+        cache.put("new", (3,), cost=1.0, inputs=())
+        self.assertEqual(cache.get("old"), (1,))
+        self.assertIsNone(cache.get("used"))
+
+    def test_expensive_stays(self):
+        cache = cb.MemoCache(maxsize=2)
+        cache.put("expensive", (1,), cost=10.0, inputs=())
+        cache.put("cheap", (2,), cost=0.001, inputs=())
+        cache.put("new", (3,), cost=0.001, inputs=())
+        self.assertEqual(cache.get("expensive"), (1,))
+        self.assertIsNone(cache.get("cheap"))
+
+    def test_max_bytes(self):
+        cache = cb.MemoCache(maxsize=None, max_bytes=200)
+        cache.put("big", (b"x" * 1000,), cost=1.0, inputs=())
+        self.assertEqual(len(cache), 0)
+        for i in range(10):
+            cache.put(i, (i,), cost=1.0, inputs=())
+        self.assertLessEqual(cache.n_bytes, 200)
+        self.assertGreater(len(cache), 0)
+
+    def test_key(self):
+        memo = cb.memo(self.func, key=lambda a, b: a)
+        memo(1, 2)
+        self.assertEqual(memo(1, 3), (3, -1))
+        self.assertEqual(self.calls, [(1, 2)])
+
+    def test_unhashable(self):
+        memo = cb.memo(lambda a: a)
+        with self.assertRaises(TypeError):
+            memo([1])
+
+    def test_arrays_by_content(self):
+        memo = cb.memo(self.func)
+        memo(np.array([1, 2]), 0)
+        memo(np.array([1, 2]), 0)
+        memo(np.array([1, 3]), 0)
+        memo(np.array([1.0, 2.0]), 0)
+        self.assertEqual(len(self.calls), 3)
+
+    def test_array_keys_are_digests(self):
+        array = np.arange(100_000, dtype=np.float64).reshape(100, 1000)
+        key = make_key((array,))
+        self.assertLess(len(key[0][-1]), array.nbytes)
+        # Arrays that aren't contiguous are keyed by their elements in order.
+        self.assertEqual(make_key((np.asfortranarray(array),)), key)
+        self.assertEqual(make_key((array[:, ::2],)), make_key((array[:, ::2].copy(),)))
+
+    def test_arrays_by_identity(self):
+        memo = cb.memo(self.func, by_identity=True)
+        array = np.array([1, 2])
+        memo(array, 0)
+        memo(array, 0)
+        memo(np.array([1, 2]), 0)
+        self.assertEqual(len(self.calls), 2)
+
+    def test_error_not_cached(self):
+        memo = cb.memo(op.truediv)
+        for _ in range(2):
+            with self.assertRaises(ZeroDivisionError):
+                memo(1, 0)
+        self.assertEqual(len(memo.cache), 0)
+
+    def test_pickle(self):
+        memo = cb.memo(op.add, maxsize=3)
+        memo(1, 2)
+        restored = pickle.loads(pickle.dumps(memo))
+        self.assertEqual(len(restored.cache), 0)
+        self.assertEqual(restored.cache.maxsize, 3)
+        self.assertEqual(restored(1, 2), 3)
@@ -0,0 +1,155 @@
+from typing import Any
+import unittest
+import operator as op
+from dataclasses import replace
+from redex import combinator as cb
+from redex.compiler import compile, Compiled
+from redex.function import Signature
+
+
+class CompileTest(unittest.TestCase):
+    def test_signature(self):
+        compiled = compile(cb.serial(op.add, op.add))
+        self.assertEqual(compiled.signature, Signature(n_in=3, n_out=1))
+
+    def test_function(self):
+        compiled = compile(op.add)
+        self.assertEqual(compiled(1, 2), 1 + 2)
+
+    def test_serial(self):
+        compiled = compile(cb.serial(op.add, op.sub, op.add))
+        self.assertEqual(compiled(1, 2, 3, 4), ((1 + 2) - 3) + 4)
+
+    def test_parallel(self):
+        compiled = compile(cb.parallel(op.add, op.sub, op.neg))
+        self.assertEqual(compiled(1, 2, 3, 4, 5), (1 + 2, 3 - 4, -5))
+
+    def test_branch(self):
+        compiled = compile(cb.branch(cb.serial(op.add, op.add), op.add))
+        self.assertEqual(compiled(1, 2, 3), (1 + 2 + 3, 1 + 2))
+
+    def test_residual(self):
+        compiled = compile(cb.residual(op.add, op.sub))
+        self.assertEqual(compiled(1, 2, 3), ((1 + 2) - 3) + 1)
+
+    def test_select(self):
+        compiled = compile(cb.select(indices=[1, 0, 0]))
+        self.assertEqual(compiled(1, 2, 3), (2, 1, 1, 3))
+
+    def test_unused_inputs(self):
+        serial = replace(cb.serial(op.add), signature=Signature(n_in=3, n_out=2))
+        self.assertEqual(compile(serial)(1, 2, 3), serial(1, 2, 3))
+
+    def test_select_consume_less(self):
+        select = cb.select(indices=[2], n_in=1)
+        self.assertEqual(compile(select)(1, 2, 3, 4), select(1, 2, 3, 4))
+
+    def test_drop(self):
+        compiled = compile(cb.drop(n_in=2))
+        self.assertEqual(compiled(1, 2, 3), 3)
+
+    def test_dup(self):
+        compiled = compile(cb.dup(n_in=2))
+        self.assertEqual(compiled(1, 2, 3), (1, 2, 1, 2, 3))
+
+    def test_identity(self):
+        compiled = compile(cb.identity(n_in=2))
+        self.assertEqual(compiled(1, 2), (1, 2))
+
+    def test_foldl(self):
+        compiled = compile(cb.sub(n_in=4))
+        self.assertEqual(compiled(1, 2, 3, 4), 1 - 2 - 3 - 4)
+
+    def test_nested(self):
+        serial = cb.serial(
+            cb.branch(op.add, cb.serial(cb.dup(), op.mul)),
+            cb.parallel(op.neg, cb.identity()),
+            cb.add(n_in=3),
+        )
+        self.assertEqual(compile(serial)(1, 2, 3), serial(1, 2, 3))
+
+    def test_nested_compiled(self):
+        serial = cb.serial(compile(cb.serial(op.add, op.add)), op.neg)
+        self.assertEqual(compile(serial)(1, 2, 3), -(1 + 2 + 3))
+
+    def test_tuple_input(self):
+        def func(a: tuple[Any, tuple[Any, Any]], b: Any) -> Any:
+            x, (y, z) = a
+            return x - y - z - b
+
+        compiled = compile(cb.serial(func))
+        self.assertEqual(compiled(1, 2, 3, 4), 1 - 2 - 3 - 4)
+
+    def test_many_outputs(self):
+        def func(a: Any) -> tuple[Any, Any]:
+            return a, a + 1
+
+        compiled = compile(cb.serial(func, op.sub))
+        self.assertEqual(compiled(1), 1 - 2)
+
+    def test_without_any_output(self):
+        compiled = compile(cb.drop(n_in=2))
+        self.assertEqual(compiled(1, 2), ())
+
+    def test_extra_input(self):
+        compiled = compile(cb.serial(op.add))
+        self.assertEqual(compiled(1, 2, 3, 4), (1 + 2, 3, 4))
+
+    def test_less_input(self):
+        compiled = compile(cb.serial(op.add))
+        with self.assertRaises(ValueError):
+            compiled(1)
+
+    def test_less_nested_input(self):
+        with self.assertRaises(ValueError):
+            compile(cb.serial(cb.select(indices=[2], n_in=1)))
+
+    def test_source(self):
+        compiled = compile(cb.serial(cb.dup(), op.mul))
+        self.assertIsInstance(compiled, Compiled)
+        self.assertIn("def compiled_serial(", compiled.source)
+
+    def test_nested_outputs(self):
+        def func(a: Any) -> tuple[Any, tuple[Any, Any]]:
+            return a, (a + 1, a + 2)
+
+        compiled = compile(cb.serial(func, cb.sub(n_in=3)))
+        self.assertEqual(compiled(1), 1 - 2 - 3)
+
+    def test_flat_outputs(self):
+        def func(a: Any) -> tuple[Any, Any]:
+            return a, a + 1
+
+        compiled = compile(cb.serial(func, op.sub))
+        self.assertEqual(compiled(1), 1 - 2)
+
+    def test_lambda(self):
+        compiled = compile(lambda x: x + 1)
+        self.assertIn("def compiled__lambda_(", compiled.source)
+        self.assertEqual(compiled(1), 2)
+
+    def test_undeclared_tuple_output(self):
+        combinator = cb.serial(lambda x: ((x,),), op.neg)
+        self.assertEqual(compile(combinator)(1), combinator(1))
+
+    def test_undeclared_outputs(self):
+        def func(a):
+            return a, (a + 1, a + 2)
+
+        with self.assertRaises(ValueError):
+            compile(cb.serial(func, op.add))(1)
+        with self.assertRaises(ValueError):
+            compile(cb.serial(lambda x: (x, x + 1), op.add))(1, 10)
+
+    def test_unexpected_outputs(self):
+        def func(a: Any) -> tuple[Any, Any]:
+            return a, a, a
+
+        with self.assertRaises(ValueError):
+            compile(cb.serial(func))(1)
+
+    def test_deeply_nested(self):
+        combinator = cb.serial(op.neg)
+        for _ in range(3000):
+            combinator = cb.serial(combinator, cb.identity(n_in=1))
+        self.assertEqual(compile(combinator)(1), -1)
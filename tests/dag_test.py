@@ -0,0 +1,156 @@
+import time
+import threading
+import unittest
+from typing import Any
+import operator as op
+from dataclasses import replace
+from concurrent.futures import ThreadPoolExecutor
+from redex import combinator as cb
+from redex import observer as obs
+from redex.compiler import compile
+from redex.function import Signature
+from redex.executor import WarmProcessPool
+from redex.dag import lower, run
+
+
+def slow(x: int) -> int:
+    time.sleep(0.1)
+    return x + 1
+
+
+class LowerTest(unittest.TestCase):
+    def assertLowered(self, func, *inputs):
+        graph = lower(func)
+        self.assertEqual(graph(*inputs), func(*inputs))
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            self.assertEqual(replace(graph, executor=executor)(*inputs), func(*inputs))
+
+    def test_signature(self):
+        graph = lower(cb.serial(op.add, op.add))
+        self.assertEqual(graph.signature, Signature(n_in=3, n_out=1))
+
+    def test_function(self):
+        self.assertEqual(lower(op.add)(1, 2), 1 + 2)
+
+    def test_combinators(self):
+        combinators = {
+            "serial": (cb.serial(op.add, op.sub, op.add), (1, 2, 3, 4)),
+            "parallel": (cb.parallel(op.add, op.sub, op.neg), (1, 2, 3, 4, 5)),
+            "branch": (cb.branch(cb.serial(op.add, op.add), op.add), (1, 2, 3)),
+            "residual": (cb.residual(op.add, op.sub), (1, 2, 3)),
+            "select": (cb.select(indices=[1, 0, 0]), (1, 2, 3)),
+            "select_deeper": (cb.select(indices=[2], n_in=1), (1, 2, 3, 4)),
+            "drop": (cb.drop(n_in=2), (1, 2, 3)),
+            "dup": (cb.dup(n_in=2), (1, 2, 3)),
+            "identity": (cb.identity(n_in=2), (1, 2)),
+            "foldl": (cb.sub(n_in=4), (1, 2, 3, 4)),
+            "associative": (cb.foldl(op.concat, 5, associative=True), "abcde"),
+            "repeat": (cb.repeat(op.add, times=2), (1, 2, 3)),
+            "compiled": (compile(cb.serial(op.add, op.neg)), (1, 2)),
+        }
+        for name, (func, inputs) in combinators.items():
+            with self.subTest(name):
+                self.assertLowered(func, *inputs)
+
+    def test_unused_inputs(self):
+        serial = replace(cb.serial(op.add), signature=Signature(n_in=3, n_out=2))
+        self.assertLowered(serial, 1, 2, 3)
+
+    def test_rest_of_stack(self):
+        self.assertEqual(lower(cb.serial(op.add, op.neg))(1, 2, 3, 4), (-3, 3, 4))
+
+    def test_independent_calls(self):
+        serial = cb.serial(op.add, cb.select([1, 2, 0]), op.add, op.mul)
+        graph = lower(serial)
+        self.assertEqual([node.name for node in graph.nodes], ["add", "add", "mul"])
+        self.assertEqual(graph.n_dependencies, [0, 0, 2])
+        self.assertEqual(graph.dependents, [(2,), (2,), ()])
+        self.assertEqual((graph.work, graph.span), (3.0, 2.0))
+
+    def test_associative_foldl(self):
+        graph = lower(cb.foldl(op.add, 8, associative=True))
+        self.assertEqual(len(graph.nodes), 7)
+        self.assertEqual(graph.span, 3.0)
+        folded = lower(cb.foldl(op.concat, 3, associative=True))
+        self.assertEqual(folded((1,), (2,), (3,)), (1, 2, 3))
+
+    def test_deep_nesting(self):
+        func = op.neg
+        for _ in range(5000):
+            func = cb.serial(func, op.neg)
+        self.assertEqual(lower(func)(1), -1)
+
+    def test_insufficient_inputs(self):
+        with self.assertRaisesRegex(ValueError, "takes 2 positional arguments"):
+            lower(op.add)(1)
+
+    def test_undeclared_outputs(self):
+        def pair(x) -> Any:
+            return x, x
+
+        serial = cb.serial(replace(cb.serial(pair), signature=Signature(1, 1)))
+        with self.assertRaisesRegex(ValueError, "returned 2 outputs"):
+            lower(serial)(1)
+
+
+class RunTest(unittest.TestCase):
+    def test_concurrent(self):
+        serial = cb.serial(
+            slow, cb.select([1, 0]), slow, cb.select([1, 0]), slow, op.add
+        )
+        graph = lower(serial)
+        self.assertEqual(graph.span, 3.0)
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            start = time.perf_counter()
+            outputs = run(graph, (1, 2), executor)
+            elapsed = time.perf_counter() - start
+        self.assertEqual(outputs, (serial(1, 2),))
+        # Two chains of calls overlap.
+        self.assertLess(elapsed, 0.5)
+
+    def test_critical_path_first(self):
+        started = []
+        lock = threading.Lock()
+
+        def record(name):
+            def call(x):
+                with lock:
+                    started.append(name)
+                return x
+
+            call.__name__ = name
+            return call
+
+        chain = cb.serial(*[record("chain")] * 3)
+        serial = cb.serial(record("short"), cb.select([1, 0]), chain)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            run(lower(serial), (1, 2), executor)
+        self.assertEqual(started[0], "chain")
+
+    def test_error(self):
+        def fail(x):
+            raise KeyError(x)
+
+        graph = lower(cb.serial(fail, cb.select([1, 0]), slow))
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            with self.assertRaises(KeyError):
+                run(graph, (1, 2), executor)
+
+    def test_wrong_number_of_inputs(self):
+        with self.assertRaisesRegex(ValueError, "takes 2 inputs"):
+            run(lower(op.add), (1,))
+
+    def test_observed(self):
+        observer = obs.TimingObserver()
+        graph = lower(cb.serial(op.add, op.neg))
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            with obs.observing(observer):
+                run(graph, (1, 2), executor)
+        self.assertEqual(len(observer.counts), 2)
+
+    def test_process_pool(self):
+        branch = cb.branch(cb.serial(op.add, op.neg), op.sub)
+        with WarmProcessPool(max_workers=2) as pool:
+            pool.register(branch)
+            graph = lower(branch, executor=pool)
+            self.assertEqual(graph(3, 4), branch(3, 4))
@@ -0,0 +1,137 @@
+import os
+import pickle
+import unittest
+import operator as op
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from redex import combinator as cb
+from redex import observer as obs
+from redex.executor import walk, WarmProcessPool
+
+
+def pid(x):
+    return os.getpid()
+
+
+class WalkTest(unittest.TestCase):
+    def test_function(self):
+        self.assertEqual(walk(op.add), [op.add])
+
+    def test_combinator(self):
+        inner = cb.parallel(op.sub, op.neg)
+        combinator = cb.serial(op.add, inner)
+        self.assertEqual(walk(combinator), [combinator, op.add, inner, op.sub, op.neg])
+
+
+class WarmProcessPoolTest(unittest.TestCase):
+    def test_parallel(self):
+        with WarmProcessPool(max_workers=2) as pool:
+            parallel = cb.parallel(op.add, op.sub, op.neg, executor=pool)
+            pool.register(parallel)
+            self.assertEqual(parallel(1, 2, 3, 4, 5), (1 + 2, 3 - 4, -5))
+
+    def test_branch(self):
+        with WarmProcessPool(max_workers=2) as pool:
+            branch = cb.branch(op.add, cb.serial(op.sub, op.neg), executor=pool)
+            pool.register(branch).warm()
+            self.assertEqual(branch(1, 2), (1 + 2, -(1 - 2)))
+
+    def test_runs_in_workers(self):
+        with WarmProcessPool(max_workers=1) as pool:
+            branch = cb.branch(pid, pid, executor=pool)
+            pool.register(branch)
+            main, worker = branch(0)
+        self.assertEqual(main, os.getpid())
+        self.assertNotEqual(worker, os.getpid())
+
+    def test_unregistered(self):
+        with WarmProcessPool(max_workers=1) as pool:
+            parallel = cb.parallel(op.add, op.sub, executor=pool)
+            self.assertEqual(parallel(1, 2, 3, 4), (1 + 2, 3 - 4))
+
+    def test_nested(self):
+        with WarmProcessPool(max_workers=2) as pool:
+            inner = cb.parallel(op.add, op.neg, executor=pool)
+            outer = cb.parallel(op.neg, inner, executor=pool)
+            pool.register(outer)
+            self.assertEqual(outer(1, 2, 3, 4), (-1, 2 + 3, -4))
+
+    def test_register_after_start(self):
+        with WarmProcessPool(max_workers=1) as pool:
+            pool.warm()
+            with self.assertRaises(RuntimeError):
+                pool.register(op.add)
+
+    def test_error(self):
+        with WarmProcessPool(max_workers=1) as pool:
+            parallel = cb.parallel(op.add, op.truediv, executor=pool)
+            pool.register(parallel)
+            with self.assertRaises(ZeroDivisionError):
+                parallel(1, 2, 3, 0)
+
+
+class ObservedExecutorTest(unittest.TestCase):
+    def test_thread_calls_are_nested(self):
+        trace = obs.ChromeTraceObserver()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            parallel = cb.parallel(op.add, op.sub, executor=executor)
+            with obs.observing(trace):
+                parallel(1, 2, 3, 4)
+        paths = sorted(event["args"]["path"] for event in trace.events)
+        self.assertEqual(paths, ["Parallel", "Parallel/0:add", "Parallel/1:sub"])
+
+
+def total(array):
+    return float(array.sum())
+
+
+def is_writeable(array):
+    return array.flags.writeable
+
+
+def increment(array):
+    array += 1
+    return array
+
+
+class SharedMemoryTest(unittest.TestCase):
+    def test_shared_arrays(self):
+        array = np.arange(1 << 16, dtype=np.float64)
+        with WarmProcessPool(max_workers=2, shared_memory_threshold=1024) as pool:
+            branch = cb.branch(total, is_writeable, is_writeable, executor=pool)
+            pool.register(branch)
+            self.assertEqual(branch(array), (float(array.sum()), False, False))
+
+    def test_small_arrays_copied(self):
+        array = np.arange(4)
+        with WarmProcessPool(max_workers=1, shared_memory_threshold=1024) as pool:
+            branch = cb.branch(is_writeable, is_writeable, executor=pool)
+            self.assertEqual(branch(array), (True, True))
+
+    def test_read_only(self):
+        array = np.zeros(1024)
+        with WarmProcessPool(max_workers=1, shared_memory_threshold=1024) as pool:
+            branch = cb.branch(total, increment, executor=pool)
+            pool.register(branch)
+            with self.assertRaises(ValueError):
+                branch(array)
+        self.assertEqual(array.sum(), 0)
+
+    def test_outputs(self):
+        array = np.ones(1024)
+        with WarmProcessPool(max_workers=1, shared_memory_threshold=1024) as pool:
+            branch = cb.branch(total, cb.identity(1), executor=pool)
+            pool.register(branch)
+            _, output = branch(array)
+        np.testing.assert_array_equal(output, array)
+
+    @unittest.skipUnless(os.path.isdir("/dev/shm"), "shared memory isn't listed")
+    def test_released(self):
+        array = np.ones(1024)
+        before = set(os.listdir("/dev/shm"))
+        with WarmProcessPool(max_workers=2, shared_memory_threshold=1024) as pool:
+            branch = cb.branch(total, total, total, executor=pool)
+            pool.register(branch)
+            for _ in range(3):
+                branch(array)
+        self.assertEqual(set(os.listdir("/dev/shm")) - before, set())
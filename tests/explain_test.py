@@ -0,0 +1,105 @@
+import unittest
+import operator as op
+from redex import function as fn
+from redex import combinator as cb
+from redex import observer as obs
+from redex.explain import explain, ALLOCATION_COST, FUNCTION_COST
+
+
+class ExplainTest(unittest.TestCase):
+    def test_function(self):
+        explanation = explain(op.add)
+        self.assertEqual(explanation.n_nodes, 1)
+        self.assertEqual(explanation.depth, 1)
+        self.assertEqual(explanation.stack_height, 2)
+        self.assertEqual(explanation.allocations, 0)
+        self.assertEqual(explanation.cost, FUNCTION_COST)
+
+    def test_nodes(self):
+        serial = cb.serial(op.add, cb.parallel(op.neg, cb.dup()))
+        explanation = explain(serial)
+        self.assertEqual(
+            [node.path for node in explanation.nodes],
+            [
+                ("Serial",),
+                ("Serial", "0:add"),
+                ("Serial", "1:Parallel"),
+                ("Serial", "1:Parallel", "0:neg"),
+                ("Serial", "1:Parallel", "1:Dup"),
+            ],
+        )
+        self.assertEqual(explanation.depth, 3)
+        signatures = [node.signature for node in explanation.nodes]
+        self.assertEqual(signatures[2], serial.children_signatures[1])
+
+    def test_stack_height(self):
+        self.assertEqual(explain(cb.serial(cb.dup(), cb.dup(), op.add)).stack_height, 3)
+        self.assertEqual(explain(cb.branch(op.neg, op.neg, op.neg)).stack_height, 3)
+        self.assertEqual(explain(cb.repeat(cb.dup(), times=3)).stack_height, 4)
+        self.assertEqual(explain(cb.serial(cb.drop(), cb.drop())).stack_height, 2)
+
+    def test_cost(self):
+        @fn.cost(10.0)
+        def solve(x):
+            return x
+
+        serial = cb.serial(solve, op.neg)
+        explanation = explain(serial)
+        self.assertEqual(explanation.allocations, 8)
+        self.assertEqual(explanation.cost, 10.0 + FUNCTION_COST + 8 * ALLOCATION_COST)
+        path = [node.path[-1] for node in explanation.critical_path]
+        self.assertEqual(path, ["Serial", "0:solve"])
+
+    def test_repetitions(self):
+        explanation = explain(cb.repeat(op.neg, times=5))
+        body = explanation.nodes[1]
+        self.assertEqual(body.repetitions, 5)
+        self.assertEqual(explanation.cost, 5 * FUNCTION_COST + 5 * ALLOCATION_COST)
+
+    def test_switch(self):
+        @fn.cost(10.0)
+        def expensive(a):
+            return a
+
+        explanation = explain(cb.switch(cb.identity(1), op.neg, expensive, op.neg))
+        self.assertEqual(explanation.n_nodes, 5)
+        self.assertEqual(explanation.allocations, 8)
+        self.assertEqual(explanation.cost, 10.0 + 8 * ALLOCATION_COST)
+        self.assertEqual(explanation.critical_path[-1].path[-1], "2:expensive")
+
+    def test_foldl(self):
+        explanation = explain(cb.add(n_in=5))
+        self.assertEqual(explanation.cost, 4 * FUNCTION_COST + 2 * ALLOCATION_COST)
+
+    def test_timings(self):
+        serial = cb.serial(op.neg, cb.repeat(op.neg, times=2))
+        timings = {
+            ("Serial",): 1.0,
+            ("Serial", "0:neg"): 0.1,
+            ("Serial", "1:Repeat"): 0.8,
+            ("Serial", "1:Repeat", "0:neg"): 0.3,
+            ("Serial", "1:Repeat", "1:neg"): 0.4,
+        }
+        explanation = explain(serial, timings)
+        self.assertAlmostEqual(explanation.nodes[-1].time, 0.7)
+        path = [node.path[-1] for node in explanation.critical_path]
+        self.assertEqual(path, ["Serial", "1:Repeat", "0:neg"])
+
+    def test_observed_timings(self):
+        serial = cb.branch(op.add, cb.serial(op.mul, op.neg))
+        timing = obs.TimingObserver()
+        with obs.observing(timing):
+            serial(1, 2)
+        explanation = explain(serial, timing.durations)
+        self.assertTrue(all(node.time is not None for node in explanation.nodes))
+
+    def test_deep_nesting(self):
+        func = op.neg
+        for _ in range(3000):
+            func = cb.serial(func, op.neg)
+        self.assertEqual(explain(func).depth, 3001)
+
+    def test_format(self):
+        text = str(explain(cb.residual(op.neg)))
+        self.assertIn("critical path: Serial > 0:Serial", text)
+        self.assertIn("      0:neg", text)
@@ -0,0 +1,117 @@
+import sys
+import tempfile
+import unittest
+import functools
+import subprocess
+import operator as op
+from pathlib import Path
+from redex import combinator as cb
+from redex.function import Signature
+from redex.version import __version__
+from redex.export import export, fingerprint, load, PlanCache
+
+
+class ExportTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = Path(self.directory.name, "plan.py")
+
+    def test_export(self):
+        serial = cb.serial(cb.dup(), op.mul, op.add)
+        export(serial, self.path)
+        plan = load(self.path)
+        self.assertEqual(plan(3, 1, 5), serial(3, 1, 5))
+        self.assertEqual(plan.signature, Signature(n_in=2, n_out=1))
+        self.assertEqual(plan.fingerprint, fingerprint(serial))
+
+    def test_functions_imported(self):
+        export(cb.serial(op.add, cb.foldl(op.mul, 3)), self.path)
+        source = self.path.read_text(encoding="utf-8")
+        self.assertIn("from _operator import add as _f0", source)
+        self.assertNotIn("_serialize.loads", source)
+
+    def test_functions_serialized(self):
+        serial = cb.serial(functools.partial(op.add, 1), cb.memo(op.neg))
+        export(serial, self.path)
+        self.assertEqual(load(self.path)(2), serial(2))
+
+    def test_checks_inputs(self):
+        export(cb.serial(op.add), self.path)
+        with self.assertRaisesRegex(ValueError, "takes 2 positional arguments"):
+            load(self.path)(1)
+
+    def test_standalone(self):
+        export(cb.residual(op.neg), self.path)
+        script = f"from redex.export import load; print(load({str(self.path)!r})(2))"
+        output = subprocess.run(
+            [sys.executable, "-c", script], capture_output=True, check=True, text=True
+        )
+        self.assertEqual(output.stdout, "0\n")
+
+    def test_other_version(self):
+        export(cb.serial(op.add), self.path)
+        source = self.path.read_text(encoding="utf-8")
+        self.path.write_text(source.replace(repr(__version__), "'0.0.0'"))
+        with self.assertRaisesRegex(ValueError, "exported by redex `0.0.0`"):
+            load(self.path)
+
+    def test_other_version_not_executed(self):
+        export(cb.serial(op.add), self.path)
+        source = self.path.read_text(encoding="utf-8")
+        source = source.replace(repr(__version__), "'0.0.0'")
+        self.path.write_text("from redex.util import _missing\n" + source)
+        with self.assertRaisesRegex(ValueError, "exported by redex `0.0.0`"):
+            load(self.path)
+
+    def test_fingerprint(self):
+        serial = cb.serial(op.add, op.neg)
+        self.assertEqual(fingerprint(serial), fingerprint(cb.serial(op.add, op.neg)))
+        self.assertNotEqual(fingerprint(serial), fingerprint(cb.serial(op.sub, op.neg)))
+
+
+class PlanCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_builds_once(self):
+        builds = []
+
+        def build():
+            builds.append(None)
+            return cb.serial(op.add, op.neg)
+
+        plan = PlanCache(self.directory.name).load("model", build)
+        cached = PlanCache(self.directory.name).load("model", build)
+        self.assertEqual(len(builds), 1)
+        self.assertEqual((plan(1, 2), cached(1, 2)), (-3, -3))
+
+    def test_keys(self):
+        cache = PlanCache(self.directory.name)
+        add = cache.load("add", lambda: cb.serial(op.add))
+        sub = cache.load("sub", lambda: cb.serial(op.sub))
+        self.assertEqual((add(3, 1), sub(3, 1)), (4, 2))
+        self.assertNotEqual(cache.path("add"), cache.path("sub"))
+
+    def test_other_version_replaced(self):
+        cache = PlanCache(self.directory.name)
+        cache.load("add", lambda: cb.serial(op.add))
+        path = cache.path("add")
+        source = path.read_text(encoding="utf-8")
+        path.write_text(source.replace(repr(__version__), "'0.0.0'"))
+        self.assertEqual(cache.load("add", lambda: cb.serial(op.sub))(3, 1), 2)
+
+    def test_missing_import_replaced(self):
+        cache = PlanCache(self.directory.name)
+        cache.load("add", lambda: cb.serial(op.add))
+        path = cache.path("add")
+        source = path.read_text(encoding="utf-8")
+        path.write_text("from redex.util import _missing\n" + source)
+        self.assertEqual(cache.load("add", lambda: cb.serial(op.sub))(3, 1), 2)
+
+    def test_plan(self):
+        cache = PlanCache(self.directory.name)
+        plan = cache.plan(cb.serial(op.add, op.neg))
+        self.assertEqual(cache.plan(cb.serial(op.add, op.neg)).path, plan.path)
+        self.assertEqual(plan(1, 2), -3)
@@ -1,9 +1,13 @@
 from typing import Any, NoReturn
+import math
+import pickle
 import inspect
+import dataclasses
 import functools
 import unittest
 import operator as op
 from redex.function import infer_signature, infer_name, FineCallable, Signature
+from redex.function import intern_signature, cost, infer_cost
 from redex.function import _count_outputs, _infer_input_shape
 
 
@@ -84,13 +88,28 @@ class InferSignatureTest(unittest.TestCase):
         def func() -> tuple[Any]:
             pass
 
-        self.assertEqual(infer_signature(func=func), Signature(n_in=0, n_out=1))
+        self.assertEqual(
+            infer_signature(func=func),
+            Signature(n_in=0, n_out=1, out_shape=((),)),
+        )
 
     def test_tuple_many_outputs(self):
         def func() -> tuple[Any, Any]:
             pass
 
-        self.assertEqual(infer_signature(func=func), Signature(n_in=0, n_out=2))
+        self.assertEqual(
+            infer_signature(func=func),
+            Signature(n_in=0, n_out=2, out_shape=((), ())),
+        )
+
+    def test_tuple_nested_outputs(self):
+        def func() -> tuple[Any, tuple[Any, Any]]:
+            pass
+
+        self.assertEqual(
+            infer_signature(func=func),
+            Signature(n_in=0, n_out=3, out_shape=((), ((), ()))),
+        )
 
     def test_variadic_tuple_output(self):
         def func() -> tuple[Any, ...]:
@@ -117,6 +136,119 @@ class InferSignatureTest(unittest.TestCase):
         self.assertEqual(infer_signature(func=op.add), Signature(n_in=2, n_out=1))
 
 
+class SignatureTest(unittest.TestCase):
+    def test_signature_is_slotted(self):
+        self.assertFalse(hasattr(Signature(n_in=2, n_out=1), "__dict__"))
+
+    def test_intern_signature(self):
+        signature = intern_signature(Signature(n_in=2, n_out=1, start_index=3))
+        self.assertIs(
+            intern_signature(Signature(n_in=2, n_out=1, start_index=3)), signature
+        )
+        self.assertIsNot(intern_signature(Signature(n_in=2, n_out=1)), signature)
+
+    def test_shared_input_shape(self):
+        self.assertIs(
+            Signature(n_in=3, n_out=1).in_shape, Signature(n_in=3, n_out=2).in_shape
+        )
+
+
+class SignatureCacheTest(unittest.TestCase):
+    def test_builtin_signature(self):
+        self.assertEqual(infer_signature(func=max), Signature(n_in=2, n_out=1))
+        self.assertEqual(infer_signature(func=divmod), Signature(n_in=2, n_out=2))
+        self.assertEqual(infer_signature(func=math.log), Signature(n_in=1, n_out=1))
+
+    def test_plans(self):
+        self.assertIsNone(Signature(n_in=2, n_out=1).reshape_plan)
+        self.assertIsNone(Signature(n_in=0, n_out=2, out_shape=((), ())).flatten_plan)
+        signature = Signature(
+            n_in=3, n_out=3, in_shape=(((), ()), ()), out_shape=(((), ()), ())
+        )
+        self.assertEqual(signature.reshape_plan((1, 2, 3)), ((1, 2), 3))
+        self.assertEqual(signature.flatten_plan(((1, 2), 3)), (1, 2, 3))
+
+    def test_pickle(self):
+        signature = Signature(n_in=3, n_out=1, in_shape=(((), ()), ()))
+        restored = pickle.loads(pickle.dumps(signature))
+        self.assertEqual(restored, signature)
+        self.assertEqual(restored.reshape_plan((1, 2, 3)), ((1, 2), 3))
+
+    def test_shared_signature_is_immutable(self):
+        signature = infer_signature(func=op.add)
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            signature.start_index = 2
+        self.assertEqual(infer_signature(func=op.sub).start_index, 0)
+
+    def test_function(self):
+        def func(a: int, b: int) -> int:
+            pass
+
+        self.assertIs(infer_signature(func=func), infer_signature(func=func))
+        self.assertEqual(infer_signature(func=func), Signature(n_in=2, n_out=1))
+
+    def test_method(self):
+        class A:
+            def a(self, b: int) -> tuple[int, int]:
+                pass
+
+        self.assertIs(infer_signature(func=A().a), infer_signature(func=A().a))
+        self.assertEqual(
+            infer_signature(func=A().a),
+            Signature(n_in=1, n_out=2, out_shape=((), ())),
+        )
+
+    def test_partial(self):
+        def func(a: int, b: int, c: int) -> None:
+            pass
+
+        self.assertEqual(
+            infer_signature(func=functools.partial(func, 1)),
+            Signature(n_in=2, n_out=0),
+        )
+        self.assertEqual(
+            infer_signature(func=functools.partial(func, 1, 2)),
+            Signature(n_in=1, n_out=0),
+        )
+        self.assertEqual(
+            infer_signature(func=functools.partial(func, c=1)),
+            Signature(n_in=2, n_out=0),
+        )
+
+    def test_callable_object(self):
+        class A:
+            def __call__(self, a: int) -> None:
+                pass
+
+        self.assertIs(infer_signature(func=A()), infer_signature(func=A()))
+        self.assertEqual(infer_signature(func=A()), Signature(n_in=1, n_out=0))
+
+    def test_class(self):
+        class A:
+            def __init__(self, a: int):
+                pass
+
+            def __call__(self) -> None:
+                pass
+
+        self.assertEqual(infer_signature(func=A), Signature(n_in=1, n_out=1))
+        self.assertEqual(infer_signature(func=A(1)), Signature(n_in=0, n_out=0))
+
+    def test_bound_builtin_method(self):
+        self.assertEqual(infer_signature(func=[].append), Signature(n_in=1, n_out=1))
+        self.assertEqual(infer_signature(func={}.get), Signature(n_in=1, n_out=1))
+
+
+class CostTest(unittest.TestCase):
+    def test_cost(self):
+        @cost(2)
+        def double(x):
+            return x * 2
+
+        self.assertEqual(infer_cost(double), 2.0)
+        self.assertIsNone(infer_cost(op.add))
+
+
 class CountOutputsTest(unittest.TestCase):
     def test(self):
         self.assertEqual(_count_outputs(func=op.add), 1)
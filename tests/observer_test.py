@@ -0,0 +1,307 @@
+import io
+import os
+import tempfile
+import urllib.request
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+import json
+import logging
+import unittest
+from unittest import mock
+import tracemalloc
+import operator as op
+import numpy as np
+from redex import combinator as cb
+from redex import observer as obs
+
+
+class Recorder(obs.Observer):
+    def __init__(self):
+        self.calls = []
+
+    def before(self, event):
+        self.calls.append(("before", event.path, event.stack_size))
+
+    def after(self, event):
+        self.calls.append(("after", event.path, event.duration is not None))
+
+
+class ObserverTest(unittest.TestCase):
+    def test_without_any_observer(self):
+        self.assertEqual(obs.OBSERVERS, [])
+        self.assertEqual(cb.serial(op.add, op.neg)(1, 2), -3)
+
+    def test_paths(self):
+        recorder = Recorder()
+        serial = cb.serial(cb.parallel(op.add, op.neg), op.sub)
+        with obs.observing(recorder):
+            self.assertEqual(serial(1, 2, 3), 1 + 2 - (-3))
+        self.assertEqual(
+            recorder.calls,
+            [
+                ("before", ("Serial",), 3),
+                ("before", ("Serial", "0:Parallel"), 3),
+                ("before", ("Serial", "0:Parallel", "0:add"), 2),
+                ("after", ("Serial", "0:Parallel", "0:add"), True),
+                ("before", ("Serial", "0:Parallel", "1:neg"), 1),
+                ("after", ("Serial", "0:Parallel", "1:neg"), True),
+                ("after", ("Serial", "0:Parallel"), True),
+                ("before", ("Serial", "1:sub"), 2),
+                ("after", ("Serial", "1:sub"), True),
+                ("after", ("Serial",), True),
+            ],
+        )
+
+    def test_repeated_calls(self):
+        recorder = Recorder()
+        serial = cb.serial(op.neg)
+        with obs.observing(recorder):
+            serial(1)
+            serial(1)
+        self.assertEqual(recorder.calls[0], recorder.calls[4])
+
+    def test_error(self):
+        events = []
+
+        class A(obs.Observer):
+            def after(self, event):
+                events.append(event)
+
+        with obs.observing(A()):
+            with self.assertRaises(ZeroDivisionError):
+                cb.serial(op.truediv)(1, 0)
+        self.assertIsInstance(events[0].error, ZeroDivisionError)
+        self.assertIsInstance(events[1].error, ZeroDivisionError)
+        self.assertFalse(obs.is_observing())
+
+    def test_install(self):
+        recorder = Recorder()
+        obs.install(recorder)
+        try:
+            cb.serial(op.neg)(1)
+        finally:
+            obs.uninstall(recorder)
+        self.assertEqual(len(recorder.calls), 4)
+        self.assertEqual(obs.OBSERVERS, [])
+
+
+class TimingObserverTest(unittest.TestCase):
+    def test_durations(self):
+        timing = obs.TimingObserver()
+        serial = cb.serial(op.neg, op.neg)
+        with obs.observing(timing):
+            serial(1)
+            serial(1)
+        self.assertEqual(
+            timing.counts,
+            {("Serial",): 2, ("Serial", "0:neg"): 2, ("Serial", "1:neg"): 2},
+        )
+        self.assertGreater(timing.durations[("Serial",)], 0.0)
+        self.assertGreaterEqual(
+            timing.durations[("Serial",)], timing.durations[("Serial", "0:neg")]
+        )
+
+
+class ChromeTraceObserverTest(unittest.TestCase):
+    def test_events(self):
+        trace = obs.ChromeTraceObserver()
+        with obs.observing(trace):
+            cb.branch(op.add, op.sub)(1, 2)
+        names = [event["name"] for event in trace.events]
+        self.assertEqual(names, ["Select", "add", "sub", "Parallel", "Serial"])
+        self.assertEqual(trace.events[1]["args"]["path"], "Serial/1:Parallel/0:add")
+        self.assertTrue(all(event["ph"] == "X" for event in trace.events))
+
+    def test_max_events(self):
+        trace = obs.ChromeTraceObserver(max_events=2)
+        with obs.observing(trace):
+            cb.serial(op.neg, op.neg, op.neg)(1)
+        self.assertEqual(len(trace.events), 2)
+
+    def test_dump(self):
+        trace = obs.ChromeTraceObserver()
+        with obs.observing(trace):
+            cb.serial(op.neg)(1)
+        file = io.StringIO()
+        trace.dump(file)
+        self.assertEqual(json.loads(file.getvalue())["traceEvents"], trace.events)
+
+
+class LoggingObserverTest(unittest.TestCase):
+    def test_log(self):
+        with self.assertLogs(level=logging.DEBUG) as logs:
+            with obs.observing(obs.LoggingObserver()):
+                cb.serial(op.neg)(1)
+        self.assertEqual(len(logs.output), 2)
+
+
+class MemoryObserverTest(unittest.TestCase):
+    def observe(self, func, *inputs):
+        memory = obs.MemoryObserver()
+        self.addCleanup(memory.stop)
+        with obs.observing(memory):
+            func(*inputs)
+        memory.stop()
+        self.assertFalse(tracemalloc.is_tracing())
+        return memory
+
+    def test_retained(self):
+        array = np.ones(100_000)
+        memory = self.observe(cb.serial(cb.dup(), op.add, op.neg), array)
+        path, stats = memory.ranking(limit=1)[0]
+        self.assertEqual(path, "Serial/1:add")
+        self.assertGreaterEqual(stats.own_retained, array.nbytes)
+        root = memory.stats[("Serial",)]
+        self.assertGreaterEqual(root.retained, array.nbytes)
+        self.assertLess(root.own_retained, array.nbytes)
+        self.assertGreaterEqual(root.peak, array.nbytes)
+
+    def test_stack_values(self):
+        array = np.ones(1000)
+        memory = self.observe(cb.serial(cb.dup(), op.add), array)
+        self.assertEqual(memory.peak_stack_values, 1)
+        self.assertEqual(memory.peak_stack_bytes, array.nbytes)
+        memory = self.observe(cb.parallel(op.neg, op.neg), array, array * 2)
+        self.assertEqual(memory.peak_stack_values, 2)
+
+    def test_calls(self):
+        memory = self.observe(cb.repeat(op.neg, times=3), 1)
+        self.assertEqual(memory.stats[("Repeat", "0:neg")].calls, 1)
+        self.assertEqual(len(memory.stats), 4)
+
+    def test_tracing_kept(self):
+        tracemalloc.start()
+        self.addCleanup(tracemalloc.stop)
+        memory = obs.MemoryObserver()
+        with obs.observing(memory):
+            cb.serial(op.neg)(1)
+        memory.stop()
+        self.assertTrue(tracemalloc.is_tracing())
+
+    def test_report(self):
+        memory = self.observe(cb.serial(op.add, op.neg), 1, 2)
+        report = memory.report(limit=2)
+        # Inputs of the serial combinator are alive while `neg` is called.
+        self.assertIn("peak stack values: 3", report)
+        self.assertEqual(len(report.splitlines()), 4)
+
+
+class LatencyHistogramTest(unittest.TestCase):
+    def test_quantiles(self):
+        histogram = obs.LatencyHistogram()
+        self.assertIsNone(histogram.quantile(0.5))
+        for duration in [1e-4] * 980 + [1e-2] * 19 + [1.0]:
+            histogram.add(duration)
+        self.assertEqual(histogram.count, 1000)
+        for q, expected in [(0.5, 1e-4), (0.99, 1e-2), (0.999, 1e-2), (1.0, 1.0)]:
+            with self.subTest(q):
+                estimate = histogram.quantile(q)
+                self.assertGreaterEqual(estimate, expected)
+                self.assertLess(estimate, expected * 2**0.5)
+
+    def test_bounds(self):
+        histogram = obs.LatencyHistogram()
+        histogram.add(0.0)
+        histogram.add(1e6)
+        self.assertEqual(histogram.counts[0], 1)
+        self.assertEqual(histogram.counts[-1], 1)
+        self.assertEqual(histogram.quantile(1.0), float("inf"))
+
+
+class MetricsObserverTest(unittest.TestCase):
+    def test_counts(self):
+        metrics = obs.MetricsObserver()
+        serial = cb.serial(op.add, op.truediv)
+        with obs.observing(metrics):
+            serial(1, 2, 3)
+            with self.assertRaises(ZeroDivisionError):
+                serial(1, 2, 0)
+        summary = metrics.as_dict()
+        self.assertEqual(summary["Serial"]["calls"], 2)
+        self.assertEqual(summary["Serial"]["errors"], 1)
+        self.assertEqual(summary["Serial/1:truediv"]["errors"], 1)
+        self.assertEqual(summary["Serial/0:add"]["errors"], 0)
+        self.assertEqual(summary["Serial/0:add"]["sampled"], 2)
+        self.assertGreater(summary["Serial"]["p50"], 0.0)
+
+    def test_sampling(self):
+        metrics = obs.MetricsObserver(sample_rate=0.1)
+        serial = cb.serial(op.add, op.neg)
+        with obs.observing(metrics):
+            for _ in range(100):
+                serial(1, 2)
+        summary = metrics.as_dict()
+        self.assertEqual(summary["Serial"]["calls"], 100)
+        self.assertEqual(summary["Serial"]["sampled"], 10)
+        self.assertEqual(summary["Serial/1:neg"]["calls"], 10)
+        self.assertEqual(summary["Serial/1:neg"]["sampled"], 10)
+
+    def test_unsampled_calls_not_observed(self):
+        metrics = obs.MetricsObserver(sample_rate=0.0)
+        serial = cb.serial(op.add, cb.serial(op.neg))
+        with obs.observing(metrics):
+            with mock.patch("redex.observer.Event", wraps=obs.Event) as event:
+                serial(1, 2)
+        self.assertEqual(event.call_count, 1)
+        self.assertEqual(list(metrics.as_dict()), ["Serial"])
+
+    def test_other_observers(self):
+        metrics = obs.MetricsObserver(sample_rate=0.0)
+        timing = obs.TimingObserver()
+        with obs.observing(metrics, timing):
+            cb.serial(op.add, op.neg)(1, 2)
+        self.assertEqual(list(metrics.as_dict()), ["Serial"])
+        self.assertEqual(len(timing.counts), 3)
+
+    def test_no_sampling(self):
+        metrics = obs.MetricsObserver(sample_rate=0.0)
+        with obs.observing(metrics):
+            cb.serial(op.neg)(1)
+        self.assertIsNone(metrics.as_dict()["Serial"]["p99"])
+        with self.assertRaises(ValueError):
+            obs.MetricsObserver(sample_rate=2.0)
+
+    def test_threads(self):
+        metrics = obs.MetricsObserver(sample_rate=0.5)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            parallel = cb.parallel(op.neg, op.neg, executor=executor)
+            with obs.observing(metrics):
+                for _ in range(4):
+                    parallel(1, 2)
+        summary = metrics.as_dict()
+        self.assertEqual(summary["Parallel"]["calls"], 4)
+        self.assertEqual(summary["Parallel/1:neg"]["calls"], 2)
+        self.assertEqual(summary["Parallel/1:neg"]["sampled"], 2)
+
+    def test_prometheus(self):
+        metrics = obs.MetricsObserver()
+        with obs.observing(metrics):
+            cb.serial(op.neg)(1)
+        text = metrics.prometheus()
+        self.assertIn('redex_calls_total{path="Serial/0:neg"} 1', text)
+        self.assertIn("# TYPE redex_call_duration_seconds histogram", text)
+        self.assertIn(
+            'redex_call_duration_seconds_bucket{path="Serial",le="+Inf"} 1', text
+        )
+        self.assertIn('redex_call_duration_seconds_count{path="Serial"} 1', text)
+
+    def test_write_prometheus(self):
+        metrics = obs.MetricsObserver()
+        with obs.observing(metrics):
+            cb.serial(op.neg)(1)
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory, "redex.prom")
+            metrics.write_prometheus(path)
+            self.assertEqual(path.read_text(encoding="utf-8"), metrics.prometheus())
+            self.assertEqual(os.listdir(directory), ["redex.prom"])
+
+    def test_serve_prometheus(self):
+        metrics = obs.MetricsObserver()
+        with obs.observing(metrics):
+            cb.serial(op.neg)(1)
+        server = metrics.serve_prometheus(port=0)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        port = server.server_address[1]
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+            self.assertEqual(response.read().decode(), metrics.prometheus())
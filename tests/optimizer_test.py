@@ -0,0 +1,178 @@
+import unittest
+import operator as op
+from redex import combinator as cb
+from redex import function as fn
+from redex.compiler import compile
+from redex.optimizer import optimize
+
+
+class OptimizeTest(unittest.TestCase):
+    def assertOptimized(self, func, *inputs):
+        optimized = optimize(func)
+        self.assertEqual(optimized.signature, func.signature)
+        self.assertEqual(optimized(*inputs), func(*inputs))
+        self.assertEqual(compile(optimized)(*inputs), func(*inputs))
+        # The rest of the stack is passed through.
+        self.assertEqual(optimized(*inputs, "rest"), func(*inputs, "rest"))
+        return optimized
+
+    def test_function(self):
+        self.assertIs(optimize(op.add), op.add)
+
+    def test_single_function(self):
+        serial = cb.serial(op.neg)
+        optimized = self.assertOptimized(serial, 3)
+        self.assertEqual(optimized(3, 6), (-3, 6))
+        self.assertIsInstance(optimize(cb.serial(cb.serial(op.neg))), cb.Serial)
+
+    def test_shuffles(self):
+        serial = cb.serial(cb.dup(), cb.select([2, 0, 1]), cb.identity(), cb.drop())
+        optimized = self.assertOptimized(serial, 1, 2)
+        self.assertIsInstance(optimized, cb.Select)
+        self.assertEqual(optimized.indices, [0, 0])
+
+    def test_identity(self):
+        serial = cb.serial(cb.dup(), cb.drop(), cb.identity(n_in=2))
+        optimized = self.assertOptimized(serial, 1, 2)
+        self.assertIsInstance(optimized, cb.Identity)
+
+    def test_select_beyond_inputs(self):
+        select = cb.select([2], n_in=1)
+        self.assertIs(optimize(cb.serial(select)), select)
+        serial = cb.serial(select, cb.select([1, 0]))
+        self.assertIs(optimize(serial).children[0], select)
+
+    def test_nested_serial(self):
+        serial = cb.serial(cb.serial(cb.dup(), cb.serial(op.mul)), op.neg)
+        optimized = self.assertOptimized(serial, 3)
+        self.assertIsInstance(optimized, cb.Serial)
+        self.assertEqual(len(optimized.children), 3)
+
+    def test_branch(self):
+        branch = cb.branch(cb.identity(), cb.select([0, 0]), op.add)
+        optimized = self.assertOptimized(branch, 1, 2)
+        self.assertIsInstance(optimized, cb.Serial)
+        self.assertEqual(len(optimized.children), 2)
+
+    def test_residual(self):
+        residual = cb.residual(op.add, op.neg)
+        optimized = self.assertOptimized(residual, 1, 2)
+        self.assertNotIn(cb.Identity, map(type, optimized.children))
+
+    def test_parallel_shuffles(self):
+        parallel = cb.parallel(cb.dup(), cb.drop(), cb.select([1, 0]))
+        optimized = self.assertOptimized(parallel, 1, 2, 3, 4, 5)
+        self.assertIsInstance(optimized, cb.Select)
+
+    def test_parallel(self):
+        parallel = cb.parallel(op.add, cb.serial(cb.identity(), op.neg))
+        optimized = self.assertOptimized(parallel, 1, 2, 3)
+        self.assertIsInstance(optimized, cb.Parallel)
+        self.assertIs(optimized.children[1], op.neg)
+
+    def test_dropped_pure_function(self):
+        serial = cb.serial(cb.dup(), op.mul, cb.drop(), op.neg)
+        optimized = self.assertOptimized(serial, 1, 2)
+        self.assertNotIn(op.mul, optimized.children)
+
+    def test_dropped_impure_function(self):
+        calls = []
+
+        def record(a):
+            calls.append(a)
+            return a
+
+        serial = cb.serial(record, cb.drop(), cb.identity())
+        optimize(serial)(1, 2)
+        self.assertEqual(calls, [1])
+
+    def test_marked_pure_function(self):
+        double = fn.pure(lambda a: a * 2)
+        serial = cb.serial(cb.dup(), double, cb.select([1], n_in=2))
+        optimized = self.assertOptimized(serial, 3)
+        self.assertIsInstance(optimized, cb.Identity)
+
+    def test_deeply_nested(self):
+        serial = cb.identity()
+        for _ in range(3000):
+            serial = cb.serial(serial, cb.dup(), cb.drop())
+        optimized = optimize(serial)
+        self.assertIsInstance(optimized, cb.Identity)
+        self.assertEqual(optimized.signature, serial.signature)
+
+
+class PureTest(unittest.TestCase):
+    def test_builtin(self):
+        self.assertTrue(fn.is_pure(op.add))
+        self.assertFalse(fn.is_pure(print))
+
+    def test_function(self):
+        self.assertFalse(fn.is_pure(lambda a: a))
+        self.assertTrue(fn.is_pure(fn.pure(lambda a: a)))
+
+    def test_combinator(self):
+        self.assertTrue(fn.is_pure(cb.branch(op.add, cb.serial(cb.dup(), op.mul))))
+        self.assertFalse(fn.is_pure(cb.parallel(op.add, print)))
+        self.assertFalse(fn.is_pure(cb.foldl(lambda a, b: a)))
+
+
+class SharePrefixesTest(unittest.TestCase):
+    def assertShared(self, func, *inputs, n_calls):
+        calls = []
+
+        @fn.pure
+        def record(a):
+            calls.append(a)
+            return a * 2
+
+        branch = func(record)
+        optimized = optimize(branch)
+        self.assertEqual(optimized.signature, branch.signature)
+        self.assertEqual(optimized(*inputs), branch(*inputs))
+        calls.clear()
+        optimized(*inputs)
+        self.assertEqual(len(calls), n_calls)
+        return optimized
+
+    def test_branch(self):
+        self.assertShared(
+            lambda f: cb.branch(cb.serial(f, op.add), cb.serial(f, op.mul), f),
+            3,
+            4,
+            n_calls=1,
+        )
+
+    def test_long_prefix(self):
+        self.assertShared(
+            lambda f: cb.branch(
+                cb.serial(f, op.neg, op.add), cb.serial(f, op.neg, op.sub)
+            ),
+            3,
+            4,
+            n_calls=1,
+        )
+
+    def test_different_inputs(self):
+        self.assertShared(
+            lambda f: cb.branch(f, cb.serial(cb.drop(), f)),
+            3,
+            4,
+            n_calls=2,
+        )
+
+    def test_nested_branch(self):
+        self.assertShared(
+            lambda f: cb.serial(op.neg, cb.branch(f, cb.serial(f, op.neg), f)),
+            3,
+            n_calls=1,
+        )
+
+    def test_impure_prefix(self):
+        calls = []
+
+        def record(a):
+            calls.append(a)
+            return a
+
+        optimize(cb.branch(record, record))(1)
+        self.assertEqual(calls, [1, 1])
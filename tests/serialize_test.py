@@ -0,0 +1,143 @@
+import pickle
+import unittest
+import functools
+import cloudpickle
+import operator as op
+from dataclasses import replace
+from redex import serialize
+from redex import combinator as cb
+from redex.function import Signature
+
+
+class Scale(cb.Combinator):
+    factor: int
+
+    def __call__(self, value):
+        return value * self.factor
+
+
+def double(value: int) -> int:
+    return value * 2
+
+
+class SerializeTest(unittest.TestCase):
+    def assertRoundTrip(self, func, *inputs):
+        restored = serialize.loads(serialize.dumps(func))
+        self.assertEqual(restored, func)
+        self.assertEqual(restored.signature, func.signature)
+        self.assertEqual(restored(*inputs), func(*inputs))
+        return restored
+
+    def test_builtin_combinators(self):
+        combinators = {
+            "serial": (cb.serial(op.add, op.neg), (1, 2)),
+            "parallel": (cb.parallel(op.add, op.neg, concurrency=2), (1, 2, 3)),
+            "branch": (cb.branch(op.add, op.sub), (1, 2)),
+            "residual": (cb.residual(op.neg), (1,)),
+            "select": (cb.select([2, 0], n_in=3), (1, 2, 3)),
+            "drop": (cb.drop(n_in=2), (1, 2, 3)),
+            "dup": (cb.dup(n_in=2), (1, 2)),
+            "identity": (cb.identity(n_in=2), (1, 2)),
+            "foldl": (cb.foldl(op.add, n_in=3), (1, 2, 3)),
+            "associative": (cb.foldl(op.concat, n_in=3, associative=True), "abc"),
+            "add": (cb.add(n_in=3), (1, 2, 3)),
+            "repeat": (cb.repeat(op.add, times=2), (1, 2, 3)),
+            "while_loop": (cb.while_loop(bool, cb.drop(0)), (0,)),
+            "scan": (cb.scan(op.neg, n=2), (1, 2)),
+            "memo": (cb.memo(op.add, maxsize=3, max_bytes=100), (1, 2)),
+            "switch": (cb.switch(cb.identity(1), op.neg, op.abs), (1,)),
+            "cond": (cb.cond(bool, op.neg, cb.identity(1)), (2,)),
+        }
+        for name, (func, inputs) in combinators.items():
+            with self.subTest(name):
+                self.assertRoundTrip(func, *inputs)
+
+    def test_memo(self):
+        memo = cb.memo(op.add, key=max, by_identity=True, maxsize=3)
+        memo(1, 2)
+        restored = serialize.loads(serialize.dumps(memo))
+        self.assertEqual(len(restored.cache), 0)
+        self.assertEqual(restored.cache.maxsize, 3)
+        self.assertIs(restored.key, max)
+        self.assertTrue(restored.by_identity)
+        self.assertRoundTrip(memo, 1, 2)
+
+    def test_replaced_signature(self):
+        serial = cb.serial(op.neg)
+        serial = replace(serial, signature=Signature(n_in=2, n_out=2))
+        self.assertRoundTrip(serial, 1, 2)
+
+    def test_custom_combinator(self):
+        scale = Scale(signature=Signature(n_in=1, n_out=1), factor=3)
+        self.assertRoundTrip(cb.serial(scale, double), 2)
+
+    def test_pickled_function(self):
+        add = functools.partial(op.add, 1)
+        restored = serialize.loads(serialize.dumps(cb.serial(add, op.neg)))
+        self.assertEqual(restored(2), -3)
+
+    def test_unpicklable_function(self):
+        with self.assertRaises((pickle.PicklingError, AttributeError)):
+            serialize.dumps(cb.serial(lambda x: x))
+
+    def test_functions_imported(self):
+        data = serialize.dumps(cb.serial(double, op.add))
+        self.assertIn(b"serialize_test:double", data)
+        self.assertIn(b"_operator:add", data)
+
+    def test_shared_subtrees(self):
+        inner = cb.serial(op.add, op.neg)
+        self.assertEqual(
+            len(serialize.dumps(cb.branch(*[inner] * 100))),
+            len(serialize.dumps(cb.branch(*[cb.serial(op.add, op.neg)] * 100))),
+        )
+        restored = serialize.loads(serialize.dumps(cb.branch(inner, inner)))
+        first, second = restored.children[1].children
+        self.assertIs(first, second)
+
+    def test_signatures_derived(self):
+        branch = cb.branch(*[cb.serial(op.add, op.neg, cb.dup())] * 100)
+        self.assertNotIn(b"Signature", serialize.dumps(branch))
+        self.assertLess(
+            len(serialize.dumps(cb.serial(*[branch] * 10))),
+            len(serialize.dumps(branch)) + 100,
+        )
+
+    def test_deep_nesting(self):
+        func = op.neg
+        for _ in range(5000):
+            func = cb.serial(func, op.neg)
+        restored = serialize.loads(serialize.dumps(func))
+        self.assertEqual(restored.signature, func.signature)
+
+    def test_many(self):
+        add, neg = cb.serial(op.add), cb.serial(op.neg)
+        restored = serialize.loads_many(serialize.dumps_many([add, neg, add]))
+        self.assertEqual(restored, [add, neg, add])
+        self.assertIs(restored[0], restored[2])
+
+    def test_pickle(self):
+        serial = cb.serial(op.add, cb.dup())
+        self.assertEqual(pickle.loads(pickle.dumps(serial)), serial)
+
+    def test_cloudpickle(self):
+        # Combinators are pickled field by field, so other picklers handle
+        # functions the format can't locate.
+        serial = cb.serial(lambda x: -x, op.neg)
+        self.assertEqual(cloudpickle.loads(cloudpickle.dumps(serial))(3), 3)
+
+    def test_unknown_version(self):
+        data = pickle.dumps(("redex", serialize.FORMAT_VERSION + 1, (), ()))
+        with self.assertRaisesRegex(ValueError, "isn't supported"):
+            serialize.loads(data)
+
+    def test_invalid_data(self):
+        for data in [
+            b"",
+            b"data",
+            pickle.dumps(("other", 1, (), ())),
+            pickle.dumps(op.add),
+        ]:
+            with self.subTest(data):
+                with self.assertRaises(ValueError):
+                    serialize.loads(data)
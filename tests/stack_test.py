@@ -1,6 +1,10 @@
+from typing import Any
 import operator as op
-from redex.stack import constrained_call, stackmethod, Stack, verify_stack_size
+from redex.stack import constrained_call, collect_outputs, stackmethod, Stack
+from redex.stack import verify_stack_size, unchecked_call, is_verified
 from redex.function import Signature
+from redex import combinator as cb
+from dataclasses import replace
 import unittest
 from hypothesis import given
 from helper import type as _t
@@ -13,6 +17,12 @@ class ConstrainedCallTest(unittest.TestCase):
     def test_extra_input(self):
         self.assertEqual(constrained_call(func=op.add, stack=(1, 2, 0, 0)), (3, 0, 0))
 
+    def test_without_any_output(self):
+        def func(a: Any) -> None:
+            pass
+
+        self.assertEqual(constrained_call(func=func, stack=(1, 0)), (0,))
+
     def test_less_input(self):
         with self.assertRaises(ValueError):
             constrained_call(func=op.add, stack=(1,))
@@ -27,6 +37,52 @@ class ConstrainedCallTest(unittest.TestCase):
             (3,),
         )
 
+    def test_tuple_input(self):
+        def func(a: tuple[Any, tuple[Any, Any]], b: Any) -> Any:
+            x, (y, z) = a
+            return x - y - z - b
+
+        self.assertEqual(constrained_call(func=func, stack=(1, 2, 3, 4, 0)), (-8, 0))
+
+    def test_undeclared_outputs(self):
+        def func(a: Any):
+            return a, (a, a)
+
+        self.assertEqual(constrained_call(func=func, stack=(1, 0)), (1, 1, 1, 0))
+
+    def test_declared_outputs(self):
+        def func(a: Any) -> tuple[Any, tuple[Any, Any]]:
+            return a, (a, (a,))
+
+        self.assertEqual(constrained_call(func=func, stack=(1, 0)), (1, 1, (1,), 0))
+
+
+class CollectOutputsTest(unittest.TestCase):
+    def test_undeclared_shape(self):
+        signature = Signature(n_in=0, n_out=1)
+        self.assertEqual(collect_outputs(1, signature), (1,))
+        self.assertEqual(collect_outputs((1, (2,)), signature), (1, 2))
+
+    def test_single_output(self):
+        signature = Signature(n_in=0, n_out=1, out_shape=())
+        self.assertEqual(collect_outputs((1, 2), signature), ((1, 2),))
+
+    def test_without_any_output(self):
+        signature = Signature(n_in=0, n_out=0, out_shape=())
+        self.assertEqual(collect_outputs(None, signature), ())
+
+    def test_without_any_undeclared_output(self):
+        signature = Signature(n_in=0, n_out=0)
+        self.assertEqual(collect_outputs(None, signature), ())
+
+    def test_flat_shape(self):
+        signature = Signature(n_in=0, n_out=2, out_shape=((), ()))
+        self.assertEqual(collect_outputs([1, (2,)], signature), (1, (2,)))
+
+    def test_nested_shape(self):
+        signature = Signature(n_in=0, n_out=3, out_shape=((), ((), ())))
+        self.assertEqual(collect_outputs((1, (2, 3)), signature), (1, 2, 3))
+
 
 class VerifyStackSizeTest(unittest.TestCase):
     def test_justright_input(self):
@@ -50,6 +106,64 @@ class VerifyStackSizeTest(unittest.TestCase):
         )
 
 
+class UncheckedCallTest(unittest.TestCase):
+    def test_function(self):
+        signature = Signature(n_in=2, n_out=1)
+        self.assertEqual(unchecked_call(op.add, (1, 2, 3), signature), (3, 3))
+
+    def test_combinator(self):
+        for func in [cb.dup(), cb.serial(op.add, cb.dup()), cb.select([0, 0])]:
+            with self.subTest(func):
+                stack = ((1, 2), (3, 4), 5)
+                self.assertEqual(
+                    unchecked_call(func, stack, func.signature),
+                    constrained_call(func, stack, func.signature),
+                )
+
+    def test_reshaped_inputs(self):
+        func = cb.serial(op.add)
+        signature = Signature(n_in=2, n_out=1, in_shape=((), ()))
+        self.assertEqual(unchecked_call(func, (1, 2, 3), signature), (3, 3))
+
+
+class IsVerifiedTest(unittest.TestCase):
+    def test_function(self):
+        self.assertTrue(is_verified(op.add))
+        self.assertTrue(is_verified(op.add, Signature(n_in=3, n_out=1)))
+
+    def test_combinators(self):
+        funcs = [
+            cb.serial(op.add, cb.dup(), cb.drop(), cb.select([1, 0])),
+            cb.branch(op.add, op.sub),
+            cb.residual(op.neg),
+            cb.memo(cb.serial(op.add, op.neg)),
+            cb.serial(cb.identity(2), cb.add(3)),
+        ]
+        for func in funcs:
+            with self.subTest(func):
+                self.assertTrue(is_verified(func))
+
+    def test_replaced_signature(self):
+        serial = cb.serial(op.add, op.neg)
+        self.assertFalse(is_verified(replace(serial, signature=Signature(1, 1))))
+        self.assertFalse(is_verified(replace(serial, signature=Signature(2, 2))))
+        self.assertTrue(is_verified(replace(serial, signature=Signature(3, 2))))
+        self.assertFalse(is_verified(cb.serial(op.neg, serial), Signature(1, 1)))
+
+    def test_unverified_child(self):
+        child = replace(cb.serial(op.add), signature=Signature(n_in=1, n_out=0))
+        self.assertFalse(is_verified(cb.serial(op.neg, child)))
+        self.assertFalse(is_verified(cb.parallel(op.neg, child)))
+        self.assertFalse(is_verified(cb.memo(child)))
+
+    def test_custom_combinator(self):
+        class A(cb.Combinator):
+            def __call__(self):
+                return ()
+
+        self.assertFalse(is_verified(A(signature=Signature(n_in=0, n_out=0))))
+
+
 class StackMethodTest(unittest.TestCase):
     @given(a=_t.any(), b=_t.any(), o=_t.any())
     def test_inputs(self, a, b, o):
@@ -0,0 +1,96 @@
+import itertools
+import unittest
+import operator as op
+from unittest import mock
+from concurrent.futures import ThreadPoolExecutor
+from redex import combinator as cb
+from redex import observer as obs
+from redex.streaming import stream, adapt_chunk_size, MAX_CHUNK_SIZE
+
+
+class StreamTest(unittest.TestCase):
+    def test_compiled(self):
+        outputs = stream(cb.serial(op.add, op.neg), [(1, 2), (3, 4)])
+        self.assertEqual(list(outputs), [-3, -7])
+
+    def test_batched(self):
+        outputs = stream(cb.branch(op.add, op.mul), [(1, 2), (3, 4)], batched=True)
+        self.assertEqual(list(outputs), [(3, 2), (7, 12)])
+
+    def test_single_input(self):
+        self.assertEqual(list(stream(op.neg, [1, 2])), [-1, -2])
+        self.assertEqual(list(stream(op.neg, [1, 2], batched=True)), [-1, -2])
+
+    def test_method(self):
+        combinator = cb.serial(op.add, op.neg)
+        self.assertEqual(list(combinator.stream([(1, 2)], batched=True)), [-3])
+
+    def test_same_as_call(self):
+        combinator = cb.serial(cb.dup(), op.mul, op.add)
+        items = [(i, i + 1) for i in range(10)]
+        expected = [combinator(*item) for item in items]
+        self.assertEqual(list(combinator.stream(items)), expected)
+        self.assertEqual(list(combinator.stream(items, 3, batched=True)), expected)
+
+    def test_lazy(self):
+        items = ((i, 1) for i in itertools.count())
+        outputs = stream(op.add, items, chunk_size=4, batched=True)
+        self.assertEqual(list(itertools.islice(outputs, 6)), [1, 2, 3, 4, 5, 6])
+
+    def test_adaptive(self):
+        items = [(i, 1) for i in range(1000)]
+        outputs = stream(op.add, items, chunk_size=1, target_latency=1.0, batched=True)
+        self.assertEqual(list(outputs), [i + 1 for i in range(1000)])
+
+    def test_empty(self):
+        self.assertEqual(list(stream(op.add, [], batched=True)), [])
+
+    def test_different_sizes(self):
+        with self.assertRaises(ValueError):
+            list(stream(op.add, [(1, 2), (1, 2, 3)], batched=True))
+
+    def test_less_input(self):
+        with self.assertRaises(ValueError):
+            list(stream(op.add, [(1,)]))
+
+    def test_invalid_chunk_size(self):
+        with self.assertRaises(ValueError):
+            stream(op.add, [], chunk_size=0)
+
+    def test_target_latency_requires_batched(self):
+        with self.assertRaisesRegex(ValueError, "batched mode"):
+            stream(op.add, [], target_latency=1.0)
+
+    def test_observed(self):
+        timing = obs.TimingObserver()
+        with obs.observing(timing):
+            outputs = list(stream(cb.serial(op.add, op.neg), [(1, 2), (3, 4)]))
+        self.assertEqual(outputs, [-3, -7])
+        self.assertEqual(timing.counts[("Serial", "0:add")], 2)
+
+    def test_executor(self):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            parallel = cb.serial(cb.parallel(op.neg, op.neg, executor=executor))
+            with mock.patch.object(executor, "submit", wraps=executor.submit) as submit:
+                outputs = list(stream(parallel, [(1, 2), (3, 4)]))
+        self.assertEqual(outputs, [(-1, -2), (-3, -4)])
+        self.assertTrue(submit.called)
+
+
+class AdaptChunkSizeTest(unittest.TestCase):
+    def test_grow(self):
+        self.assertEqual(
+            adapt_chunk_size(10, 10, latency=0.001, target_latency=1.0), 20
+        )
+
+    def test_shrink(self):
+        self.assertEqual(adapt_chunk_size(10, 10, latency=100.0, target_latency=1.0), 5)
+
+    def test_target(self):
+        self.assertEqual(adapt_chunk_size(10, 10, latency=0.8, target_latency=1.0), 12)
+
+    def test_bounds(self):
+        self.assertEqual(adapt_chunk_size(1, 1, latency=1.0, target_latency=0.1), 1)
+        self.assertEqual(
+            adapt_chunk_size(MAX_CHUNK_SIZE, MAX_CHUNK_SIZE, 0.0, 1.0), MAX_CHUNK_SIZE
+        )
@@ -1,4 +1,6 @@
+import weakref
 from typing import Any, Sequence
+from dataclasses import dataclass
 from redex.util import (
     expand_to_tuple,
     squeeze_tuple,
@@ -8,6 +10,10 @@ from redex.util import (
     flatten_tuple_annotation_shape,
     infer_tuple_annotation_shape,
     reshape_tuples,
+    reshape_plan,
+    flatten_plan,
+    slotted,
+    format_table,
 )
 from hypothesis import given
 import unittest
@@ -172,3 +178,79 @@ class ReshapeTuplesTest(unittest.TestCase):
     def test_exceeded_input(self):
         with self.assertRaises(RuntimeError):
             reshape_tuples([1, 2, 3], ((), ()))
+
+
+class ReshapePlanTest(unittest.TestCase):
+    @given(a=_t.any(), b=_t.any(), c=_t.any(), d=_t.any())
+    def test_justright_input(self, a, b, c, d):
+        test = [
+            (((a, b, c, d), (((), (), ()), ())), ((a, b, c), d)),
+            (((a, b, c, d), ((), ((), (), ()))), (a, (b, c, d))),
+            (((a, b, c, d), ((), (((), ()), ()))), (a, ((b, c), d))),
+            (((a, b, c, d), ((), (((), ((),)), ()))), (a, ((b, (c,)), d))),
+        ]
+        [
+            self.assertEqual(reshape_plan(shape)(value), expect)
+            for ((value, shape), expect) in test
+        ]
+
+    def test_flat_shape(self):
+        self.assertIsNone(reshape_plan(()))
+        self.assertIsNone(reshape_plan(((), (), ())))
+
+
+class FlattenPlanTest(unittest.TestCase):
+    @given(a=_t.any(), b=_t.any(), c=_t.any(), d=_t.any())
+    def test_justright_input(self, a, b, c, d):
+        test = [
+            ((((a, b, c), d), (((), (), ()), ())), (a, b, c, d)),
+            (((a, (b, c, d)), ((), ((), (), ()))), (a, b, c, d)),
+            (((a, ((b, c), d)), ((), (((), ()), ()))), (a, b, c, d)),
+            (((a, ((b, (c,)), d)), ((), (((), ((),)), ()))), (a, b, c, d)),
+        ]
+        [
+            self.assertEqual(flatten_plan(shape)(value), expect)
+            for ((value, shape), expect) in test
+        ]
+
+    def test_flat_shape(self):
+        self.assertIsNone(flatten_plan(()))
+        self.assertIsNone(flatten_plan(((), (), ())))
+
+
+class SlottedTest(unittest.TestCase):
+    def test_slotted(self):
+        @slotted()
+        @dataclass(frozen=True)
+        class Point:
+            x: int
+            y: int = 0
+
+        point = Point(1)
+        self.assertEqual(point, Point(1, 0))
+        self.assertFalse(hasattr(point, "__dict__"))
+        self.assertEqual(Point.__slots__, ("x", "y"))
+
+    def test_inherited_slots(self):
+        @slotted(weakref=True)
+        @dataclass(frozen=True)
+        class Point:
+            x: int
+
+        @slotted()
+        @dataclass(frozen=True)
+        class Point3D(Point):
+            z: int = 0
+
+        self.assertEqual(Point3D.__slots__, ("z",))
+        point = Point3D(1)
+        self.assertIs(weakref.ref(point)(), point)
+
+
+class FormatTableTest(unittest.TestCase):
+    def test_format_table(self):
+        rows = [("name", "n", "cost"), ("a", "10", "1.5"), ("longer", "2", "")]
+        self.assertEqual(
+            format_table(rows).splitlines(),
+            ["name     n  cost", "a       10   1.5", "longer   2"],
+        )
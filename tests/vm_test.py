@@ -0,0 +1,127 @@
+from typing import Any
+import unittest
+import operator as op
+from redex import combinator as cb
+from redex.compiler import compile
+from redex.function import Signature
+from redex.vm import lower, Program
+
+
+class LowerTest(unittest.TestCase):
+    def test_signature(self):
+        program = lower(cb.serial(op.add, op.add))
+        self.assertEqual(program.signature, Signature(n_in=3, n_out=1))
+
+    def test_function(self):
+        program = lower(op.add)
+        self.assertEqual(program(1, 2), 1 + 2)
+
+    def test_serial(self):
+        program = lower(cb.serial(op.add, op.sub, op.add))
+        self.assertEqual(program(1, 2, 3, 4), ((1 + 2) - 3) + 4)
+
+    def test_parallel(self):
+        program = lower(cb.parallel(op.add, op.sub, op.neg))
+        self.assertEqual(program(1, 2, 3, 4, 5), (1 + 2, 3 - 4, -5))
+
+    def test_parallel_in_place(self):
+        program = lower(cb.parallel(cb.dup(), cb.drop(), op.neg))
+        self.assertEqual(program(1, 2, 3, 4), (1, 1, -3, 4))
+
+    def test_branch(self):
+        program = lower(cb.branch(cb.serial(op.add, op.add), op.add))
+        self.assertEqual(program(1, 2, 3), (1 + 2 + 3, 1 + 2))
+
+    def test_residual(self):
+        program = lower(cb.residual(op.add, op.sub))
+        self.assertEqual(program(1, 2, 3), ((1 + 2) - 3) + 1)
+
+    def test_select(self):
+        program = lower(cb.select(indices=[1, 0, 0]))
+        self.assertEqual(program(1, 2, 3), (2, 1, 1, 3))
+
+    def test_select_consume_less(self):
+        select = cb.select(indices=[2], n_in=1)
+        self.assertEqual(lower(select)(1, 2, 3, 4), select(1, 2, 3, 4))
+
+    def test_drop(self):
+        program = lower(cb.drop(n_in=2))
+        self.assertEqual(program(1, 2, 3), 3)
+
+    def test_dup(self):
+        program = lower(cb.dup(n_in=2))
+        self.assertEqual(program(1, 2, 3), (1, 2, 1, 2, 3))
+
+    def test_identity(self):
+        program = lower(cb.identity(n_in=2))
+        self.assertEqual(program(1, 2), (1, 2))
+
+    def test_foldl(self):
+        program = lower(cb.sub(n_in=4))
+        self.assertEqual(program(1, 2, 3, 4), 1 - 2 - 3 - 4)
+
+    def test_nested(self):
+        serial = cb.serial(
+            cb.branch(op.add, cb.serial(cb.dup(), op.mul)),
+            cb.parallel(op.neg, cb.identity()),
+            cb.add(n_in=3),
+        )
+        self.assertEqual(lower(serial)(1, 2, 3), serial(1, 2, 3))
+
+    def test_nested_lowered(self):
+        serial = cb.serial(lower(cb.serial(op.add, op.add)), compile(op.neg))
+        self.assertEqual(lower(serial)(1, 2, 3), -(1 + 2 + 3))
+
+    def test_deeply_nested(self):
+        serial = op.neg
+        for _ in range(10000):
+            serial = cb.serial(serial, op.neg)
+        self.assertEqual(lower(serial)(1, 2), (-1, 2))
+
+    def test_tuple_input(self):
+        def func(a: tuple[Any, tuple[Any, Any]], b: Any) -> Any:
+            x, (y, z) = a
+            return x - y - z - b
+
+        program = lower(cb.serial(func))
+        self.assertEqual(program(1, 2, 3, 4), 1 - 2 - 3 - 4)
+
+    def test_nested_outputs(self):
+        def func(a: Any) -> tuple[Any, tuple[Any, Any]]:
+            return a, (a + 1, a + 2)
+
+        program = lower(cb.serial(func, cb.sub(n_in=3)))
+        self.assertEqual(program(1), 1 - 2 - 3)
+
+    def test_without_any_output(self):
+        def func(a: Any) -> None:
+            pass
+
+        combinator = cb.serial(func)
+        self.assertEqual(lower(combinator)(1, 2), 2)
+        self.assertEqual(lower(combinator)(1, 2), combinator(1, 2))
+
+    def test_unexpected_outputs(self):
+        def func(a: Any) -> tuple[Any, Any]:
+            return a, a, a
+
+        with self.assertRaises(ValueError):
+            lower(cb.serial(func))(1)
+
+    def test_extra_input(self):
+        program = lower(cb.serial(op.add))
+        self.assertEqual(program(1, 2, 3, 4), (1 + 2, 3, 4))
+
+    def test_less_input(self):
+        program = lower(cb.serial(op.add))
+        with self.assertRaises(ValueError):
+            program(1)
+
+    def test_less_nested_input(self):
+        with self.assertRaises(ValueError):
+            lower(cb.serial(cb.select(indices=[2], n_in=1)))
+
+    def test_headroom(self):
+        program = lower(cb.serial(cb.dup(n_in=2), cb.drop(n_in=3)))
+        self.assertIsInstance(program, Program)
+        self.assertEqual(program.headroom, 2)